@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QIcon, QImage, QImageReader, QPixmap
+
+
+# 啟動時預先載入的圖片資料夾（相對於 app_dir）
+ASSET_DIRECTORIES = ["img/ui", "img/messagebox"]
+ASSET_EXTENSIONS = (".png", ".svg")
+
+# ScalableButton 動畫使用的圖示大小（按下 / 一般 / 滑鼠移入）
+ICON_SIZES = [28, 32, 40]
+
+
+# 應用程式共用的圖示與圖片快取：每個檔案只解碼一次，並預先 rasterize 成各個圖示大小，
+# 點擊按鈕、切換狀態與 hover 動畫時不需讀取檔案或重新 rasterize SVG
+class AssetCache():
+    def __init__(self, app_dir, device_pixel_ratio=1.0):
+        self.app_dir = app_dir
+        # Retina 螢幕上以實際的像素大小 rasterize，避免放大後模糊
+        self.device_pixel_ratio = device_pixel_ratio
+
+        # 相對路徑 → {None: 原始大小的 QImage, 圖示大小: QImage}；QImage 可以在背景執行緒中解碼
+        self._images = {}
+        self._decode_lock = threading.Lock()
+        self._preload_thread = None
+
+        # QIcon / QPixmap 只能在 GUI 執行緒中建立
+        self._icons = {}
+        self._pixmaps = {}
+
+    def list_assets(self):
+        relative_paths = []
+        for directory in ASSET_DIRECTORIES:
+            try:
+                file_names = sorted(os.listdir(os.path.join(self.app_dir, directory)))
+            except OSError:
+                continue
+            relative_paths.extend(f"{directory}/{file_name}" for file_name in file_names
+                                  if file_name.lower().endswith(ASSET_EXTENSIONS))
+        return relative_paths
+
+    def start_preload(self):
+        # 在背景執行緒中解碼所有圖片，GUI 執行緒可以同時建立視窗
+        self._preload_thread = threading.Thread(target=self.preload, name="asset-preload", daemon=True)
+        self._preload_thread.start()
+
+    def preload(self):
+        for relative_path in self.list_assets():
+            self._get_images(relative_path)
+
+    def _get_images(self, relative_path):
+        # 背景執行緒正在解碼同一個檔案時等待它完成，不會重複解碼
+        with self._decode_lock:
+            images = self._images.get(relative_path)
+            if images is None:
+                images = self._decode(os.path.join(self.app_dir, relative_path))
+                self._images[relative_path] = images
+            return images
+
+    def _decode(self, path):
+        images = {None: QImage(path)}
+        for size in ICON_SIZES:
+            pixel_size = round(size * self.device_pixel_ratio)
+            if path.lower().endswith(".svg"):
+                # SVG 直接以目標大小 rasterize
+                reader = QImageReader(path)
+                reader.setScaledSize(QSize(pixel_size, pixel_size))
+                image = reader.read()
+            elif not images[None].isNull():
+                image = images[None].scaled(pixel_size, pixel_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            else:
+                image = QImage()
+            image.setDevicePixelRatio(self.device_pixel_ratio)
+            images[size] = image
+        return images
+
+    def get_icon(self, relative_path):
+        # 包含所有 ICON_SIZES 的 QIcon；動畫中間的大小由最接近的 pixmap 縮放
+        icon = self._icons.get(relative_path)
+        if icon is None:
+            icon = QIcon()
+            for size in ICON_SIZES:
+                image = self._get_images(relative_path)[size]
+                if not image.isNull():
+                    icon.addPixmap(QPixmap.fromImage(image))
+            self._icons[relative_path] = icon
+        return icon
+
+    def get_pixmap(self, relative_path):
+        # 原始大小的圖片（訊息框的圖示）
+        pixmap = self._pixmaps.get(relative_path)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(self._get_images(relative_path)[None])
+            self._pixmaps[relative_path] = pixmap
+        return pixmap
+
+    def warm_up(self):
+        # 在 GUI 執行緒中預先建立所有的 QIcon / QPixmap
+        for relative_path in self.list_assets():
+            if relative_path.startswith("img/messagebox/"):
+                self.get_pixmap(relative_path)
+            else:
+                self.get_icon(relative_path)
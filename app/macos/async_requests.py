@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+
+
+# 在專用的背景執行緒中執行 asyncio event loop，讓多個 API 請求可以同時進行（共用同一個 gRPC channel）
+class AsyncRequestLoop():
+    # 等待 in-flight 名額時，每隔這段時間檢查一次是否已經關閉
+    ACQUIRE_POLL_SECONDS = 0.1
+
+    def __init__(self, max_in_flight=4):
+        # 同時進行中的請求數上限，超過時 submit 會等待（避免請求無限制地累積）
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._loop = None
+        self._thread = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # 呼叫時必須持有 self._lock
+        if self._closed:
+            raise RuntimeError("request loop is closed")
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, args=(self._loop,), name="async-requests", daemon=True)
+            self._thread.start()
+        return self._loop
+
+    def _run(self, loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+        # 關閉時取消尚未完成的請求，等待它們結束後關閉 event loop
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+    def submit(self, coroutine_function, *args, limited=True):
+        # 回傳 concurrent.futures.Future；coroutine 在 event loop 的執行緒中建立與執行。
+        # limited=False 的請求（例如預熱連線）不佔用 in-flight 名額，也不會等待，可以從 GUI thread 呼叫
+        if limited:
+            # 不無限期等待：關閉後等待中的 stage thread 可以結束
+            while not self._in_flight.acquire(timeout=self.ACQUIRE_POLL_SECONDS):
+                if self._closed:
+                    raise RuntimeError("request loop is closed")
+
+        async def run():
+            return await coroutine_function(*args)
+
+        # 檢查是否已關閉與排入請求必須一起完成，close 之後不會再有請求被排入（排入的請求都會在關閉時被取消）
+        with self._lock:
+            try:
+                loop = self._ensure_started()
+            except RuntimeError:
+                if limited:
+                    self._in_flight.release()
+                raise
+            future = asyncio.run_coroutine_threadsafe(run(), loop)
+        if limited:
+            future.add_done_callback(lambda _: self._in_flight.release())
+        return future
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+            self._loop = None
+            self._thread = None
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+# 擷取 pipeline 的重播 benchmark：將錄製好的畫面依序送入實際的 pipeline 程式碼（diff → 編碼 → OCR → 翻譯），
+# OCR 與翻譯使用可設定延遲的假 client，不需要螢幕、GUI 或 GCP 憑證
+#
+#   python benchmark.py <畫面資料夾或 .zip> [--ocr-latency-ms 200] [--output result.json] [--baseline baseline.json]
+#
+# 畫面依檔名排序；若有 timestamps.csv（每行「檔名,秒數」）則使用其中的時間，否則以 --interval-ms 的間隔計算
+
+import io
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import zipfile
+import hashlib
+import argparse
+import tempfile
+import numpy as np
+from PIL import Image
+
+from config_handler import *
+from capture_pipeline import *
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+TIMESTAMPS_FILE_NAME = "timestamps.csv"
+
+
+def _parse_timestamps(text):
+    timestamps = {}
+    for line in text.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) == 2:
+            try:
+                timestamps[os.path.basename(parts[0])] = float(parts[1])
+            except ValueError:
+                continue  # 略過標題列
+    return timestamps
+
+
+def load_frames(path, interval_ms):
+    # 回傳 [(檔名, 時間(秒), RGB numpy 陣列)]
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = sorted(name for name in archive.namelist() if name.lower().endswith(IMAGE_EXTENSIONS))
+            timestamp_names = [name for name in archive.namelist() if os.path.basename(name) == TIMESTAMPS_FILE_NAME]
+            timestamps = _parse_timestamps(archive.read(timestamp_names[0]).decode("utf-8")) if timestamp_names else {}
+            images = [(os.path.basename(name), Image.open(io.BytesIO(archive.read(name)))) for name in names]
+    else:
+        names = sorted(name for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+        timestamp_path = os.path.join(path, TIMESTAMPS_FILE_NAME)
+        timestamps = {}
+        if os.path.exists(timestamp_path):
+            with open(timestamp_path, "r", encoding="utf-8") as timestamp_file:
+                timestamps = _parse_timestamps(timestamp_file.read())
+        images = [(name, Image.open(os.path.join(path, name))) for name in names]
+
+    frames = []
+    for i, (name, image) in enumerate(images):
+        timestamp = timestamps.get(name, i * interval_ms / 1000)
+        frames.append((name, timestamp, np.asarray(image.convert("RGB"))))
+    return frames
+
+
+# 假的 OCR 引擎：每個文字 band 回傳一行由像素內容決定的文字（相同的畫面一定得到相同的文字）
+class FakeOcrEngine(OcrEngine):
+    name = "fake"
+
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.bytes_uploaded = 0
+
+    def recognize(self, image_data):
+        self.calls += 1
+        self.bytes_uploaded += len(image_data)
+        time.sleep(self.latency_ms / 1000)
+
+        image = np.asarray(Image.open(io.BytesIO(image_data)).convert("L"))
+        words = []
+        for top, bottom in find_text_bands(image, max_bands=64):
+            band = image[top:bottom]
+            if band.max() - band.min() < 32:
+                continue  # 沒有文字的 band
+            digest = hashlib.md5(band.tobytes()).hexdigest()[:8]
+            words.append(OcrWord(f"line-{digest}", (0, top, image.shape[1], bottom)))
+        return OcrResult("\n".join(word.text for word in words), words, locale="en")
+
+
+# 假的 Translation client（介面與 google.cloud.translate_v2.Client.translate 相同）
+class FakeTranslateClient():
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.segments = 0
+        self.characters = 0
+
+    def translate(self, values, target_language):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        if isinstance(values, str):
+            self.segments += 1
+            self.characters += len(values)
+            return {"translatedText": f"[{target_language}] {values}"}
+        self.segments += len(values)
+        self.characters += sum(len(value) for value in values)
+        return [{"translatedText": f"[{target_language}] {value}"} for value in values]
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    samples = np.asarray(values)
+    return {
+        "count": len(values),
+        "p50": round(float(np.percentile(samples, 50)), 3),
+        "p90": round(float(np.percentile(samples, 90)), 3),
+        "p99": round(float(np.percentile(samples, 99)), 3),
+        "max": round(float(samples.max()), 3),
+    }
+
+
+def run_benchmark(frames, args):
+    cache_dir = tempfile.mkdtemp()
+    translation_cache = TranslationCache(os.path.join(cache_dir, "translation_cache.jsonl"))
+    ocr_cache = OcrResultCache(args.ocr_cache_size)
+    ocr_engine = FakeOcrEngine(args.ocr_latency_ms)
+    translate_client = FakeTranslateClient(args.translate_latency_ms)
+    stability_gate = StabilityGate(args.settle_ms, args.max_wait_ms)
+    pipeline = CapturePipeline(Translator(translation_cache), ocr_cache, CaptureBackend(),
+                               PayloadEncoder(args.codec, args.compression_level, args.binarize),
+                               ocr_engine, PipelineStats(), incremental_translation=not args.no_incremental_translation)
+    region = CaptureRegion(0, create_change_detector(args.change_detection_method), DirtyRegionTracker(args.max_bands),
+                           stability_gate)
+    pipeline.add_region(region)
+    pipeline.set_clients(None, translate_client)
+
+    # 依序直接呼叫每個 stage（不啟動執行緒），結果與執行順序固定
+    stage_times = {"diff": [], "encode": [], "ocr": [], "translate": [], "frame": []}
+    skipped = {"unchanged": 0, "unstable": 0, "ocr_cache": 0}
+
+    def timed(stage, handler, frame):
+        start = time.perf_counter()
+        result = handler(frame)
+        stage_times[stage].append((time.perf_counter() - start) * 1000)
+        return result
+
+    def drain_translate_queue():
+        while True:
+            try:
+                frame = pipeline.translate_queue.get_nowait()
+            except queue.Empty:
+                return
+            timed("translate", pipeline.perform_translation, frame)
+
+    start = time.perf_counter()
+    for seq, (name, timestamp, image) in enumerate(frames, 1):
+        frame_start = time.perf_counter()
+        frame = CaptureFrame(seq, 0, region, None)
+        frame.timestamp = timestamp
+        frame.image = image
+
+        frames_held = stability_gate.frames_held
+        ocr_cache_hits = ocr_cache.hits
+        if timed("diff", pipeline.diff_screen, frame) is None:
+            if stability_gate.frames_held > frames_held:
+                skipped["unstable"] += 1
+            elif ocr_cache.hits > ocr_cache_hits:
+                skipped["ocr_cache"] += 1
+            else:
+                skipped["unchanged"] += 1
+        else:
+            timed("encode", pipeline.encode_screen, frame)
+            timed("ocr", pipeline.perform_ocr, frame)
+        drain_translate_queue()
+        stage_times["frame"].append((time.perf_counter() - frame_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    translation_cache_stats = translation_cache.get_stats()
+    translation_cache.close()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return {
+        "frames": len(frames),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(len(frames) / elapsed, 2) if elapsed else 0.0,
+        "stage_ms": {stage: percentiles(times) for stage, times in stage_times.items()},
+        "ocr_calls": ocr_engine.calls,
+        "ocr_bytes_uploaded": ocr_engine.bytes_uploaded,
+        "translate_calls": translate_client.calls,
+        "translate_segments": translate_client.segments,
+        "translate_characters": translate_client.characters,
+        "translation_cache_hits": translation_cache_stats["hits"],
+        "text_duplicates": region.text_deduplicator.duplicates,
+        "ocr_calls_avoided": skipped,
+    }
+
+
+def compare_with_baseline(result, baseline):
+    # 列出主要指標相對於 baseline 的變化
+    rows = []
+    for key in ["fps", "ocr_calls", "ocr_bytes_uploaded", "translate_calls", "translate_characters"]:
+        rows.append((key, baseline.get(key), result.get(key)))
+    for stage in ["diff", "encode", "ocr", "translate", "frame"]:
+        rows.append((f"{stage} p90 ms", baseline["stage_ms"].get(stage, {}).get("p90"), result["stage_ms"][stage].get("p90")))
+
+    lines = []
+    for key, old, new in rows:
+        if old in (None, 0) or new is None:
+            lines.append(f"{key:>22}: {old} -> {new}")
+        else:
+            lines.append(f"{key:>22}: {old} -> {new} ({(new - old) / old * 100:+.1f}%)")
+    return "\n".join(lines)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="重播錄製的畫面並量測擷取 pipeline 的效能")
+    parser.add_argument("frames", help="畫面資料夾或 .zip 檔")
+    parser.add_argument("--interval-ms", type=float, default=250, help="沒有 timestamps.csv 時每張畫面的間隔")
+    parser.add_argument("--ocr-latency-ms", type=float, default=200)
+    parser.add_argument("--translate-latency-ms", type=float, default=100)
+    parser.add_argument("--change-detection-method", default=ConfigHandler.DEFAULT_CHANGE_DETECTION_METHOD, choices=CHANGE_DETECTION_METHODS)
+    parser.add_argument("--max-bands", type=int, default=ConfigHandler.DEFAULT_DIRTY_REGION_MAX_BANDS)
+    parser.add_argument("--ocr-cache-size", type=int, default=ConfigHandler.DEFAULT_OCR_CACHE_SIZE)
+    parser.add_argument("--codec", default=ConfigHandler.DEFAULT_OCR_PAYLOAD_CODEC, choices=PAYLOAD_CODECS)
+    parser.add_argument("--compression-level", type=int, default=ConfigHandler.DEFAULT_OCR_PAYLOAD_COMPRESSION_LEVEL)
+    parser.add_argument("--binarize", action="store_true")
+    parser.add_argument("--settle-ms", type=float, default=ConfigHandler.DEFAULT_STABILITY_SETTLE_MS)
+    parser.add_argument("--max-wait-ms", type=float, default=ConfigHandler.DEFAULT_STABILITY_MAX_WAIT_MS)
+    parser.add_argument("--no-incremental-translation", action="store_true", help="每次都翻譯完整的文字")
+    parser.add_argument("--output", help="將結果寫入 JSON 檔（可作為之後的 baseline）")
+    parser.add_argument("--baseline", help="與先前儲存的結果比較")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    frames = load_frames(args.frames, args.interval_ms)
+    if not frames:
+        print(f"找不到任何畫面：{args.frames}")
+        return 1
+
+    result = run_benchmark(frames, args)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(result, output_file, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            print(compare_with_baseline(result, json.load(baseline_file)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
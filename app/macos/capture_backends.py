@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import threading
+import numpy as np
+from PySide6.QtCore import QPoint
+from PySide6.QtGui import QGuiApplication, QImage
+
+# mss 為選用套件（Linux / X11 上使用 MIT-SHM 擷取畫面）
+try:
+    import mss
+except ImportError:
+    mss = None
+
+
+# 重複使用的畫面緩衝區，避免每次擷取都重新配置記憶體
+class FrameBufferPool():
+    def __init__(self, max_buffers=8):
+        self.max_buffers = max_buffers
+        self._free_buffers = []
+        self._lock = threading.Lock()
+
+    def acquire(self, shape):
+        with self._lock:
+            for i, buffer in enumerate(self._free_buffers):
+                if buffer.shape == shape:
+                    return self._free_buffers.pop(i)
+        return np.empty(shape, dtype=np.uint8)
+
+    def release(self, buffer):
+        with self._lock:
+            if len(self._free_buffers) < self.max_buffers:
+                self._free_buffers.append(buffer)
+
+    def clear(self):
+        with self._lock:
+            self._free_buffers = []
+
+
+# 所有擷取方式的共同介面：grab(bbox) 回傳 (H, W, 3) 的 RGB numpy 陣列
+class CaptureBackend():
+    name = ""
+    # 若為 True，必須在 GUI thread 上擷取畫面
+    requires_gui_thread = False
+
+    def __init__(self):
+        self.buffer_pool = None
+
+    def grab(self, bbox):
+        raise NotImplementedError
+
+    def release(self, image):
+        # 畫面處理完畢後，將緩衝區歸還給 buffer pool
+        if self.buffer_pool is not None:
+            self.buffer_pool.release(image)
+
+    def close(self):
+        pass
+
+
+# 原本的擷取方式：PIL.ImageGrab（macOS 上透過系統的 screencapture）
+class ImageGrabCaptureBackend(CaptureBackend):
+    name = "imagegrab"
+
+    def grab(self, bbox):
+        # 使用其他擷取方式時不需載入 ImageGrab
+        from PIL import ImageGrab
+        screenshot = ImageGrab.grab(bbox=bbox)
+        if screenshot.mode != "RGB":
+            screenshot = screenshot.convert("RGB")
+        return np.asarray(screenshot)
+
+
+# 持續使用同一個 mss session（Linux 上為 XShmGetImage），直接將畫面寫入預先配置的緩衝區
+class MssCaptureBackend(CaptureBackend):
+    name = "mss"
+
+    def __init__(self):
+        super().__init__()
+        self.buffer_pool = FrameBufferPool()
+
+        # mss 的 session 不能跨執行緒使用，因此每個執行緒各自建立一個
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = mss.mss()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def grab(self, bbox):
+        left, top, right, bottom = bbox
+        screenshot = self._get_session().grab({"left": left, "top": top, "width": right - left, "height": bottom - top})
+
+        # mss 回傳 BGRA，逐一複製色彩通道到 RGB 緩衝區（不會產生額外的暫存陣列）
+        bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+        buffer = self.buffer_pool.acquire((screenshot.height, screenshot.width, 3))
+        buffer[..., 0] = bgra[..., 2]
+        buffer[..., 1] = bgra[..., 1]
+        buffer[..., 2] = bgra[..., 0]
+        return buffer
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+        self.buffer_pool.clear()
+
+
+# 使用 QScreen.grabWindow 擷取畫面（只能在 GUI thread 上呼叫）
+class QtCaptureBackend(CaptureBackend):
+    name = "qt"
+    requires_gui_thread = True
+
+    def __init__(self):
+        super().__init__()
+        self.buffer_pool = FrameBufferPool()
+
+    def grab(self, bbox):
+        left, top, right, bottom = bbox
+        screen = QGuiApplication.screenAt(QPoint(left, top)) or QGuiApplication.primaryScreen()
+        screen_geometry = screen.geometry()
+        pixmap = screen.grabWindow(0, left - screen_geometry.x(), top - screen_geometry.y(), right - left, bottom - top)
+
+        qimage = pixmap.toImage().convertToFormat(QImage.Format_RGB888)
+        width, height = qimage.width(), qimage.height()
+
+        # QImage 每一行可能有 padding，複製有效的像素到緩衝區
+        rows = np.frombuffer(qimage.constBits(), dtype=np.uint8).reshape(height, qimage.bytesPerLine())
+        buffer = self.buffer_pool.acquire((height, width, 3))
+        buffer.reshape(height, width * 3)[...] = rows[:, :width * 3]
+        return buffer
+
+
+def create_capture_backend(name):
+    if name == "mss" and mss is not None:
+        backend = MssCaptureBackend()
+    elif name == "qt":
+        backend = QtCaptureBackend()
+    else:
+        backend = ImageGrabCaptureBackend()
+
+    # 設定的擷取方式無法使用（未安裝 mss 或名稱錯誤）時改用 ImageGrab 並印出警告（正常情況不輸出任何訊息）
+    if backend.name != name:
+        reason = "未安裝 mss" if name == "mss" else "不支援的擷取方式"
+        print(f"[capture] 無法使用擷取方式 {name!r}（{reason}），改用 {backend.name}", file=sys.stderr)
+    return backend
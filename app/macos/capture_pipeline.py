@@ -0,0 +1,567 @@
+# -*- coding: utf-8 -*-
+
+import time
+import queue
+import threading
+from PySide6.QtCore import QObject, QThread, Signal
+
+from translator import *
+from ocr_cache import *
+from change_detector import *
+from dirty_regions import *
+from capture_backends import *
+from payload_encoder import *
+from stability_gate import *
+from ocr_engines import *
+from pipeline_stats import *
+from text_dedup import *
+from text_segmenter import *
+from async_requests import *
+from google_credentials import is_auth_error
+
+
+def put_latest(stage_queue, item, on_drop=None):
+    # 將 item 放入有界佇列，若佇列已滿則丟棄最舊的 item（即時翻譯只在乎最新的畫面）
+    while True:
+        try:
+            stage_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                dropped_item = stage_queue.get_nowait()
+            except queue.Empty:
+                continue
+            if on_drop is not None:
+                on_drop(dropped_item)
+
+
+def clear_queue(stage_queue, on_drop=None):
+    while True:
+        try:
+            dropped_item = stage_queue.get_nowait()
+        except queue.Empty:
+            return
+        if on_drop is not None:
+            on_drop(dropped_item)
+
+
+# 一個擷取區域（擷取視窗）自己的比對狀態；同一區域的畫面只在 diff stage 中依序比對
+class CaptureRegion():
+    def __init__(self, region_id, change_detector, dirty_region_tracker: DirtyRegionTracker,
+                 stability_gate: StabilityGate, text_deduplicator: TextDeduplicator = None):
+        self.region_id = region_id
+        self.change_detector = change_detector
+        self.dirty_region_tracker = dirty_region_tracker
+        self.stability_gate = stability_gate
+
+        # 辨識結果只因 OCR 雜訊而不同時，不再翻譯與更新介面
+        self.text_deduplicator = text_deduplicator if text_deduplicator is not None else TextDeduplicator()
+
+        # 上一次翻譯的句子，逐字出現的文字只需翻譯新完成的句子
+        self.incremental_translation = IncrementalTranslationState()
+        # 最後一次顯示的文字是否已穩定（以 pipeline 的 _lock 保護）
+        self.last_text_settled = True
+
+        # 只顯示比目前結果更新的畫面（以 pipeline 的 _lock 保護）
+        self.latest_ocr_seq = -1
+        self.latest_translation_seq = -1
+
+        # 比對狀態所屬的 pipeline generation；diff stage 看到較新的 generation 時才重設比對狀態
+        self.generation = 0
+
+    def reset_detection(self):
+        # 畫面比對的狀態只在 diff stage 的執行緒中使用，因此也只在 diff stage 中重設
+        self.change_detector.reset()
+        self.stability_gate.reset()
+        self.dirty_region_tracker.reset()
+
+    def reset_text(self):
+        # 以 pipeline 的 _lock 保護（OCR 與翻譯的 worker 也會使用）
+        self.text_deduplicator.reset()
+        self.incremental_translation.reset()
+        self.last_text_settled = True
+
+    def reset(self):
+        self.reset_detection()
+        self.reset_text()
+
+
+# 在 pipeline 中流動的單一畫面
+class CaptureFrame():
+    def __init__(self, seq, generation, region, bbox):
+        self.seq = seq
+        self.generation = generation
+        self.region = region
+        self.bbox = bbox
+        self.timestamp = time.monotonic()
+        self.image = None
+        self.payload = None
+        self.image_hash = None
+        self.band_layout = None
+        self.band_ranges = None
+        self.detected_text = None
+        # False 代表穩定等待逾時才放行，文字可能仍在逐字出現
+        self.text_settled = True
+
+
+# pipeline 中的一個 stage：從 input_queue 取出 frame，處理後放入 output_queue
+class PipelineStageThread(QThread):
+    def __init__(self, name, handler, input_queue, output_queue, stop_event, error_callback, release_callback):
+        super().__init__()
+        self.setObjectName(name)
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop_event = stop_event
+        self.error_callback = error_callback
+        self.release_callback = release_callback
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                frame = self.input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                result = self.handler(frame)
+            except Exception as e:
+                self.release_callback(frame)
+                self.error_callback(self.objectName(), e)
+                continue
+
+            # handler 回傳 None 代表此 frame 不需再往下傳
+            if result is None:
+                self.release_callback(frame)
+            elif self.output_queue is not None:
+                put_latest(self.output_queue, result, self.release_callback)
+
+
+# 擷取 → 比對 → 編碼 → OCR → 翻譯 的多執行緒 pipeline，結果透過 Qt signal 傳回 GUI thread
+class CapturePipeline(QObject):
+    # (擷取區域 id, 文字)
+    ocr_text_ready = Signal(int, str)
+    translation_ready = Signal(int, str)
+    stage_failed = Signal(str, str)
+    # diff stage 回報畫面是否有變化（供擷取間隔的自動調整使用）
+    frame_checked = Signal(bool)
+    # 文字尚未穩定時，要求在指定的毫秒數後再擷取一張畫面
+    resample_requested = Signal(int)
+    # API 呼叫因憑證失效而失敗
+    auth_failed = Signal()
+
+    # 每個擷取區域在每個佇列中可以等待的畫面數
+    QUEUE_SIZE = 2
+    OCR_WORKERS = 2
+    TRANSLATE_WORKERS = 2
+    # 同一次擷取中其他區域的畫面通常緊接著到達，OCR stage 最多等待這麼久將它們合併成一個請求
+    OCR_BATCH_WINDOW_MS = 50
+
+    def __init__(self, translator: Translator, ocr_cache: OcrResultCache, capture_backend: CaptureBackend,
+                 payload_encoder: PayloadEncoder, ocr_engine: OcrEngine, stats: PipelineStats,
+                 request_loop: AsyncRequestLoop = None, incremental_translation=True):
+        super().__init__()
+
+        # 螢幕擷取方式與 OCR 上傳圖片的編碼方式
+        self.capture_backend = capture_backend
+        self.payload_encoder = payload_encoder
+
+        # OCR 引擎與翻譯（GCP clients 由 MainMenuWindow 在憑證更新後設置）
+        self.ocr_engine = ocr_engine
+        self.translator = translator
+
+        # 只翻譯新完成的句子，尚未結束的句子先顯示原文
+        self.incremental_translation = incremental_translation
+
+        # 最近畫面的 OCR 結果快取（所有擷取區域共用）
+        self.ocr_cache = ocr_cache
+
+        # 擷取區域 id → CaptureRegion（各自的畫面比對、文字 band 與穩定狀態）
+        self._regions = {}
+
+        # 各 stage 的耗時與計數
+        self.stats = stats
+
+        # 若 OCR 引擎支援 async client，OCR 請求改由 event loop 同時送出（不再佔用 worker thread 等待回應）
+        self.request_loop = request_loop if ocr_engine.supports_async else None
+
+        self._seq = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        # 正在收集中的 OCR batch（擷取區域 id → frame）；其他 OCR worker 取得的畫面併入此 batch
+        self._collecting_batch = None
+        self._stop_event = threading.Event()
+
+        # stage 之間的有界佇列
+        self.grab_queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.diff_queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.encode_queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.ocr_queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.translate_queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._queues = [self.grab_queue, self.diff_queue, self.encode_queue, self.ocr_queue, self.translate_queue]
+
+        self._threads = [
+            self._create_stage("grab", self.grab_screen, self.grab_queue, self.diff_queue),
+            self._create_stage("diff", self.diff_screen, self.diff_queue, self.encode_queue),
+            self._create_stage("encode", self.encode_screen, self.encode_queue, self.ocr_queue),
+        ]
+        if self.request_loop is not None:
+            self._threads.append(self._create_stage("ocr", self.submit_ocr, self.ocr_queue, None))
+        else:
+            for i in range(self.OCR_WORKERS):
+                self._threads.append(self._create_stage(f"ocr-{i}", self.perform_ocr, self.ocr_queue, self.translate_queue))
+        for i in range(self.TRANSLATE_WORKERS):
+            self._threads.append(self._create_stage(f"translate-{i}", self.perform_translation, self.translate_queue, None))
+
+        self._started = False
+
+    def _create_stage(self, name, handler, input_queue, output_queue):
+        return PipelineStageThread(name, handler, input_queue, output_queue, self._stop_event,
+                                   self._handle_stage_error, self._release_frame)
+
+    def _release_frame(self, frame):
+        # 畫面已不再需要時，將緩衝區歸還給擷取方式重複使用
+        if frame.image is not None:
+            self.capture_backend.release(frame.image)
+            frame.image = None
+
+    def _handle_stage_error(self, stage_name, error):
+        self.stage_failed.emit(stage_name, str(error))
+        if is_auth_error(error):
+            self.auth_failed.emit()
+
+    def add_region(self, region: CaptureRegion):
+        with self._lock:
+            region.generation = self._generation
+            self._regions[region.region_id] = region
+        self._resize_queues()
+
+    def remove_region(self, region_id):
+        # 尚在處理中的畫面仍會完成，但其結果的 region_id 已不再顯示
+        with self._lock:
+            self._regions.pop(region_id, None)
+        self._resize_queues()
+
+    def _resize_queues(self):
+        # 每個擷取區域每次擷取都會送出一張畫面，佇列大小隨區域數增加，避免丟棄其他區域的畫面
+        maxsize = self.QUEUE_SIZE * max(len(self._regions), 1)
+        for stage_queue in self._queues:
+            with stage_queue.mutex:
+                stage_queue.maxsize = maxsize
+
+    def set_clients(self, client_vision, client_translate):
+        self.ocr_engine.set_client(client_vision)
+        self.translator.set_client(client_translate)
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            for thread in self._threads:
+                thread.start()
+
+    def warm_up(self):
+        # 開始擷取時預先建立 API 的連線，讓第一張畫面不需等待 TCP / TLS 與 token（在背景執行緒中進行）
+        if not self.ocr_engine.is_available():
+            return
+        threading.Thread(target=self._warm_up_clients, name="warm-up", daemon=True).start()
+        if self.request_loop is not None:
+            # 預熱不佔用 in-flight 名額（離線時可能要等到逾時），GUI thread 不會因此被阻擋
+            self.request_loop.submit(self.ocr_engine.warm_up_async, limited=False)
+
+    def _warm_up_clients(self):
+        try:
+            self.ocr_engine.warm_up()
+            self.translator.warm_up()
+        except Exception:
+            pass  # 預熱失敗時，第一次請求會自行建立連線
+
+    def reset(self):
+        # 清空所有佇列並讓尚在處理中的 frame 失效（開始 / 停止擷取時由 GUI thread 呼叫）；
+        # 各區域的畫面比對狀態可能正被 diff stage 使用，改由 diff stage 處理下一張畫面時重設
+        with self._lock:
+            self._generation += 1
+            for region in self._regions.values():
+                region.reset_text()
+        for stage_queue in self._queues:
+            clear_queue(stage_queue, self._release_frame)
+        self.ocr_cache.clear()
+
+    def shutdown(self):
+        self.reset()
+        self._stop_event.set()
+        # 先關閉 event loop（取消進行中的請求），正在等待 in-flight 名額的 OCR stage 才能結束
+        if self.request_loop is not None:
+            self.request_loop.close()
+        for thread in self._threads:
+            thread.wait()
+        self.capture_backend.close()
+
+    def submit(self, region_id, bbox):
+        # 由 GUI thread 的 QTimer 呼叫，只送出擷取範圍，不在 GUI thread 上做任何耗時的工作
+        with self._lock:
+            region = self._regions.get(region_id)
+            if region is None:
+                return
+            self._seq += 1
+            frame = CaptureFrame(self._seq, self._generation, region, bbox)
+
+        if self.capture_backend.requires_gui_thread:
+            # 例如 QScreen.grabWindow 只能在 GUI thread 上擷取，擷取後直接交給 diff stage
+            try:
+                self.grab_screen(frame)
+            except Exception as e:
+                self._handle_stage_error("grab", e)
+                return
+            put_latest(self.diff_queue, frame, self._release_frame)
+        else:
+            put_latest(self.grab_queue, frame, self._release_frame)
+
+    def _is_current(self, frame):
+        return frame.generation == self._generation
+
+    def grab_screen(self, frame):
+        # Capture the screen content within the window's geometry
+        start = time.perf_counter()
+        frame.image = self.capture_backend.grab(frame.bbox)
+        self.stats.record("grab", start)
+        self.stats.increment("frames_captured")
+        return frame
+
+    def diff_screen(self, frame):
+        start = time.perf_counter()
+        result = self._diff_screen(frame)
+        self.stats.record("diff", start)
+        return result
+
+    def _diff_screen(self, frame):
+        # 在每次执行 OCR 之前比较图像相似度
+        if not self._is_current(frame):
+            return None
+        region = frame.region
+        if region.generation != frame.generation:
+            # pipeline 重設後的第一張畫面：捨棄重設前的比對狀態（包含重設時仍在比對中的舊畫面所留下的狀態）
+            region.reset_detection()
+            region.generation = frame.generation
+        if region.change_detector.is_similar_to_previous(frame.image):
+            # 畫面回到上一張已辨識的內容，不需再等待穩定
+            region.stability_gate.reset()
+            self.stats.increment("frames_similar")
+            self.frame_checked.emit(False)
+            return None
+
+        # 文字仍在變化（例如逐字出現）時先不辨識，並要求盡快再取樣一次
+        if not region.stability_gate.update(frame.image, frame.timestamp):
+            self.stats.increment("frames_unstable")
+            self.frame_checked.emit(True)
+            self.resample_requested.emit(region.stability_gate.sample_interval_ms)
+            return None
+
+        # 保存当前图像作为上一次捕获的图像；等待逾時放行的畫面不保存，
+        # 文字停止變化後會再經過一次穩定等待，以完整的文字翻譯最後的句子
+        frame.text_settled = not region.stability_gate.timed_out
+        if frame.text_settled:
+            region.change_detector.set_previous(frame.image)
+
+        # 切割文字 band 並找出有變化的 band
+        frame.band_layout = region.dirty_region_tracker.plan(frame.image)
+        self.frame_checked.emit(True)
+
+        # 若畫面與最近辨識過的任一畫面相近，直接重用其 OCR 結果，不呼叫 Vision API
+        frame.image_hash = self.ocr_cache.compute_hash(frame.image)
+        cached_texts = self.ocr_cache.lookup(frame.image_hash)
+        if cached_texts is not None:
+            frame.detected_text = frame.band_layout.reuse_cached_texts(cached_texts)
+            self._release_frame(frame)
+            if self._publish_ocr_result(frame):
+                put_latest(self.translate_queue, frame)
+            return None
+
+        return frame
+
+    def encode_screen(self, frame):
+        # 只上傳有變化的 band（拼接成一張圖），整張畫面都需辨識時則上傳整張畫面
+        start = time.perf_counter()
+        dirty_bands = frame.band_layout.dirty_bands
+        if dirty_bands is None:
+            ocr_image = frame.image
+            frame.band_ranges = frame.band_layout.bands
+        else:
+            ocr_image, frame.band_ranges = stitch_bands(frame.image, frame.band_layout.bands, dirty_bands)
+
+        # 直接由擷取的畫面編碼成上傳用的灰階圖片
+        frame.payload = self.payload_encoder.encode(ocr_image)
+
+        # 編碼完成後已不再需要原始畫面
+        self._release_frame(frame)
+        self.stats.record("encode", start)
+        return frame
+
+    def perform_ocr(self, frame):
+        frames = self._collect_ocr_batch(frame)
+        if not frames:
+            return None
+
+        # 文字辨識（Google Vision 或本機的 OCR 引擎），多個擷取區域合併成一個請求
+        start = time.perf_counter()
+        try:
+            results = self.ocr_engine.recognize_batch([frame.payload.data for frame in frames])
+        finally:
+            self._record_ocr(frames, start)
+        self._finish_ocr_batch(frames, results)
+        return None
+
+    def submit_ocr(self, frame):
+        frames = self._collect_ocr_batch(frame)
+        if not frames:
+            return None
+
+        # 送出後立即處理下一張畫面；同時進行中的請求數由 request_loop 限制
+        start = time.perf_counter()
+        future = self.request_loop.submit(self.ocr_engine.recognize_batch_async, [frame.payload.data for frame in frames])
+        future.add_done_callback(lambda future: self._finish_ocr_async(frames, start, future))
+        return None
+
+    def _finish_ocr_async(self, frames, start, future):
+        # 在 event loop 的執行緒中呼叫；關閉時被取消的請求不需處理
+        if future.cancelled():
+            return
+        self._record_ocr(frames, start)
+        try:
+            results = future.result()
+        except Exception as e:
+            self._handle_stage_error("ocr", e)
+            return
+        self._finish_ocr_batch(frames, results)
+
+    def _collect_ocr_batch(self, frame):
+        # 收集同一次擷取中其他有變化的擷取區域；只有一個區域時不需等待
+        if not self.ocr_engine.is_available() or not self._is_current(frame):
+            return []
+        with self._lock:
+            if self._collecting_batch is not None:
+                # 同一區域有更新的畫面時，較舊的畫面不需再辨識
+                self._collecting_batch[frame.region.region_id] = frame
+                return []
+            frames = self._collecting_batch = {frame.region.region_id: frame}
+            batch_size = min(len(self._regions), self.ocr_engine.max_batch_size)
+
+        deadline = time.monotonic() + self.OCR_BATCH_WINDOW_MS / 1000
+        while True:
+            with self._lock:
+                if len(frames) >= batch_size:
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                next_frame = self.ocr_queue.get(timeout=min(remaining, 0.01))
+            except queue.Empty:
+                continue
+            if self._is_current(next_frame):
+                with self._lock:
+                    frames[next_frame.region.region_id] = next_frame
+
+        with self._lock:
+            self._collecting_batch = None
+        return list(frames.values())
+
+    def _finish_ocr_batch(self, frames, results):
+        # 依照順序將結果分配回各自的擷取區域
+        for frame, result in zip(frames, results):
+            if isinstance(result, Exception):
+                self._handle_stage_error("ocr", result)
+                continue
+            if self._apply_ocr_result(frame, result) is not None:
+                put_latest(self.translate_queue, frame, self._release_frame)
+
+    def _record_ocr(self, frames, start):
+        self.stats.record("ocr", start)
+        self.stats.increment("ocr_calls")
+        self.stats.increment("ocr_images", len(frames))
+        self.stats.increment("bytes_uploaded", sum(frame.payload.size for frame in frames))
+
+    def _apply_ocr_result(self, frame, result):
+        # 提取辨識到的文字，依位置分配到各個 band 後與未變化 band 的文字合併
+        if result:
+            band_texts = split_text_by_bands(result.text, result.words, frame.band_ranges)
+        else:
+            band_texts = [""] * len(frame.band_ranges)
+        frame.detected_text = frame.band_layout.merge_texts(band_texts)
+
+        # 沒有文字的畫面也記錄下來，避免重複送出
+        self.ocr_cache.store(frame.image_hash, frame.band_layout.texts)
+
+        if self._publish_ocr_result(frame):
+            return frame
+        return None
+
+    def _publish_ocr_result(self, frame):
+        if not frame.detected_text:
+            return False
+
+        region = frame.region
+        with self._lock:
+            # 多個 OCR worker 可能亂序完成，只顯示比該區域目前畫面更新的結果
+            if not self._is_current(frame) or frame.seq <= region.latest_ocr_seq:
+                return False
+            region.latest_ocr_seq = frame.seq
+            duplicate = region.text_deduplicator.is_duplicate(frame.detected_text)
+            # 上一次顯示的是未完成的文字時，穩定後的相同文字仍需翻譯（翻譯尚未結束的句子）
+            if duplicate and frame.text_settled and not region.last_text_settled:
+                duplicate = False
+            if not duplicate:
+                region.last_text_settled = frame.text_settled
+        if duplicate:
+            # 與目前顯示的文字相同（只差在 OCR 雜訊），不需再翻譯
+            self.stats.increment("text_duplicates")
+            return False
+        self.ocr_text_ready.emit(region.region_id, frame.detected_text)
+        return True
+
+    def perform_translation(self, frame):
+        if self.translator.client_translate is None:
+            return None
+
+        # Google 翻譯（每個句子 / 行分別查詢翻譯快取）
+        start = time.perf_counter()
+        unescape_translated_text = self._translate_segments(frame, frame.detected_text)
+        self.stats.record("translate", start)
+
+        region = frame.region
+        with self._lock:
+            if not self._is_current(frame) or frame.seq <= region.latest_translation_seq:
+                return None
+            region.latest_translation_seq = frame.seq
+        self.translation_ready.emit(region.region_id, unescape_translated_text)
+        return None
+
+    def _translate_segments(self, frame, text):
+        # 將文字切成句子與行，每個片段分別作為翻譯快取的 key，只有沒翻譯過的片段會合併成一個請求送出
+        paragraphs, unfinished = segment_text(text)
+        segments = [segment for paragraph in paragraphs for segment in paragraph]
+        if self.incremental_translation:
+            translations = self._translate_incremental(frame, segments, unfinished)
+        else:
+            translations = self.translator.translate_many(segments)
+        return rebuild_text(paragraphs, translations, self.translator.target_language)
+
+    def _translate_incremental(self, frame, segments, unfinished):
+        # 與上一次的文字共同的開頭片段沿用上一次的翻譯，只翻譯新的片段
+        state = frame.region.incremental_translation
+        previous_segments, previous_translations = state.snapshot()
+        prefix_length = stable_prefix_length(previous_segments, segments)
+        translations = previous_translations[:prefix_length] + [None] * (len(segments) - prefix_length)
+
+        # 上一次尚未翻譯、這次沒有變化的片段（已停止逐字出現）也需要翻譯
+        pending = [i for i, translation in enumerate(translations) if translation is None]
+        # 尚未結束且仍在變化的最後一個句子先顯示原文，文字穩定後才翻譯
+        if unfinished and not frame.text_settled and pending and pending[-1] == len(segments) - 1 >= prefix_length:
+            pending.pop()
+        for i, translation in zip(pending, self.translator.translate_many([segments[i] for i in pending])):
+            translations[i] = translation
+        with self._lock:
+            # pipeline 重設後，仍在翻譯中的舊畫面不會寫回已重設的狀態
+            if self._is_current(frame):
+                state.update(frame.seq, segments, translations)
+
+        return [translation if translation is not None else segment for segment, translation in zip(segments, translations)]
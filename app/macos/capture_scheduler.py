@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+# 設定頁面中「擷取頻率」選項對應的起始擷取間隔（毫秒）
+CAPTURE_FREQUENCY_INTERVALS = {
+    "高 (1 秒)": 1000,
+    "標準 (2 秒)": 2000,
+    "慢 (3 秒)": 3000,
+    "非常慢 (5 秒)": 5000,
+}
+
+
+def frequency_to_interval(frequency):
+    return CAPTURE_FREQUENCY_INTERVALS.get(frequency, CAPTURE_FREQUENCY_INTERVALS["標準 (2 秒)"])
+
+
+# 依照畫面是否有變化自動調整擷取間隔：偵測到變化後加快擷取（對話通常連續出現），畫面靜止時以指數方式放慢
+class AdaptiveCaptureScheduler(QObject):
+    interval_changed = Signal(int)
+
+    DEFAULT_MIN_INTERVAL_MS = 250
+    DEFAULT_MAX_INTERVAL_MS = 5000
+    BACKOFF_FACTOR = 1.5
+    BURST_TICKS = 3
+
+    def __init__(self, callback, min_interval_ms=DEFAULT_MIN_INTERVAL_MS, max_interval_ms=DEFAULT_MAX_INTERVAL_MS,
+                 parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.min_interval_ms = max(min_interval_ms, 50)
+        self.max_interval_ms = max(max_interval_ms, self.min_interval_ms)
+
+        self._interval_ms = self.max_interval_ms
+        self._burst_ticks = 0
+
+        # 每次擷取後依照新的間隔重新啟動的 single-shot timer
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def _clamp(self, interval_ms):
+        return int(min(max(interval_ms, self.min_interval_ms), self.max_interval_ms))
+
+    def _set_interval(self, interval_ms):
+        interval_ms = self._clamp(interval_ms)
+        if interval_ms != self._interval_ms:
+            self._interval_ms = interval_ms
+            self.interval_changed.emit(interval_ms)
+
+    def get_interval(self):
+        return self._interval_ms
+
+    def is_active(self):
+        return self._timer.isActive()
+
+    def start(self, initial_interval_ms):
+        self._burst_ticks = 0
+        self._set_interval(initial_interval_ms)
+        self._timer.start(self._interval_ms)
+
+    def stop(self):
+        self._timer.stop()
+
+    def _on_timeout(self):
+        self.callback()
+
+        # 先假設畫面沒有變化並放慢；若之後收到變化通知，會立刻切回最短間隔
+        if self._burst_ticks > 0:
+            self._burst_ticks -= 1
+        else:
+            self._set_interval(self._interval_ms * self.BACKOFF_FACTOR)
+        self._timer.start(self._interval_ms)
+
+    def notify_frame_checked(self, changed):
+        # 由 pipeline 的 diff stage 回報擷取的畫面是否有變化
+        if not changed or not self._timer.isActive():
+            return
+        self._burst_ticks = self.BURST_TICKS
+        self._set_interval(self.min_interval_ms)
+
+        # 下一次擷取排得比最短間隔還晚時，提前到最短間隔
+        if self._timer.remainingTime() > self._interval_ms:
+            self._timer.start(self._interval_ms)
+
+    def request_capture(self, delay_ms):
+        # 提前下一次擷取（例如等待文字穩定時的快速取樣），不影響目前的擷取間隔
+        if self._timer.isActive() and self._timer.remainingTime() > delay_ms:
+            self._timer.start(delay_ms)
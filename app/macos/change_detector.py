@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from image_hash import *
+
+
+# 比對目前畫面與上一張已辨識畫面的方法
+CHANGE_DETECTION_METHODS = ["thumbnail", "template_match", "text_mask"]
+
+
+# 原本的比對方法：以全解析度畫面做 cv2.matchTemplate
+class TemplateMatchChangeDetector():
+    def __init__(self, similarity_threshold=0.95):
+        # 设定相似度阈值，可以根据具体需求调整
+        self.similarity_threshold = similarity_threshold
+        self.previous_cv = None
+
+    def reset(self):
+        self.previous_cv = None
+
+    def set_previous(self, image):
+        # 將PIL圖像轉換為OpenCV格式（cv2 只在使用此比對方法時才載入）
+        import cv2
+        self.previous_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+
+    def is_similar_to_previous(self, current_image):
+        # 将当前图像与上一次捕获的图像进行相似度比较
+        if self.previous_cv is None:
+            return False
+
+        import cv2
+        current_cv = cv2.cvtColor(np.array(current_image), cv2.COLOR_RGB2BGR)
+
+        # 擷取視窗大小改變時 matchTemplate 無法比較，視為不相似
+        if current_cv.shape != self.previous_cv.shape:
+            return False
+
+        # 使用OpenCV的相似度比较方法
+        result = cv2.matchTemplate(current_cv, self.previous_cv, cv2.TM_CCOEFF_NORMED)
+
+        # 获取最大匹配值
+        max_similarity = np.max(result)
+
+        if max_similarity == 1.0:
+            check_result = cv2.matchTemplate(self.previous_cv, current_cv, cv2.TM_CCOEFF_NORMED)
+            check_max_similarity = np.max(check_result)
+
+            # 与上一次图像相似 / 不相似
+            return bool(check_max_similarity != 0.0)
+
+        return bool(max_similarity >= self.similarity_threshold)
+
+
+# 以區域平均（BOX 縮放）計算每個區塊的平均亮度，區塊數量有上限，比對成本不會隨擷取範圍無限制地增加
+class ThumbnailChangeDetector():
+    # 區塊大小（像素）；擷取範圍很大時區塊會放大，使區塊數量不超過 MAX_COLUMNS x MAX_ROWS
+    BLOCK_SIZE = 4
+    MAX_COLUMNS = 512
+    MAX_ROWS = 128
+
+    def __init__(self, block_threshold=8.0, changed_block_ratio=0.0):
+        # 區塊平均亮度的變化超過 block_threshold 即視為該區塊有變化
+        self.block_threshold = block_threshold
+        # 有變化的區塊比例超過 changed_block_ratio 即視為畫面有變化
+        self.changed_block_ratio = changed_block_ratio
+        self.previous_blocks = None
+        self.previous_size = None
+
+        # 記住最後一次比較時計算的區塊，set_previous 時不需重新計算
+        self._last_image = None
+        self._last_blocks = None
+
+    def reset(self):
+        self.previous_blocks = None
+        self.previous_size = None
+        self._last_image = None
+        self._last_blocks = None
+
+    def _compute_blocks(self, image):
+        # 區塊內每個像素都列入平均（最近鄰取樣可能跳過細小的筆畫，漏掉單一字元的變化）
+        width, height = image_size(image)
+        columns = min(max(width // self.BLOCK_SIZE, 1), self.MAX_COLUMNS)
+        rows = min(max(height // self.BLOCK_SIZE, 1), self.MAX_ROWS)
+        return to_gray_thumbnail(image, columns, rows)
+
+    def set_previous(self, image):
+        # 畫面緩衝區會被重複使用，因此只在緊接著比較之後才沿用已計算的區塊
+        if image is self._last_image:
+            self.previous_blocks = self._last_blocks
+        else:
+            self.previous_blocks = self._compute_blocks(image)
+        self.previous_size = image_size(image)
+        self._last_image = None
+        self._last_blocks = None
+
+    def is_similar_to_previous(self, current_image):
+        if self.previous_blocks is None or image_size(current_image) != self.previous_size:
+            return False
+
+        current_blocks = self._compute_blocks(current_image)
+        self._last_image = current_image
+        self._last_blocks = current_blocks
+        changed_blocks = np.abs(current_blocks - self.previous_blocks) > self.block_threshold
+        return bool(changed_blocks.mean() <= self.changed_block_ratio)
+
+
+def neighborhood_extremes(grid, radius=1):
+    # 每個像素 (2r+1)x(2r+1) 鄰域的最大值與最小值（以位移後的陣列向量化計算，先水平再垂直）
+    padded = np.pad(grid, radius, mode="edge")
+    height, width = grid.shape
+    size = 2 * radius + 1
+    extremes = []
+    for reduce in (np.maximum.reduce, np.minimum.reduce):
+        rows = reduce([padded[:, dx:dx + width] for dx in range(size)])
+        extremes.append(reduce([rows[dy:dy + height] for dy in range(size)]))
+    return extremes[0], extremes[1]
+
+
+def dilate(mask):
+    # 3x3 dilation
+    padded = np.pad(mask, 1)
+    height, width = mask.shape
+    return np.logical_or.reduce([padded[dy:dy + height, dx:dx + width] for dy in range(3) for dx in range(3)])
+
+
+def parse_text_color(text_color):
+    # "#RRGGBB" → (r, g, b)；空字串代表不依顏色判斷
+    if not text_color:
+        return None
+    text_color = text_color.lstrip("#")
+    return tuple(int(text_color[i:i + 2], 16) for i in range(0, 6, 2))
+
+
+# 只比較「像文字」的像素：字幕的筆畫與描邊在很小的範圍內有強烈的明暗對比，而移動的背景通常沒有，
+# 因此背景變化不會觸發 OCR，只有文字出現、消失或改變時才視為有變化
+class TextMaskChangeDetector():
+    GRID_WIDTH = 640
+    GRID_MIN_HEIGHT = 8
+    GRID_MAX_HEIGHT = 240
+    BLOCK_SIZE = 16
+    # 鄰域的半徑（取樣點）
+    NEIGHBORHOOD_RADIUS = 2
+    # 筆畫（最亮）與描邊（最暗）的像素與鄰域極值的容許差距；兩者之間的過渡像素常受背景影響，不列入比較
+    CORE_TOLERANCE = 48
+    # 文字像素的亮度變化超過此值才視為改變
+    PIXEL_CHANGE_THRESHOLD = 96
+
+    def __init__(self, stroke_contrast=128, block_changed_pixels=8, text_color=None, color_tolerance=60):
+        # 鄰域的亮度差超過 stroke_contrast 的像素才可能是文字的筆畫或描邊
+        self.stroke_contrast = stroke_contrast
+        # 任一區塊中改變的文字像素（以原始解析度的像素數計算）超過 block_changed_pixels 即視為文字有變化
+        self.block_changed_pixels = block_changed_pixels
+        # 若設置字幕顏色，只保留該顏色的筆畫（及其描邊）
+        self.text_color = parse_text_color(text_color)
+        self.color_tolerance = color_tolerance
+
+        # 上一張已辨識畫面的 (灰階取樣網格, 文字 mask)
+        self.previous = None
+        self.previous_size = None
+
+        # 記住最後一次比較時計算的結果，set_previous 時不需重新計算
+        self._last_image = None
+        self._last = None
+
+    def reset(self):
+        self.previous = None
+        self.previous_size = None
+        self._last_image = None
+        self._last = None
+
+    def _grid_size(self, image):
+        # 保持擷取範圍的長寬比例，筆畫才不會在取樣時變形
+        width, height = image_size(image)
+        grid_width = min(self.GRID_WIDTH, width)
+        grid_height = round(grid_width * height / max(width, 1))
+        return grid_width, min(max(grid_height, self.GRID_MIN_HEIGHT), self.GRID_MAX_HEIGHT)
+
+    def compute_text_mask(self, image):
+        grid_width, grid_height = self._grid_size(image)
+        if self.text_color is None:
+            grid = sample_gray_grid(image, grid_width, grid_height)
+        else:
+            rgb = sample_rgb_grid(image, grid_width, grid_height)
+            grid = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+        local_max, local_min = neighborhood_extremes(grid, self.NEIGHBORHOOD_RADIUS)
+        strong_contrast = (local_max - local_min) >= self.stroke_contrast
+        mask = strong_contrast & ((grid >= local_max - self.CORE_TOLERANCE) | (grid <= local_min + self.CORE_TOLERANCE))
+        if self.text_color is not None:
+            color_mask = np.abs(rgb - np.array(self.text_color, dtype=np.int16)).max(axis=2) <= self.color_tolerance
+            mask &= dilate(color_mask)
+        return grid, mask
+
+    def set_previous(self, image):
+        # 畫面緩衝區會被重複使用，因此只在緊接著比較之後才沿用已計算的結果
+        if image is self._last_image:
+            self.previous = self._last
+        else:
+            self.previous = self.compute_text_mask(image)
+        self.previous_size = image_size(image)
+        self._last_image = None
+        self._last = None
+
+    def is_similar_to_previous(self, current_image):
+        if self.previous is None or image_size(current_image) != self.previous_size:
+            return False
+
+        current_grid, current_mask = self._last = self.compute_text_mask(current_image)
+        self._last_image = current_image
+        previous_grid, previous_mask = self.previous
+
+        # 只在任一張畫面中像文字的像素上比較亮度（文字出現、消失或改變），背景的變化不列入
+        changed = (previous_mask | current_mask) & (np.abs(current_grid - previous_grid) > self.PIXEL_CHANGE_THRESHOLD)
+
+        # 以區塊計算，少量文字（例如一個數字）的變化也不會被整張畫面平均掉
+        height, width = changed.shape
+        rows, cols = -(-height // self.BLOCK_SIZE), -(-width // self.BLOCK_SIZE)
+        padded = np.zeros((rows * self.BLOCK_SIZE, cols * self.BLOCK_SIZE), dtype=np.int32)
+        padded[:height, :width] = changed
+        block_counts = padded.reshape(rows, self.BLOCK_SIZE, cols, self.BLOCK_SIZE).sum(axis=(1, 3))
+
+        # 網格比原始畫面小時，每個取樣點代表多個像素：依取樣比例縮小門檻，大的擷取範圍中一個數字的變化才不會被忽略
+        image_width, image_height = image_size(current_image)
+        sampling_ratio = (width * height) / max(image_width * image_height, 1)
+        return bool(block_counts.max() <= self.block_changed_pixels * sampling_ratio)
+
+
+def create_change_detector(method, text_color="", stroke_contrast=128):
+    if method == "template_match":
+        return TemplateMatchChangeDetector()
+    if method == "text_mask":
+        return TextMaskChangeDetector(stroke_contrast, text_color=text_color)
+    return ThumbnailChangeDetector()
@@ -3,6 +3,9 @@
 import os
 import sys
 import toml
+import atexit
+import shutil
+import threading
 
 
 class ConfigHandler():
@@ -11,20 +14,80 @@ class ConfigHandler():
     DEFAULT_CAPTURE_FREQUENCY = "標準 (2 秒)"
     DEFAULT_AUTO_RECAPTURE_STATE = 0
     DEFAULT_GOOGLE_CREDENTIAL_PATH = ""
+    DEFAULT_TRANSLATION_CACHE_MAX_ENTRIES = 5000
+    DEFAULT_TRANSLATION_CACHE_MAX_MB = 8
+    DEFAULT_TRANSLATION_MEMORY = True
+    DEFAULT_TRANSLATION_MEMORY_MAX_MB = 64
+    DEFAULT_OCR_CACHE_SIZE = 32
+    DEFAULT_OCR_CACHE_MAX_DISTANCE = 2
+    DEFAULT_CHANGE_DETECTION_METHOD = "thumbnail"
+    DEFAULT_TEXT_MASK_COLOR = ""
+    DEFAULT_TEXT_MASK_STROKE_CONTRAST = 128
+    DEFAULT_DIRTY_REGION_MAX_BANDS = 6
+    DEFAULT_CAPTURE_BACKEND = "imagegrab"
+    DEFAULT_OCR_PAYLOAD_CODEC = "png"
+    DEFAULT_OCR_PAYLOAD_COMPRESSION_LEVEL = 6
+    DEFAULT_OCR_PAYLOAD_BINARIZE = False
+    DEFAULT_CAPTURE_MIN_INTERVAL_MS = 250
+    DEFAULT_CAPTURE_MAX_INTERVAL_MS = 5000
+    DEFAULT_STABILITY_SETTLE_MS = 300
+    DEFAULT_STABILITY_MAX_WAIT_MS = 1500
+    DEFAULT_STABILITY_SAMPLE_INTERVAL_MS = 100
+    DEFAULT_OCR_ENGINE = "google"
+    DEFAULT_TESSERACT_PATH = "tesseract"
+    DEFAULT_TESSERACT_LANGUAGE = "eng"
+    DEFAULT_CREDENTIAL_VALIDATION_TTL_HOURS = 24
+    DEFAULT_ASYNC_OCR_REQUESTS = True
+    DEFAULT_MAX_IN_FLIGHT_REQUESTS = 4
+    DEFAULT_MAX_CAPTURE_REGIONS = 4
+    DEFAULT_TEXT_DEDUP_MAX_DISTANCE_RATIO = 0.08
+    DEFAULT_INCREMENTAL_TRANSLATION = True
+    DEFAULT_TRANSLATION_HISTORY_SIZE = 500
+    DEFAULT_TARGET_LANGUAGE = "zh-TW"
+
+    # 設定改變後延遲寫入磁碟的時間（連續的變更只會寫入一次）
+    FLUSH_DELAY_SECONDS = 0.5
     
 
     def __init__(self):
         if getattr(sys, 'frozen', False):
-            # 应用程序被打包
-            app_dir = sys._MEIPASS
+            # 应用程序被打包：sys._MEIPASS 是唯讀的暫存資料夾，設定檔改存放在使用者的資料夾
+            app_dir = self._user_data_dir()
+            os.makedirs(app_dir, exist_ok=True)
             self.config_file_path = os.path.join(app_dir, "config.toml")
+
+            # 第一次執行時沿用打包在 App 中的設定檔
+            bundled_config_file_path = os.path.join(sys._MEIPASS, "config.toml")
+            if not os.path.exists(self.config_file_path) and os.path.exists(bundled_config_file_path):
+                shutil.copyfile(bundled_config_file_path, self.config_file_path)
         else:
             current_dir = os.path.dirname(os.path.abspath(__file__))
             app_dir = os.path.dirname(os.path.dirname(current_dir))
             self.config_file_path = os.path.join(app_dir, "config.toml")
 
+        # 設定只在記憶體中修改，由背景的 timer 延遲寫入磁碟
+        self._lock = threading.Lock()
+        self._flush_timer = None
+        self._dirty = False
+        self._subscribers = []
+
         self.config = self.read_config_file()
 
+        # 結束程式時寫入尚未儲存的設定
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _user_data_dir():
+        if sys.platform == "darwin":
+            return os.path.expanduser("~/Library/Application Support/BabelTower")
+        if sys.platform == "win32":
+            return os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), "BabelTower")
+        return os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")), "BabelTower")
+
+    def get_data_dir(self):
+        # 設定檔所在的資料夾，其他需要寫入的檔案（快取等）也存放在這裡
+        return os.path.dirname(self.config_file_path)
+
 
     def read_config_file(self):
         # 檢查是否有 config file
@@ -46,35 +109,100 @@ class ConfigHandler():
                 "capture_frequency": self.DEFAULT_CAPTURE_FREQUENCY,
                 "auto_recapture_state": self.DEFAULT_AUTO_RECAPTURE_STATE,
                 "google_cloud_key_file_path": self.DEFAULT_GOOGLE_CREDENTIAL_PATH,
+                "translation_cache_max_entries": self.DEFAULT_TRANSLATION_CACHE_MAX_ENTRIES,
+                "translation_cache_max_mb": self.DEFAULT_TRANSLATION_CACHE_MAX_MB,
+                "translation_memory": self.DEFAULT_TRANSLATION_MEMORY,
+                "translation_memory_max_mb": self.DEFAULT_TRANSLATION_MEMORY_MAX_MB,
+                "ocr_cache_size": self.DEFAULT_OCR_CACHE_SIZE,
+                "ocr_cache_max_distance": self.DEFAULT_OCR_CACHE_MAX_DISTANCE,
+                "change_detection_method": self.DEFAULT_CHANGE_DETECTION_METHOD,
+                "text_mask_color": self.DEFAULT_TEXT_MASK_COLOR,
+                "text_mask_stroke_contrast": self.DEFAULT_TEXT_MASK_STROKE_CONTRAST,
+                "dirty_region_max_bands": self.DEFAULT_DIRTY_REGION_MAX_BANDS,
+                "capture_backend": self.DEFAULT_CAPTURE_BACKEND,
+                "ocr_payload_codec": self.DEFAULT_OCR_PAYLOAD_CODEC,
+                "ocr_payload_compression_level": self.DEFAULT_OCR_PAYLOAD_COMPRESSION_LEVEL,
+                "ocr_payload_binarize": self.DEFAULT_OCR_PAYLOAD_BINARIZE,
+                "capture_min_interval_ms": self.DEFAULT_CAPTURE_MIN_INTERVAL_MS,
+                "capture_max_interval_ms": self.DEFAULT_CAPTURE_MAX_INTERVAL_MS,
+                "stability_settle_ms": self.DEFAULT_STABILITY_SETTLE_MS,
+                "stability_max_wait_ms": self.DEFAULT_STABILITY_MAX_WAIT_MS,
+                "stability_sample_interval_ms": self.DEFAULT_STABILITY_SAMPLE_INTERVAL_MS,
+                "ocr_engine": self.DEFAULT_OCR_ENGINE,
+                "tesseract_path": self.DEFAULT_TESSERACT_PATH,
+                "tesseract_language": self.DEFAULT_TESSERACT_LANGUAGE,
+                "credential_validation_ttl_hours": self.DEFAULT_CREDENTIAL_VALIDATION_TTL_HOURS,
+                "async_ocr_requests": self.DEFAULT_ASYNC_OCR_REQUESTS,
+                "max_in_flight_requests": self.DEFAULT_MAX_IN_FLIGHT_REQUESTS,
+                "max_capture_regions": self.DEFAULT_MAX_CAPTURE_REGIONS,
+                "text_dedup_max_distance_ratio": self.DEFAULT_TEXT_DEDUP_MAX_DISTANCE_RATIO,
+                "incremental_translation": self.DEFAULT_INCREMENTAL_TRANSLATION,
+                "translation_history_size": self.DEFAULT_TRANSLATION_HISTORY_SIZE,
+                "target_language": self.DEFAULT_TARGET_LANGUAGE,
             },
         }
-        with open(self.config_file_path, "w") as config_file:
-            toml.dump(default_config, config_file)
+        self._write_config_file(default_config)
+
+    def _write_config_file(self, config):
+        # 先寫入暫存檔再以 os.replace 取代，寫入途中結束程式也不會留下損毀的設定檔
+        temp_file_path = self.config_file_path + ".tmp"
+        with open(temp_file_path, "w") as config_file:
+            toml.dump(config, config_file)
+        os.replace(temp_file_path, self.config_file_path)
+
+    def subscribe(self, callback):
+        # callback(key, value) 會在設定改變時被呼叫（在呼叫 set_* 的執行緒上）
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _set(self, key, value):
+        with self._lock:
+            settings = self.config.setdefault("Settings", {})
+            if settings.get(key) == value:
+                return
+            settings[key] = value
+            self._dirty = True
+
+            # debounce：重新開始計時，連續的變更只會寫入一次
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(self.FLUSH_DELAY_SECONDS, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+        for callback in list(self._subscribers):
+            callback(key, value)
+
+    def flush(self):
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            try:
+                self._write_config_file(self.config)
+            except OSError:
+                self._dirty = True  # 下次再嘗試寫入
 
     def set_font_size(self, new_font_size):
-        self.config["Settings"]["text_font_size"] = new_font_size
-        with open(self.config_file_path, 'w') as f:
-            toml.dump(self.config, f)
+        self._set("text_font_size", new_font_size)
     
     def set_font_color(self, new_font_color):
-        self.config["Settings"]["text_font_color"] = new_font_color
-        with open(self.config_file_path, 'w') as f:
-            toml.dump(self.config, f)
+        self._set("text_font_color", new_font_color)
     
     def set_capture_frequency(self, new_capture_frequency):
-        self.config["Settings"]["capture_frequency"] = new_capture_frequency
-        with open(self.config_file_path, 'w') as f:
-            toml.dump(self.config, f)
+        self._set("capture_frequency", new_capture_frequency)
             
     def set_auto_recapture_state(self, new_state):
-        self.config["Settings"]["auto_recapture_state"] = new_state
-        with open(self.config_file_path, 'w') as f:
-            toml.dump(self.config, f)
+        self._set("auto_recapture_state", new_state)
     
     def set_google_credential_path(self, new_google_credential_path):
-        self.config["Settings"]["google_cloud_key_file_path"] = new_google_credential_path
-        with open(self.config_file_path, 'w') as f:
-            toml.dump(self.config, f)
+        self._set("google_cloud_key_file_path", new_google_credential_path)
 
     def get_font_size(self):
         return self.config.get('Settings', {}).get('text_font_size', self.DEFAULT_FONT_SIZE)
@@ -91,3 +219,92 @@ class ConfigHandler():
     def get_google_credential_path(self):
         return self.config.get('Settings', {}).get('google_cloud_key_file_path', self.DEFAULT_GOOGLE_CREDENTIAL_PATH)
 
+    def get_translation_cache_max_entries(self):
+        return self.config.get('Settings', {}).get('translation_cache_max_entries', self.DEFAULT_TRANSLATION_CACHE_MAX_ENTRIES)
+
+    def get_translation_cache_max_mb(self):
+        return self.config.get('Settings', {}).get('translation_cache_max_mb', self.DEFAULT_TRANSLATION_CACHE_MAX_MB)
+
+    def get_translation_memory(self):
+        return self.config.get('Settings', {}).get('translation_memory', self.DEFAULT_TRANSLATION_MEMORY)
+
+    def get_translation_memory_max_mb(self):
+        return self.config.get('Settings', {}).get('translation_memory_max_mb', self.DEFAULT_TRANSLATION_MEMORY_MAX_MB)
+
+    def get_ocr_cache_size(self):
+        return self.config.get('Settings', {}).get('ocr_cache_size', self.DEFAULT_OCR_CACHE_SIZE)
+
+    def get_ocr_cache_max_distance(self):
+        return self.config.get('Settings', {}).get('ocr_cache_max_distance', self.DEFAULT_OCR_CACHE_MAX_DISTANCE)
+
+    def get_change_detection_method(self):
+        return self.config.get('Settings', {}).get('change_detection_method', self.DEFAULT_CHANGE_DETECTION_METHOD)
+
+    def get_text_mask_color(self):
+        return self.config.get('Settings', {}).get('text_mask_color', self.DEFAULT_TEXT_MASK_COLOR)
+
+    def get_text_mask_stroke_contrast(self):
+        return self.config.get('Settings', {}).get('text_mask_stroke_contrast', self.DEFAULT_TEXT_MASK_STROKE_CONTRAST)
+
+    def get_dirty_region_max_bands(self):
+        return self.config.get('Settings', {}).get('dirty_region_max_bands', self.DEFAULT_DIRTY_REGION_MAX_BANDS)
+
+    def get_capture_backend(self):
+        return self.config.get('Settings', {}).get('capture_backend', self.DEFAULT_CAPTURE_BACKEND)
+
+    def get_ocr_payload_codec(self):
+        return self.config.get('Settings', {}).get('ocr_payload_codec', self.DEFAULT_OCR_PAYLOAD_CODEC)
+
+    def get_ocr_payload_compression_level(self):
+        return self.config.get('Settings', {}).get('ocr_payload_compression_level', self.DEFAULT_OCR_PAYLOAD_COMPRESSION_LEVEL)
+
+    def get_ocr_payload_binarize(self):
+        return self.config.get('Settings', {}).get('ocr_payload_binarize', self.DEFAULT_OCR_PAYLOAD_BINARIZE)
+
+    def get_capture_min_interval_ms(self):
+        return self.config.get('Settings', {}).get('capture_min_interval_ms', self.DEFAULT_CAPTURE_MIN_INTERVAL_MS)
+
+    def get_capture_max_interval_ms(self):
+        return self.config.get('Settings', {}).get('capture_max_interval_ms', self.DEFAULT_CAPTURE_MAX_INTERVAL_MS)
+
+    def get_stability_settle_ms(self):
+        return self.config.get('Settings', {}).get('stability_settle_ms', self.DEFAULT_STABILITY_SETTLE_MS)
+
+    def get_stability_max_wait_ms(self):
+        return self.config.get('Settings', {}).get('stability_max_wait_ms', self.DEFAULT_STABILITY_MAX_WAIT_MS)
+
+    def get_stability_sample_interval_ms(self):
+        return self.config.get('Settings', {}).get('stability_sample_interval_ms', self.DEFAULT_STABILITY_SAMPLE_INTERVAL_MS)
+
+    def get_ocr_engine(self):
+        return self.config.get('Settings', {}).get('ocr_engine', self.DEFAULT_OCR_ENGINE)
+
+    def get_tesseract_path(self):
+        return self.config.get('Settings', {}).get('tesseract_path', self.DEFAULT_TESSERACT_PATH)
+
+    def get_tesseract_language(self):
+        return self.config.get('Settings', {}).get('tesseract_language', self.DEFAULT_TESSERACT_LANGUAGE)
+
+    def get_credential_validation_ttl_hours(self):
+        return self.config.get('Settings', {}).get('credential_validation_ttl_hours', self.DEFAULT_CREDENTIAL_VALIDATION_TTL_HOURS)
+
+    def get_async_ocr_requests(self):
+        return self.config.get('Settings', {}).get('async_ocr_requests', self.DEFAULT_ASYNC_OCR_REQUESTS)
+
+    def get_max_in_flight_requests(self):
+        return self.config.get('Settings', {}).get('max_in_flight_requests', self.DEFAULT_MAX_IN_FLIGHT_REQUESTS)
+
+    def get_max_capture_regions(self):
+        return self.config.get('Settings', {}).get('max_capture_regions', self.DEFAULT_MAX_CAPTURE_REGIONS)
+
+    def get_text_dedup_max_distance_ratio(self):
+        return self.config.get('Settings', {}).get('text_dedup_max_distance_ratio', self.DEFAULT_TEXT_DEDUP_MAX_DISTANCE_RATIO)
+
+    def get_incremental_translation(self):
+        return self.config.get('Settings', {}).get('incremental_translation', self.DEFAULT_INCREMENTAL_TRANSLATION)
+
+    def get_translation_history_size(self):
+        return self.config.get('Settings', {}).get('translation_history_size', self.DEFAULT_TRANSLATION_HISTORY_SIZE)
+
+    def get_target_language(self):
+        return self.config.get('Settings', {}).get('target_language', self.DEFAULT_TARGET_LANGUAGE)
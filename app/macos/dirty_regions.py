@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import numpy as np
+
+from image_hash import *
+
+
+# 尋找文字行時使用的取樣寬度（保留全部的行，只對欄做取樣）
+PROFILE_WIDTH = 256
+
+
+def find_text_bands(image, max_bands, min_gap=4):
+    # 將擷取範圍切成數個水平 band，band 的邊界落在文字行之間的空白處，所有 band 合起來涵蓋整張畫面
+    width, height = image_size(image)
+    if max_bands <= 1 or height < 2 * min_gap:
+        return [(0, height)]
+
+    grid = sample_gray_grid(image, min(PROFILE_WIDTH, width), height)
+
+    # 每一行的水平梯度平均值：文字行的值高，行與行之間的空白處值低
+    row_energy = np.abs(np.diff(grid, axis=1)).mean(axis=1)
+    threshold = max(1.0, 0.05 * float(np.percentile(row_energy, 90)))
+    text_rows = row_energy > threshold
+    if not text_rows.any():
+        return [(0, height)]
+
+    # 找出連續的文字行（run），忽略小於 min_gap 的空白
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], text_rows.astype(np.int8), [0]))))
+    runs = [[int(start), int(end)] for start, end in zip(edges[::2], edges[1::2])]
+    merged_runs = [runs[0]]
+    for start, end in runs[1:]:
+        if start - merged_runs[-1][1] < min_gap:
+            merged_runs[-1][1] = end
+        else:
+            merged_runs.append([start, end])
+
+    # band 太多時，合併間距最小的相鄰兩行
+    while len(merged_runs) > max_bands:
+        gaps = [merged_runs[i + 1][0] - merged_runs[i][1] for i in range(len(merged_runs) - 1)]
+        i = int(np.argmin(gaps))
+        merged_runs[i][1] = merged_runs[i + 1][1]
+        del merged_runs[i + 1]
+
+    # 以空白的中點作為 band 的邊界
+    bands = []
+    top = 0
+    for i in range(len(merged_runs) - 1):
+        bottom = (merged_runs[i][1] + merged_runs[i + 1][0]) // 2
+        bands.append((top, bottom))
+        top = bottom
+    bands.append((top, height))
+    return bands
+
+
+def crop_band(image, band):
+    top, bottom = band
+    if isinstance(image, np.ndarray):
+        return image[top:bottom]
+    return image.crop((0, top, image.size[0], bottom))
+
+
+def compute_band_hashes(image, bands):
+    # 以原始解析度的區塊平均亮度比較 band，縮成固定大小的 hash 會看不出單一字元（例如 3/5 → 4/5）的變化
+    return [fine_block_means(crop_band(image, band)) for band in bands]
+
+
+def stitch_bands(image, bands, band_indices, spacing=16):
+    # 將有變化的 band 垂直拼接成一張圖（中間留白），只需一次 OCR 請求
+    image = np.asarray(image)
+    crops = [crop_band(image, bands[i]) for i in band_indices]
+    height = sum(crop.shape[0] for crop in crops) + spacing * (len(crops) - 1)
+
+    # 以第一個像素的顏色（通常是背景色）填滿留白
+    stitched = np.empty((height,) + image.shape[1:], dtype=image.dtype)
+    stitched[...] = image[0, 0]
+    ranges = []
+    y = 0
+    for crop in crops:
+        stitched[y:y + crop.shape[0]] = crop
+        ranges.append((y, y + crop.shape[0]))
+        y += crop.shape[0] + spacing
+    return stitched, ranges
+
+
+def split_text_by_bands(detected_text, words, band_ranges):
+    # 依照每個單字 bounding box 的垂直位置，將 OCR 結果的每一行分配到對應的 band
+    band_lines = [[] for _ in band_ranges]
+    if not band_ranges:
+        return []
+
+    line_starts = []
+    position = 0
+    for line in detected_text.split("\n"):
+        line_starts.append((position, line))
+        position += len(line) + 1
+
+    # 找出每一個單字在 detected_text 中的位置以及所屬的 band
+    word_bands = []
+    cursor = 0
+    for word in words:
+        index = detected_text.find(word.text, cursor)
+        if index < 0:
+            continue
+        cursor = index + len(word.text)
+        band_index = len(band_ranges) - 1
+        for i, (top, bottom) in enumerate(band_ranges):
+            if word.center_y < bottom:
+                band_index = i
+                break
+        word_bands.append((index, band_index))
+
+    # 每一行以該行第一個單字所在的 band 為準，找不到單字的行則沿用上一行的 band
+    current_band = 0
+    word_position = 0
+    for line_start, line in line_starts:
+        line_end = line_start + len(line)
+        while word_position < len(word_bands) and word_bands[word_position][0] < line_start:
+            word_position += 1
+        if word_position < len(word_bands) and word_bands[word_position][0] < line_end:
+            current_band = word_bands[word_position][1]
+        if line:
+            band_lines[current_band].append(line)
+
+    return ["\n".join(lines) for lines in band_lines]
+
+
+# 一張畫面的 band 切割結果、每個 band 的 hash 與 OCR 文字
+class BandLayout():
+    def __init__(self, bands, hashes, previous=None, dirty_bands=None):
+        self.bands = bands
+        self.hashes = hashes
+        self.previous = previous
+        self.dirty_bands = dirty_bands
+        self.texts = None
+
+    def merge_texts(self, dirty_texts):
+        # 將有變化 band 的新文字與其餘 band 的舊文字合併
+        texts = list(self.previous.texts) if self.dirty_bands is not None else [""] * len(self.bands)
+        indices = self.dirty_bands if self.dirty_bands is not None else range(len(self.bands))
+        for i, text in zip(indices, dirty_texts):
+            texts[i] = text
+        self.texts = texts
+        self.previous = None  # 不再需要上一張畫面的資料
+        return self.get_text()
+
+    def reuse_cached_texts(self, cached_texts):
+        # OCR 快取命中時記錄每個 band 的文字，下一張畫面仍可只辨識有變化的 band；
+        # band 的數量不同時無法對應，下一張畫面會重新辨識整張畫面
+        if len(cached_texts) == len(self.bands):
+            self.texts = list(cached_texts)
+        self.previous = None
+        return "\n".join(text for text in cached_texts if text)
+
+    def get_text(self):
+        return "\n".join(text for text in self.texts if text)
+
+
+# 比較前後兩張畫面的 band，只有變化的 band 需要重新辨識
+class DirtyRegionTracker():
+    DEFAULT_MAX_BANDS = 6
+
+    def __init__(self, max_bands=DEFAULT_MAX_BANDS, max_difference=24, band_tolerance=4):
+        self.max_bands = max_bands
+        # 任一區塊的平均亮度變化超過 max_difference 即視為該 band 有變化
+        self.max_difference = max_difference
+        self.band_tolerance = band_tolerance
+        self.previous_layout = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.previous_layout = None
+
+    def _same_bands(self, bands_a, bands_b):
+        if len(bands_a) != len(bands_b):
+            return False
+        return all(abs(a[0] - b[0]) <= self.band_tolerance and abs(a[1] - b[1]) <= self.band_tolerance
+                   for a, b in zip(bands_a, bands_b))
+
+    def plan(self, image):
+        # 回傳新的 BandLayout；dirty_bands 為 None 代表需要辨識整張畫面（只在 change detector 判斷畫面有變化後呼叫）
+        bands = find_text_bands(image, self.max_bands)
+        hashes = compute_band_hashes(image, bands)
+
+        with self._lock:
+            previous = self.previous_layout
+            layout = BandLayout(bands, hashes)
+            self.previous_layout = layout
+
+        # 上一張畫面的文字尚未辨識完成，或 band 的排列方式改變時，辨識整張畫面
+        if previous is None or previous.texts is None or not self._same_bands(previous.bands, bands):
+            return layout
+
+        dirty_bands = [i for i, (hash_a, hash_b) in enumerate(zip(previous.hashes, hashes))
+                       if max_block_difference(hash_a, hash_b) > self.max_difference]
+        # change detector 看到了變化卻沒有任何 band 改變時，不能確定文字沒有變，因此辨識整張畫面
+        if not dirty_bands or len(dirty_bands) == len(bands):
+            return layout
+
+        layout.previous = previous
+        layout.dirty_bands = dirty_bands
+        return layout
@@ -1,21 +1,100 @@
 import os
-from google.cloud import vision_v1 as vision
-from google.cloud import translate_v2 as translate
-from google.oauth2 import service_account
+import json
+import time
+import hashlib
+import threading
+
+# google.cloud 的模組載入很慢，只在第一次使用時才 import（視窗顯示後會在背景預先載入）
+
+
+def is_auth_error(error):
+    # API 呼叫因為憑證失效（被撤銷、過期、權限不足）而失敗。
+    # translate_v2（REST）回傳 HTTP 401/403（Unauthorized/Forbidden），Vision（gRPC）則是其子類別
+    # Unauthenticated/PermissionDenied
+    from google.api_core import exceptions as google_exceptions
+    from google.auth import exceptions as auth_exceptions
+    return isinstance(error, (google_exceptions.Unauthorized, google_exceptions.Forbidden,
+                              auth_exceptions.RefreshError, auth_exceptions.DefaultCredentialsError))
+
+
+def credential_file_key(google_key_file_path):
+    # 以金鑰檔內容的 hash 與修改時間作為 key，金鑰檔被替換或修改時 key 就會改變
+    with open(google_key_file_path, "rb") as key_file:
+        content_hash = hashlib.sha256(key_file.read()).hexdigest()
+    return f"{content_hash}:{os.path.getmtime(google_key_file_path)}"
+
+
+# 記錄驗證成功的金鑰檔與驗證時間，在 TTL 內不需再送出實際的翻譯請求來驗證
+class CredentialValidationCache():
+    DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+    def __init__(self, cache_file_path=None, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.cache_file_path = cache_file_path
+        self.ttl_seconds = ttl_seconds
+        self._validated = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if self.cache_file_path is None or not os.path.exists(self.cache_file_path):
+            return
+        try:
+            with open(self.cache_file_path, "r", encoding="utf-8") as cache_file:
+                self._validated = {key: float(validated_at) for key, validated_at in json.load(cache_file).items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            self._validated = {}
+
+    def _save(self):
+        if self.cache_file_path is None:
+            return
+        temp_file_path = self.cache_file_path + ".tmp"
+        try:
+            with open(temp_file_path, "w", encoding="utf-8") as temp_file:
+                json.dump(self._validated, temp_file)
+            os.replace(temp_file_path, self.cache_file_path)
+        except OSError:
+            pass
+
+    def is_valid(self, key):
+        with self._lock:
+            validated_at = self._validated.get(key)
+            return validated_at is not None and time.time() - validated_at < self.ttl_seconds
+
+    def mark_valid(self, key):
+        with self._lock:
+            # 只保留最新的一筆（同一時間只會使用一個金鑰檔）
+            self._validated = {key: time.time()}
+            self._save()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._validated = {}
+            else:
+                self._validated.pop(key, None)
+            self._save()
+
 
 class GoogleCloudClient:
-    def __init__(self):
+    def __init__(self, validation_cache: CredentialValidationCache = None):
         self._client_vision = None
         self._client_translate = None
         self._credentials = None
         self._messsage = None
 
+        # 驗證結果的快取與目前 clients 所使用的金鑰檔 key
+        self._validation_cache = validation_cache if validation_cache is not None else CredentialValidationCache()
+        self._client_key = None
+        self._lock = threading.Lock()
+
     def _set_google_vision(self):
         # 初始化 Google Cloud Vision API 客户端
+        from google.cloud import vision_v1 as vision
         self._client_vision = vision.ImageAnnotatorClient()
 
     def _set_google_translation(self):
         # 初始化 Google Cloud Translation API 客户端
+        from google.cloud import translate_v2 as translate
         self._client_translate = translate.Client()
 
     def _set_google_credentials(self, credentials):
@@ -36,14 +115,44 @@ class GoogleCloudClient:
     def get_message(self):
         return self._messsage
 
+    def invalidate_google_credential(self):
+        # API 呼叫發生憑證錯誤時呼叫，下一次檢查會重新以實際的請求驗證
+        with self._lock:
+            if self._client_key is not None:
+                self._validation_cache.invalidate(self._client_key)
+            self._client_key = None
+
+    def _clear_clients(self):
+        self._client_vision = None
+        self._client_translate = None
+        self._credentials = None
+        self._client_key = None
+
     def check_google_credential(self, google_key_file_path):
+        with self._lock:
+            self._check_google_credential(google_key_file_path)
+
+    def _check_google_credential(self, google_key_file_path):
         if os.path.exists(google_key_file_path):
             try:
+                key = credential_file_key(google_key_file_path)
+
+                # 金鑰檔沒有改變且仍在 TTL 內：沿用現有的 clients，不發出任何請求
+                if key == self._client_key and self._client_vision and self._client_translate \
+                        and self._validation_cache.is_valid(key):
+                    self._set_message("Google 憑證： <font color='green'>憑證有效</font> ")
+                    return
+
+                from google.oauth2 import service_account
                 credentials = service_account.Credentials.from_service_account_file(google_key_file_path)
 
-                # Create a client for Google Translation
-                client_translate = translate.Client(credentials=credentials)
-                translation = client_translate.translate('Hello', target_language='es')
+                # 只有在金鑰檔改變、TTL 過期或先前發生憑證錯誤時，才以實際的翻譯請求驗證
+                if not self._validation_cache.is_valid(key):
+                    # Create a client for Google Translation
+                    from google.cloud import translate_v2 as translate
+                    client_translate = translate.Client(credentials=credentials)
+                    translation = client_translate.translate('Hello', target_language='es')
+                    self._validation_cache.mark_valid(key)
 
                 # 設置 GCP credentials
                 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = google_key_file_path
@@ -52,16 +161,13 @@ class GoogleCloudClient:
                 self._set_google_vision()
                 self._set_google_translation()
                 self._set_google_credentials(credentials)
+                self._client_key = key
 
                 # set message info
                 self._set_message("Google 憑證： <font color='green'>憑證有效</font> ")
             except Exception as e:
-                self._client_vision = None
-                self._client_translate = None
-                self._credentials = None
+                self._clear_clients()
                 self._set_message("Google 憑證： <font color='red'>憑證無效</font> ")
         else:
-            self._client_vision = None
-            self._client_translate = None
-            self._credentials = None
+            self._clear_clients()
             self._set_message("Google 憑證： <font color='red'>尚未設置憑證</font> ")
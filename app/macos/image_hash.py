@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from PIL import Image
+
+
+# hash 縮圖的寬度，高度則依擷取範圍的長寬比例計算（字幕的筆畫細節需要足夠的解析度才能區分）
+HASH_WIDTH = 256
+HASH_MIN_HEIGHT = 8
+HASH_MAX_HEIGHT = 128
+
+# 細部比對時的區塊大小（像素）
+FINE_BLOCK_SIZE = 4
+
+# 每個 byte 中 1 的數量，用來向量化計算 Hamming distance
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def to_gray_thumbnail(image, width, height):
+    # 將 PIL 圖像或 numpy 陣列縮小成灰階縮圖（BOX 縮放 = 區塊平均值）
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    if image.mode != "L":
+        image = image.convert("L")
+    thumbnail = image.resize((width, height), Image.BOX)
+    return np.asarray(thumbnail, dtype=np.int16)
+
+
+def image_size(image):
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    return image.size
+
+
+def thumbnail_height(image, width=HASH_WIDTH):
+    image_width, image_height = image_size(image)
+    height = round(width * image_height / max(image_width, 1))
+    return min(max(height, HASH_MIN_HEIGHT), HASH_MAX_HEIGHT)
+
+
+def difference_hash(image, width=HASH_WIDTH, height=None, margin=4):
+    # dHash：比較縮圖中左右相鄰像素的亮度，小於 margin 的差異視為背景雜訊
+    if height is None:
+        height = thumbnail_height(image, width)
+    thumbnail = to_gray_thumbnail(image, width + 1, height)
+    bits = (thumbnail[:, :-1] - thumbnail[:, 1:]) > margin
+    return np.packbits(bits)
+
+
+def fine_block_means(image, block_size=FINE_BLOCK_SIZE):
+    # 以原始解析度計算每個 block_size x block_size 區塊的平均亮度（BOX 縮放），單一字元的變化不會被縮圖平均掉
+    width, height = image_size(image)
+    return to_gray_thumbnail(image, max(width // block_size, 1), max(height // block_size, 1))
+
+
+def max_block_difference(blocks_a, blocks_b):
+    # 兩組區塊平均亮度的最大差異；大小不同（擷取範圍或 band 改變）時視為完全不同
+    if blocks_a.shape != blocks_b.shape:
+        return 255
+    return int(np.abs(blocks_a.astype(np.int16) - blocks_b).max()) if blocks_a.size else 0
+
+
+def hamming_distance(hash_a, hash_b):
+    return int(_POPCOUNT_TABLE[np.bitwise_xor(hash_a, hash_b)].sum())
+
+
+def hamming_distances(hashes, hash_value):
+    # hashes: (N, hash_bytes) 的陣列，一次計算與 N 個 hash 的距離
+    return _POPCOUNT_TABLE[np.bitwise_xor(hashes, hash_value)].sum(axis=1, dtype=np.int32)
+
+
+def sample_gray_grid(image, width, height):
+    # 以最近鄰取樣取出 width x height 的灰階網格，成本只與網格大小有關，與擷取範圍大小無關
+    if isinstance(image, np.ndarray):
+        image_height, image_width = image.shape[:2]
+        # 取每個網格中心的像素（與 PIL 的 NEAREST 縮放相同）
+        ys = ((2 * np.arange(height) + 1) * image_height // (2 * height))[:, None]
+        xs = ((2 * np.arange(width) + 1) * image_width // (2 * width))[None, :]
+        samples = image[ys, xs]
+        if samples.ndim == 3:
+            samples = samples[..., :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        return samples.astype(np.float32)
+
+    samples = image.resize((width, height), Image.NEAREST)
+    if samples.mode != "L":
+        samples = samples.convert("L")
+    return np.asarray(samples, dtype=np.float32)
+
+
+def sample_rgb_grid(image, width, height):
+    # 與 sample_gray_grid 相同的最近鄰取樣，但保留 RGB（例如依字幕顏色判斷文字）
+    if isinstance(image, np.ndarray):
+        image_height, image_width = image.shape[:2]
+        ys = ((2 * np.arange(height) + 1) * image_height // (2 * height))[:, None]
+        xs = ((2 * np.arange(width) + 1) * image_width // (2 * width))[None, :]
+        samples = image[ys, xs]
+        if samples.ndim == 2:
+            samples = np.repeat(samples[..., None], 3, axis=2)
+        return samples[..., :3].astype(np.int16)
+
+    samples = image.resize((width, height), Image.NEAREST).convert("RGB")
+    return np.asarray(samples, dtype=np.int16)
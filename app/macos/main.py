@@ -1,22 +1,37 @@
 # -*- coding: utf-8 -*-
 
-import io
 import os
 import sys
-import cv2
-import html
+import time
 import subprocess
-import numpy as np 
-from io import BytesIO
-from PIL import ImageGrab, Image
+
+# 啟動效能分析模式必須在載入其他模組之前開始記錄
+from startup import *
+startup_profiler = StartupProfiler.from_environment(sys.argv)
+
+from PIL import Image
 from PySide6.QtGui import QPalette, QColor, QFontMetrics, QIcon, QPixmap
 from PySide6.QtWidgets import QMainWindow, QMessageBox, QApplication, QPushButton, QHBoxLayout, QWidget, QScrollArea
 from PySide6.QtCore import Signal, QTimer, QSize, Property, QObject, QEasingCurve, QPropertyAnimation
-# from google.cloud import vision_v1p4beta1 as vision
 
 from settings import *
 from config_handler import *
 from google_credentials import *
+from translation_cache import *
+from translation_memory import *
+from translator import *
+from ocr_cache import *
+from change_detector import *
+from dirty_regions import *
+from capture_backends import *
+from payload_encoder import *
+from stability_gate import *
+from ocr_engines import *
+from pipeline_stats import *
+from capture_pipeline import *
+from capture_scheduler import *
+from translation_history import *
+from asset_cache import *
 
 
 # 設置 GCP 參數
@@ -43,10 +58,9 @@ class IconScaler(QObject):
 
 # create button scale class and add the animations when cursor hover、press、release the button
 class ScalableButton(QPushButton):
-    def __init__(self, name, icon_path, parent=None):
+    def __init__(self, name, icon, parent=None):
         super().__init__(parent)
         self.setMouseTracking(True)
-        self.icon_path = icon_path
         self.icon_scaler = IconScaler()
         self.is_pressed = False
 
@@ -65,16 +79,13 @@ class ScalableButton(QPushButton):
         self.setObjectName(name)  # 设置按钮的对象名称
 
         # 创建初始图标
-        self.createIcon(icon_path)
+        self.createIcon(icon)
 
         # 连接按钮的点击信号到自定义槽函数
         #self.clicked.connect(self.onButtonClicked)
 
-    def createIcon(self, path):
-        # 创建一个图标
-        icon = QIcon(path)
-
-        # 设置图标到按钮
+    def createIcon(self, icon):
+        # 设置图标到按钮（AssetCache 預先載入的 QIcon，不會讀取檔案）
         self.setIcon(icon)
 
         # 设置初始图标大小
@@ -88,7 +99,6 @@ class ScalableButton(QPushButton):
     def onButtonReleased(self):
         # 鼠标释放按钮，恢复原始图标大小
         self.is_pressed = False
-        self.createIcon(self.icon_path)
         self.animateIconSize(QSize(40, 40))
 
     # def onButtonClicked(self):
@@ -129,6 +139,10 @@ class MainMenuWindow(QMainWindow):
 
         super().__init__()
 
+        # 在背景解碼所有的圖示與訊息框圖片，之後切換圖示時不需再讀取檔案
+        self.asset_cache = AssetCache(self.app_dir, QApplication.primaryScreen().devicePixelRatio())
+        self.asset_cache.start_preload()
+
         # set the screen that main window stay on
         self.main_window_screen = None
 
@@ -174,8 +188,7 @@ class MainMenuWindow(QMainWindow):
         
         # Create a button to add the screen capture window
         #self.add_window_button = QPushButton("", self)
-        new_file_path = os.path.join(self.app_dir, "img/ui/add_capture_window.png")
-        self.add_window_button = ScalableButton("add_window_button", new_file_path)
+        self.add_window_button = ScalableButton("add_window_button", self.asset_cache.get_icon("img/ui/add_capture_window.png"))
         self.add_window_button.setToolTip("新增螢幕擷取視窗")
         # 使用样式表自定义按钮的外观
         self.add_window_button.setStyleSheet(
@@ -208,8 +221,7 @@ class MainMenuWindow(QMainWindow):
 
         # Create a capturing button to start screen capture
         #self.action_button = QPushButton("", self)
-        new_file_path = os.path.join(self.app_dir, "img/ui/record_button_start.svg")
-        self.action_button = ScalableButton("action_button", new_file_path)
+        self.action_button = ScalableButton("action_button", self.asset_cache.get_icon("img/ui/record_button_start.svg"))
         self.action_button.setToolTip("開始擷取畫面")
         self.action_button.setStyleSheet(
             "QPushButton {"
@@ -243,8 +255,7 @@ class MainMenuWindow(QMainWindow):
         self.capturing = False  # Track capturing state
 
         # Create a button to capture the screenshot
-        new_file_path = os.path.join(self.app_dir, "img/ui/screenshot_button.png")
-        self.screenshot_button = ScalableButton("add_window_button", new_file_path)
+        self.screenshot_button = ScalableButton("add_window_button", self.asset_cache.get_icon("img/ui/screenshot_button.png"))
         self.screenshot_button.setToolTip("螢幕截圖")
         # 使用样式表自定义按钮的外观
         self.screenshot_button.setStyleSheet(
@@ -280,8 +291,7 @@ class MainMenuWindow(QMainWindow):
 
         # Create a button to pin the window on the toppest
         # self.pin_button = QPushButton("", self)
-        new_file_path = os.path.join(self.app_dir, "img/ui/pin_button_disable.png")
-        self.pin_button = ScalableButton("pin_button", new_file_path)
+        self.pin_button = ScalableButton("pin_button", self.asset_cache.get_icon("img/ui/pin_button_disable.png"))
         self.pin_button.setToolTip("取消釘選")
         self.pin_button.setStyleSheet(
             "QPushButton {"
@@ -309,8 +319,7 @@ class MainMenuWindow(QMainWindow):
 
         # Create a button to clear label text
         # self.settings_button = QPushButton("", self)
-        new_file_path = os.path.join(self.app_dir, "img/ui/cleanup_button.png")
-        self.clear_text_button = ScalableButton("clear_text_button", new_file_path)
+        self.clear_text_button = ScalableButton("clear_text_button", self.asset_cache.get_icon("img/ui/cleanup_button.png"))
         self.clear_text_button.setToolTip("清空文本")
         self.clear_text_button.setStyleSheet(
             "QPushButton {"
@@ -343,8 +352,7 @@ class MainMenuWindow(QMainWindow):
 
         # Create a button to open settings window
         # self.settings_button = QPushButton("", self)
-        new_file_path = os.path.join(self.app_dir, "img/ui/settings_button.svg")
-        self.settings_button = ScalableButton("settings_button", new_file_path)
+        self.settings_button = ScalableButton("settings_button", self.asset_cache.get_icon("img/ui/settings_button.svg"))
         self.settings_button.setToolTip("設定")
         self.settings_button.setStyleSheet(
             "QPushButton {"
@@ -444,12 +452,29 @@ class MainMenuWindow(QMainWindow):
         # Set the label as the widget for the scroll area
         transaltion_scroll_area.setWidget(self.translation_text_label)
 
+        # 创建用于显示擷取 pipeline 錯誤訊息的QLabel（例如憑證失效、網路中斷），平時隱藏
+        self.pipeline_error_label = QLabel("", self)
+        self.pipeline_error_label.setStyleSheet("color: rgb(235, 103, 119);")
+        self.pipeline_error_label.setWordWrap(True)  # 启用自动换行
+        self.pipeline_error_label.hide()
+        # 最後一次顯示的錯誤（stage, 訊息）
+        self.last_pipeline_error = None
+
+        # 创建用于显示翻譯歷史的列表（固定容量，只繪製可見的列）
+        self.history_label = QLabel("  歷 史：", self)
+        self.history_label.setStyleSheet("color: white;")  # 設置文字顏色為白色
+        self.history_label.setAutoFillBackground(False)  # 设置背景颜色為透明
+        self.translation_history = TranslationHistoryModel(self.config_handler.get_translation_history_size(), self)
+        self.history_view = TranslationHistoryView(self.translation_history, self)
+        self.history_view.setStyleSheet("background-color: rgb(50, 50, 50); border-radius: 10px;")
+
         # 設置 ocr_lable 和 ocr_translation_label 的字體大小與粗細度
         font = QFont()
         font.setPointSize(16)
         font.setBold(True) # 設置粗體
         self.ocr_label.setFont(font)
         self.translation_label.setFont(font)
+        self.history_label.setFont(font)
 
         # 設置 google_credential_state 和 system_state 的字體大小和粗細度
         state_font = QFont()
@@ -466,6 +491,7 @@ class MainMenuWindow(QMainWindow):
         # state_label_height = state_font_metrics.height()
         self.ocr_label.setFixedHeight(label_height)
         self.translation_label.setFixedHeight(label_height)
+        self.history_label.setFixedHeight(label_height)
         # self.google_credential_state.setFixedHeight(state_label_height)
         # self.system_state.setFixedHeight(state_label_height)
 
@@ -489,6 +515,9 @@ class MainMenuWindow(QMainWindow):
         state = self.config_handler.get_auto_recapture_state()
         self.update_auto_capture_state(state)
 
+        # 之後設定改變時，只套用有改變的設定
+        self.config_handler.subscribe(self.handle_config_changed)
+
         # Create a vertical layout
         layout = QVBoxLayout()
 
@@ -527,9 +556,12 @@ class MainMenuWindow(QMainWindow):
         layout.addWidget(self.ocr_label)
         layout.addWidget(ocr_scroll_area)
         # layout.addWidget(self.ocr_text_label)
+        layout.addWidget(self.pipeline_error_label)
         layout.addWidget(self.translation_label)
         layout.addWidget(transaltion_scroll_area)
         # layout.addWidget(self.translation_text_label)
+        layout.addWidget(self.history_label)
+        layout.addWidget(self.history_view)
 
         # Create a QWidget as a container for the layout
         widget = QWidget(self)
@@ -541,30 +573,85 @@ class MainMenuWindow(QMainWindow):
         # 设置窗口标志，使其始终显示在最上面
         self.setWindowFlags(Qt.WindowStaysOnTopHint)
 
-        # Initialize the attribute
-        self.screen_capture_window = None 
+        # Initialize the attribute（擷取區域 id → 擷取視窗，依開啟的順序）
+        self.screen_capture_windows = {}
+        self.next_region_id = 0
+
+        # 各擷取區域最新的辨識與翻譯結果，合併後顯示在文字框中
+        self.region_ocr_texts = {}
+        self.region_translations = {}
+
+        # 建立翻譯快取，重複出現的台詞不需再呼叫 Translation API
+        translation_cache_path = os.path.join(self.config_handler.get_data_dir(), "translation_cache.jsonl")
+        self.translation_cache = TranslationCache(translation_cache_path,
+                                                  self.config_handler.get_translation_cache_max_entries(),
+                                                  self.config_handler.get_translation_cache_max_mb() * 1024 * 1024)
+        # 建立翻譯記憶（SQLite），先前 session 翻譯過的文字不需再呼叫 Translation API
+        if self.config_handler.get_translation_memory():
+            translation_memory_path = os.path.join(self.config_handler.get_data_dir(), "translation_memory.sqlite3")
+            self.translation_memory = TranslationMemory(translation_memory_path,
+                                                        self.config_handler.get_translation_memory_max_mb() * 1024 * 1024)
+        else:
+            self.translation_memory = None
+        self.translator = Translator(self.translation_cache, self.translation_memory,
+                                     self.config_handler.get_target_language())
+
+        # 建立最近畫面的 OCR 結果快取，畫面切換回先前的內容時不需再呼叫 Vision API
+        self.ocr_cache = OcrResultCache(self.config_handler.get_ocr_cache_size(),
+                                        self.config_handler.get_ocr_cache_max_distance())
+
+        # 建立 擷取 → OCR → 翻譯 的背景 pipeline，結果透過 signal 更新介面
+        self.capture_backend = create_capture_backend(self.config_handler.get_capture_backend())
+        self.payload_encoder = PayloadEncoder(self.config_handler.get_ocr_payload_codec(),
+                                              self.config_handler.get_ocr_payload_compression_level(),
+                                              self.config_handler.get_ocr_payload_binarize())
+        self.ocr_engine = create_ocr_engine(self.config_handler.get_ocr_engine(),
+                                            self.config_handler.get_tesseract_path(),
+                                            self.config_handler.get_tesseract_language())
+        self.pipeline_stats = PipelineStats()
+        self.pipeline_stats.add_source("ocr_cache", self.ocr_cache)
+        self.pipeline_stats.add_source("translation_cache", self.translation_cache)
+        if self.translation_memory is not None:
+            self.pipeline_stats.add_source("translation_memory", self.translation_memory)
+        self.pipeline_stats.add_source("translator", self.translator)
+        self.pipeline_stats.add_source("payload_encoder", self.payload_encoder)
+        if self.config_handler.get_async_ocr_requests():
+            self.request_loop = AsyncRequestLoop(self.config_handler.get_max_in_flight_requests())
+        else:
+            self.request_loop = None
+        self.capture_pipeline = CapturePipeline(self.translator, self.ocr_cache, self.capture_backend,
+                                                self.payload_encoder, self.ocr_engine, self.pipeline_stats,
+                                                self.request_loop, self.config_handler.get_incremental_translation())
+        self.capture_pipeline.ocr_text_ready.connect(self.handle_region_ocr_text)
+        self.capture_pipeline.translation_ready.connect(self.handle_region_translation)
+        self.capture_pipeline.auth_failed.connect(self.handle_google_auth_failed)
+        self.capture_pipeline.stage_failed.connect(self.handle_pipeline_stage_failed)
+
+        # 所有擷取區域共用一個擷取排程器：同一次擷取中有變化的區域會合併成一個 OCR 請求
+        # 畫面有變化時加快擷取，畫面靜止時逐漸放慢
+        self.scheduler = AdaptiveCaptureScheduler(self.capture_regions,
+                                                  self.config_handler.get_capture_min_interval_ms(),
+                                                  self.config_handler.get_capture_max_interval_ms(), self)
+        self.capture_pipeline.frame_checked.connect(self.scheduler.notify_frame_checked)
+        self.capture_pipeline.resample_requested.connect(self.scheduler.request_capture)
+        self.scheduler.interval_changed.connect(self.handle_capture_interval_changed)
+        self.recheck_google_credential_thread = None
 
         # 檢查是否為第一次使用 APP
         if self.config_handler.get_google_credential_path() != "":
-            # 設定Google Cloud金鑰環境變數
-            google_key_file_path = self.config_handler.get_google_credential_path()
-            # self.check_google_credential_state(google_key_file_path)
-            self.google_credential.check_google_credential(google_key_file_path)
-
-            if not self.update_google_credential_state():
-                # set timer for messagebox delayed show
-                self.timer = QTimer(self)
-                self.timer.timeout.connect(self.show_message_box)
-                self.delayed_show_message_box()
+            # 在背景驗證憑證（會載入 google.cloud 的模組），不延遲視窗的顯示；OCR 引擎需要憑證時，驗證完成前先停用擷取相關的按鈕
+            self.update_capture_buttons()
+            self.startup_credential_thread = CheckGoogleCredentialThread(self.config_handler, self.google_credential)
+            self.startup_credential_thread.google_credential_checked.connect(self.handle_startup_credential_checked)
+            self.startup_credential_thread.start()
         else:      
             # set timer for messagebox delayed show
             self.timer = QTimer(self)
             self.timer.timeout.connect(self.show_message_box)
             self.delayed_show_message_box()
 
-            # set only setting button enabled
-            for button in [self.add_window_button, self.action_button, self.screenshot_button, self.pin_button, self.clear_text_button]:
-                button.setEnabled(False)
+            # 尚未設置憑證：只有使用本機的 OCR 引擎（Tesseract）時才能擷取畫面（只辨識、不翻譯）
+            self.update_capture_buttons()
             
             # 設置 google_credential_label
             # self.google_credential_state.setText("Google 憑證： <font color='red'>尚未設置憑證</font> ")
@@ -577,13 +664,13 @@ class MainMenuWindow(QMainWindow):
         if self.google_credential.get_google_vision() and self.google_credential.get_google_translation():
             client_vision = self.google_credential.get_google_vision()
             client_translate = self.google_credential.get_google_translation()
+            self.capture_pipeline.set_clients(client_vision, client_translate)
 
             # 設置 google_credential_label
             # message = self.google_credential.get_message()
             # self.google_credential_state.setText(message)
 
-            for button in [self.add_window_button, self.action_button, self.screenshot_button, self.pin_button, self.clear_text_button, self.settings_button]:
-                button.setEnabled(True)
+            self.update_capture_buttons()
 
             return True
         else: 
@@ -591,12 +678,41 @@ class MainMenuWindow(QMainWindow):
             # message = self.google_credential.get_message()
             # self.google_credential_state.setText(message)
 
-            for button in [self.add_window_button, self.action_button, self.screenshot_button, self.pin_button, self.clear_text_button]:
-                button.setEnabled(False)
-            self.settings_button.setEnabled(True)
+            self.update_capture_buttons()
 
             return False
 
+    def update_capture_buttons(self):
+        # 依 OCR 引擎是否可以使用（Google Vision 需要憑證，Tesseract 需要本機的執行檔）決定是否可以開始擷取
+        capture_ready = self.ocr_engine.is_available()
+        for button in [self.add_window_button, self.action_button, self.screenshot_button, self.pin_button, self.clear_text_button]:
+            button.setEnabled(capture_ready)
+        self.settings_button.setEnabled(True)
+
+    def handle_capture_interval_changed(self, interval_ms):
+        # 在統計頁面中顯示目前的擷取間隔與調整的次數
+        self.pipeline_stats.set_value("capture_interval_ms", interval_ms)
+        self.pipeline_stats.increment("interval_changes")
+
+    def handle_startup_credential_checked(self, message):
+        if not self.update_google_credential_state():
+            # set timer for messagebox delayed show
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.show_message_box)
+            self.delayed_show_message_box()
+
+    def handle_google_auth_failed(self):
+        # API 呼叫發生憑證錯誤：清除驗證快取，並在背景重新驗證憑證
+        if self.recheck_google_credential_thread is not None and self.recheck_google_credential_thread.isRunning():
+            return
+        self.google_credential.invalidate_google_credential()
+        self.recheck_google_credential_thread = CheckGoogleCredentialThread(self.config_handler, self.google_credential)
+        self.recheck_google_credential_thread.google_credential_checked.connect(self.handle_google_credential_rechecked)
+        self.recheck_google_credential_thread.start()
+
+    def handle_google_credential_rechecked(self, message):
+        self.update_google_credential_state()
+
     def delayed_show_message_box(self):
         # 启动定时器，延迟一定时间后显示消息框
         self.timer.start(500)  # 这里设置延迟时间为 0.5 秒（500毫秒）
@@ -605,8 +721,7 @@ class MainMenuWindow(QMainWindow):
         # 停止计时器
         self.timer.stop()
 
-        new_file_path = os.path.join(self.app_dir, "img/index/Babel_Tower.png")
-        customIcon = QPixmap(new_file_path)  # 加载图标
+        customIcon = self.asset_cache.get_pixmap("img/index/Babel_Tower.png")
 
         # 创建消息框
         msg_box = QMessageBox()
@@ -621,6 +736,8 @@ class MainMenuWindow(QMainWindow):
         # 显示消息框
         msg_box.exec()
 
+        # 第一次使用時擷取一次畫面，讓 macOS 提示開啟「螢幕錄製」權限（只在這裡用到 ImageGrab，因此不在啟動時載入）
+        from PIL import ImageGrab
         screenshot = ImageGrab.grab(bbox=(self.geometry().x(), self.geometry().y(),
                                                 self.geometry().x() + self.geometry().width(),
                                                 self.geometry().y() + self.geometry().height()))
@@ -638,10 +755,10 @@ class MainMenuWindow(QMainWindow):
         self.setWindowFlags(Qt.WindowStaysOnBottomHint)
 
         # check if a screen capture window is already open
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
+        for screen_capture_window in self.screen_capture_windows.values():
             # minimize the screen capture window
             # self.screen_capture_window.showMinimized()
-            self.screen_capture_window.setWindowFlags(Qt.WindowStaysOnBottomHint)
+            screen_capture_window.setWindowFlags(Qt.WindowStaysOnBottomHint)
 
     def restore_all_windows(self):
         # restore the main window after capturing the screenshot
@@ -651,12 +768,12 @@ class MainMenuWindow(QMainWindow):
         self.show()
 
         # check if a screen capture window is already open
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
+        for screen_capture_window in self.screen_capture_windows.values():
             # restore the screen capture window after capturing the screenshot
-            self.screen_capture_window.showNormal()
+            screen_capture_window.showNormal()
             if self.is_pined:
-                self.screen_capture_window.setWindowFlags(Qt.WindowStaysOnTopHint)
-            self.screen_capture_window.show()
+                screen_capture_window.setWindowFlags(Qt.WindowStaysOnTopHint)
+            screen_capture_window.show()
 
     def delayed_process_screenshot_function(self):
         self.minimize_all_open_windows()
@@ -682,21 +799,22 @@ class MainMenuWindow(QMainWindow):
         self.restore_all_windows()
 
         if os.path.exists(screenshot_path):
-            # 打开截图文件并转换为灰度图像
+            # 打开截图文件并编码为上傳用的灰度图像
+            start = time.perf_counter()
             with Image.open(screenshot_path) as img:
-                img_gray = img.convert("L")
-                img_bytes = BytesIO()
-                img_gray.save(img_bytes, format="PNG")
-                image_data = img_bytes.getvalue()
+                payload = self.payload_encoder.encode(img)
+            self.pipeline_stats.record("screenshot_encode", start)
 
-            # 使用Google Cloud Vision API進行文字辨識
-            image = vision.Image(content=image_data)
-            response = client_vision.text_detection(image=image)
-            texts = response.text_annotations
+            # 文字辨識（與擷取畫面模式使用相同的 OCR 引擎）
+            start = time.perf_counter()
+            result = self.ocr_engine.recognize(payload.data)
+            self.pipeline_stats.record("screenshot_ocr", start)
+            self.pipeline_stats.increment("ocr_calls")
+            self.pipeline_stats.increment("bytes_uploaded", payload.size)
 
             # 提取辨識到的文字
-            if texts:
-                detected_text = texts[0].description
+            if result:
+                detected_text = result.text
 
                 # 設置 OCR 結果顯示在介面上
                 self.ocr_text_label.setText(f'{detected_text}')
@@ -706,29 +824,22 @@ class MainMenuWindow(QMainWindow):
 
                 # 根據換行符號來分割文本成一行一行句子
                 lines = detected_text.splitlines()
-                translated_lines = []
 
-                # Google 翻譯
-                target_language = "zh-TW"  # 將此替換為你想要的目標語言代碼（例如：英文 --> en, 繁體中文 --> zh-TW）
-                
+                # Google 翻譯（先查詢翻譯快取，其餘的每一行與整段句子合併成一個請求）
                 # 第一種情況：要辨識的是一行行選項
-                for line in lines:
-                    # translate
-                    translated_line = client_translate.translate(line, target_language=target_language)
-                    # Unescape HTML entities
-                    unescape_translated_text = html.unescape(translated_line["translatedText"])
-                    # join to list
-                    translated_lines.append(unescape_translated_text)
-                result_1 = "\n".join(translated_lines)
-
                 # 第二種情況：要辨識的是一整段完整的句子（因太長而被分割成數行）
-                translated_sentence = client_translate.translate(sentence, target_language=target_language)
-                unescape_translated_sentence = html.unescape(translated_sentence["translatedText"])
-                result_2 = unescape_translated_sentence
-
-                # 將兩種情況結合再一起，顯示在介面上
-                final_result = f'{result_1}\n\n===================================\n\n{result_2}'
-                self.translation_text_label.setText(final_result)
+                start = time.perf_counter()
+                # 尚未設置憑證（使用 Tesseract）時只顯示辨識結果
+                if self.translator.client_translate is not None:
+                    translations = self.translator.translate_many(lines + [sentence])
+                    self.pipeline_stats.record("screenshot_translate", start)
+                    result_1 = "\n".join(translations[:-1])
+                    result_2 = translations[-1]
+
+                    # 將兩種情況結合再一起，顯示在介面上
+                    final_result = f'{result_1}\n\n===================================\n\n{result_2}'
+                    self.translation_text_label.setText(final_result)
+                    self.translation_history.add(None, sentence, result_2)
             else:
                 pass
 
@@ -736,7 +847,7 @@ class MainMenuWindow(QMainWindow):
             os.remove(screenshot_path)
 
         # 如果screen_capture_window存在
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
+        if self.screen_capture_windows:
             if self.pause_capture:
                 if self._auto_recaputre_state == 2:
                     # 倒數 5 秒恢復擷取畫面
@@ -764,8 +875,7 @@ class MainMenuWindow(QMainWindow):
     def pin_on_top(self):
         if self.is_pined:
             self.is_pined = False
-            new_file_path = os.path.join(self.app_dir, "img/ui/pin_button_enable.png")
-            self.pin_button.createIcon(new_file_path)
+            self.pin_button.createIcon(self.asset_cache.get_icon("img/ui/pin_button_enable.png"))
             self.pin_button.setToolTip("釘選在最上層")
             self.pin_button.setStyleSheet(
                 "QPushButton {"
@@ -792,13 +902,12 @@ class MainMenuWindow(QMainWindow):
             self.show()
 
             # 如果screen_capture_window存在, 一併移除最上層標誌
-            if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
-                self.screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint, False)
-                self.screen_capture_window.show()
+            for screen_capture_window in self.screen_capture_windows.values():
+                screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint, False)
+                screen_capture_window.show()
         else:
             self.is_pined = True
-            new_file_path = os.path.join(self.app_dir, "img/ui/pin_button_disable.png")
-            self.pin_button.createIcon(new_file_path)
+            self.pin_button.createIcon(self.asset_cache.get_icon("img/ui/pin_button_disable.png"))
             self.pin_button.setToolTip("取消釘選")
             self.pin_button.setStyleSheet(
                 "QPushButton {"
@@ -825,14 +934,58 @@ class MainMenuWindow(QMainWindow):
             self.show()
 
             # 如果screen_capture_window存在, 一併恢復最上層標誌
-            if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
-                self.screen_capture_window.setWindowFlags(Qt.WindowStaysOnTopHint)
-                self.screen_capture_window.show()
+            for screen_capture_window in self.screen_capture_windows.values():
+                screen_capture_window.setWindowFlags(Qt.WindowStaysOnTopHint)
+                screen_capture_window.show()
+
+    def handle_pipeline_stage_failed(self, stage_name, message):
+        # 擷取、辨識或翻譯失敗時顯示錯誤訊息；相同的錯誤（例如網路中斷時的每一張畫面）只輸出一次
+        stage = stage_name.split("-")[0]  # OCR / 翻譯的 worker 名稱為 "ocr-0"、"translate-1" 等
+        if self.last_pipeline_error != (stage, message):
+            self.last_pipeline_error = (stage, message)
+            stage_names = {"grab": "擷取畫面", "diff": "比對畫面", "encode": "編碼畫面", "ocr": "文字辨識", "translate": "翻譯"}
+            error_text = f"{stage_names.get(stage, stage)}失敗：{message}"
+            print(error_text, file=sys.stderr)
+            self.pipeline_error_label.setText(error_text)
+        self.pipeline_error_label.show()
+
+    def clear_pipeline_error(self, stages=None):
+        # 之後的畫面成功通過這些 stage 時，隱藏先前的錯誤訊息（stages 為 None 時隱藏任何錯誤）
+        if self.last_pipeline_error is not None and (stages is None or self.last_pipeline_error[0] in stages):
+            self.last_pipeline_error = None
+            self.pipeline_error_label.hide()
 
     def clear_label_text(self):
+        self.region_ocr_texts.clear()
+        self.region_translations.clear()
+        self.clear_pipeline_error()
         self.ocr_text_label.setText("")
         self.translation_text_label.setText("")
 
+    def join_region_texts(self, region_texts):
+        # 依照擷取視窗開啟的順序合併各區域的文字
+        return "\n\n".join(region_texts[region_id] for region_id in self.screen_capture_windows
+                           if region_texts.get(region_id))
+
+    def set_label_text(self, label, text):
+        # 文字沒有改變時不呼叫 setText，避免重新排版與重繪
+        if label.text() != text:
+            label.setText(text)
+
+    def handle_region_ocr_text(self, region_id, text):
+        # 已關閉的擷取視窗仍在處理中的結果不再顯示
+        if region_id in self.screen_capture_windows:
+            self.region_ocr_texts[region_id] = text
+            self.clear_pipeline_error(["grab", "diff", "encode", "ocr"])
+            self.set_label_text(self.ocr_text_label, self.join_region_texts(self.region_ocr_texts))
+
+    def handle_region_translation(self, region_id, text):
+        if region_id in self.screen_capture_windows:
+            self.region_translations[region_id] = text
+            self.clear_pipeline_error()
+            self.set_label_text(self.translation_text_label, self.join_region_texts(self.region_translations))
+            self.translation_history.add(region_id, self.region_ocr_texts.get(region_id, ""), text)
+
     def show_settings(self):
         # disabled all button
         for button in [self.add_window_button, self.action_button, self.screenshot_button, self.pin_button, self.clear_text_button, self.settings_button]:
@@ -843,16 +996,17 @@ class MainMenuWindow(QMainWindow):
         self.show()
 
         # 如果screen_capture_window存在, 一併切换成無框窗口
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
-            self.screen_capture_window.setWindowFlags(Qt.FramelessWindowHint)
-            self.screen_capture_window.show()
+        for screen_capture_window in self.screen_capture_windows.values():
+            screen_capture_window.setWindowFlags(Qt.FramelessWindowHint)
+            screen_capture_window.show()
 
         # self.system_state.setText("系統狀態： 正在設定系統......")
 
         # Get the main window's screen based on its current position
         self.main_window_screen = QApplication.screenAt(self.mapToGlobal(self.rect().topLeft()))
 
-        self.settings_window = SettingsWindow(self.config_handler, self.google_credential, self.main_window_screen)
+        self.settings_window = SettingsWindow(self.config_handler, self.google_credential, self.main_window_screen,
+                                              self.pipeline_stats, self.asset_cache)
         self.settings_window.update_google_credential_state.connect(self.update_google_credential_state)
         self.settings_window.setting_window_closed.connect(self.set_main_and_capture_window_frame_window_back)
         self.settings_window.exec()
@@ -865,12 +1019,12 @@ class MainMenuWindow(QMainWindow):
         self.show()
 
         # 如果screen_capture_window存在, 一併切换成有框窗口
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
-            self.screen_capture_window.setWindowFlags(Qt.Window)
+        for screen_capture_window in self.screen_capture_windows.values():
+            screen_capture_window.setWindowFlags(Qt.Window)
             if self.is_pined:
                 # 恢复screen_capture_window的最上层标志
-                self.screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint)
-            self.screen_capture_window.show()
+                screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint)
+            screen_capture_window.show()
 
         
 
@@ -894,11 +1048,13 @@ class MainMenuWindow(QMainWindow):
         font.setBold(True) # 設置粗體
         self.ocr_text_label.setFont(font)
         self.translation_text_label.setFont(font)
+        self.history_view.setFont(font)
 
     def update_text_font_color(self, new_font_color):
         # 在这里应用新的文本字體顏色
         self.ocr_text_label.setStyleSheet(f"background-color: rgb(50, 50, 50); border-radius: 10px; color: {new_font_color};")
         self.translation_text_label.setStyleSheet(f"background-color: rgb(50, 50, 50); border-radius: 10px; color: {new_font_color};")
+        self.history_view.setStyleSheet(f"background-color: rgb(50, 50, 50); border-radius: 10px; color: {new_font_color};")
         # self.text_label_palette.setColor(QPalette.WindowText, QColor(new_font_color))  # 设置文字颜色为白色
         # #self.ocr_text_label.setPalette(self.text_label_palette)
         # self.translation_text_label.setPalette(self.text_label_palette)
@@ -916,36 +1072,43 @@ class MainMenuWindow(QMainWindow):
     #     # self.check_google_credential_state(self._google_credentials)
 
     def add_or_check_screen_capture_window(self):
-        # Check if a screen capture window is already open
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
+        # Check if the screen capture windows have reached the limit
+        if len(self.screen_capture_windows) >= self.config_handler.get_max_capture_regions():
             # update system state
             # self.system_state.setText("系統狀態： 已開啟擷取視窗")
 
             # 将最小化的窗口恢复到正常状态
-            self.screen_capture_window.showNormal()
-            if self.is_pined:
-                # 恢复screen_capture_window的最上层标志
-                self.screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint)
-            self.screen_capture_window.show()
+            for screen_capture_window in self.screen_capture_windows.values():
+                screen_capture_window.showNormal()
+                if self.is_pined:
+                    # 恢复screen_capture_window的最上层标志
+                    screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint)
+                screen_capture_window.show()
 
             # read messagebox warning icon
-            new_file_path = os.path.join(self.app_dir, "img/messagebox/warning.png")
-            customIcon = QPixmap(new_file_path)  # 加载图标
+            customIcon = self.asset_cache.get_pixmap("img/messagebox/warning.png")
 
             # 创建消息框
             msg_box = QMessageBox()
             msg_box.setWindowTitle("Warning")
             msg_box.setIconPixmap(customIcon)
-            msg_box.setText("你已經開啟擷取視窗！")
+            msg_box.setText(f"最多只能開啟 {len(self.screen_capture_windows)} 個擷取視窗！")
             msg_box.exec()
         else:
             # Get the main window's screen based on its current position
             self.main_window_screen = QApplication.screenAt(self.mapToGlobal(self.rect().topLeft()))
 
+            # 每個擷取視窗是一個擷取區域，各自比對畫面的變化
+            region_id = self.next_region_id
+            self.next_region_id += 1
+            self.capture_pipeline.add_region(self.create_capture_region(region_id))
+
             # Create and show the screen capture window
-            self.screen_capture_window = ScreenCaptureWindow(self.main_window_screen)
-            self.screen_capture_window.closed.connect(self.handle_screen_capture_window_closed)
-            self.screen_capture_window.show()
+            screen_capture_window = ScreenCaptureWindow(self.main_window_screen, region_id,
+                                                        len(self.screen_capture_windows))
+            screen_capture_window.closed.connect(self.handle_screen_capture_window_closed)
+            self.screen_capture_windows[region_id] = screen_capture_window
+            screen_capture_window.show()
 
             self.add_window_button.setStyleSheet(
                 "QPushButton {"
@@ -969,11 +1132,28 @@ class MainMenuWindow(QMainWindow):
             # update system state
             # self.system_state.setText("系統狀態： 已開啟擷取視窗")
         
+    def create_capture_region(self, region_id):
+        return CaptureRegion(region_id,
+                             create_change_detector(self.config_handler.get_change_detection_method(),
+                                                    self.config_handler.get_text_mask_color(),
+                                                    self.config_handler.get_text_mask_stroke_contrast()),
+                             DirtyRegionTracker(self.config_handler.get_dirty_region_max_bands()),
+                             StabilityGate(self.config_handler.get_stability_settle_ms(),
+                                           self.config_handler.get_stability_max_wait_ms(),
+                                           self.config_handler.get_stability_sample_interval_ms()),
+                             TextDeduplicator(self.config_handler.get_text_dedup_max_distance_ratio()))
+
+    def capture_regions(self):
+        # 由擷取排程器呼叫：同一次擷取送出所有擷取區域的範圍
+        for region_id, screen_capture_window in self.screen_capture_windows.items():
+            bbox = screen_capture_window.get_capture_bbox()
+            if bbox is not None:
+                self.capture_pipeline.submit(region_id, bbox)
+
     def start_capture(self):
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
+        if self.screen_capture_windows:
             self.capturing = True 
-            new_file_path = os.path.join(self.app_dir, "img/ui/record_button_stop.png")
-            self.action_button.createIcon(new_file_path)
+            self.action_button.createIcon(self.asset_cache.get_icon("img/ui/record_button_stop.png"))
             self.action_button.setText("")
             self.action_button.setToolTip("停止擷取畫面")
             self.action_button.setStyleSheet(
@@ -1006,22 +1186,29 @@ class MainMenuWindow(QMainWindow):
             self.action_button.clicked.disconnect()
             self.action_button.clicked.connect(self.stop_capture)
 
-            self.screen_capture_window.start_capture()
+            # clear the previous_image content before start capture
+            self.capture_pipeline.reset()
+            self.capture_pipeline.start()
+            self.capture_pipeline.warm_up()
+            # 擷取頻率作為起始的擷取間隔，之後依照畫面變化自動調整
+            self.scheduler.start(frequency_to_interval(self.get_frequncy()))
 
             for button in [self.add_window_button, self.pin_button, self.clear_text_button, self.settings_button]:
                 button.setEnabled(False)
 
-            # 移除screen_capture_window的最上层标志
-            self.screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint, False)
-            self.screen_capture_window.show()
+            for screen_capture_window in self.screen_capture_windows.values():
+                screen_capture_window.start_capture()
+
+                # 移除screen_capture_window的最上层标志
+                screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint, False)
+                screen_capture_window.show()
 
             # 設置 system_state_label: capturing
             # self.update_system_state()
             # self.capturing_system_state_timer.start(1000) # 每 1 秒更新一次 system_state_label 顯示狀態
         else:
             # read messagebox warning icon
-            new_file_path = os.path.join(self.app_dir, "img/messagebox/warning.png")
-            customIcon = QPixmap(new_file_path)  # 加载图标
+            customIcon = self.asset_cache.get_pixmap("img/messagebox/warning.png")
 
             # 创建消息框
             msg_box = QMessageBox()
@@ -1038,14 +1225,13 @@ class MainMenuWindow(QMainWindow):
     #     self.system_state_flag = not self.system_state_flag  # 讓下一次顯示另一種狀態
 
     def stop_capture(self):
-        if hasattr(self, 'screen_capture_window') and self.screen_capture_window:
+        if self.screen_capture_windows:
             # 將 system_state_label 改為 已停止擷取
             # self.system_state.setText("系統狀態： 已停止擷取")
             # self.capturing_system_state_timer.stop()
 
             self.capturing = False
-            new_file_path = os.path.join(self.app_dir, "img/ui/record_button_start.svg")
-            self.action_button.createIcon(new_file_path)
+            self.action_button.createIcon(self.asset_cache.get_icon("img/ui/record_button_start.svg"))
             self.action_button.setToolTip("開始擷取畫面")
             self.action_button.setStyleSheet(
                 "QPushButton {"
@@ -1077,27 +1263,38 @@ class MainMenuWindow(QMainWindow):
             self.action_button.clicked.disconnect()
             self.action_button.clicked.connect(self.toggle_capture)
 
-            self.screen_capture_window.stop_capture()
+            self.scheduler.stop()
+            self.capture_pipeline.reset()
 
             for button in [self.add_window_button, self.screenshot_button, self.pin_button, self.clear_text_button, self.settings_button]:
                 button.setEnabled(True)
 
-            # 恢复screen_capture_window的最上层标志
-            # 设置窗口标志
-            if self.is_pined:
-                self.screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint)
-            self.screen_capture_window.show()
+            for screen_capture_window in self.screen_capture_windows.values():
+                screen_capture_window.stop_capture()
+
+                # 恢复screen_capture_window的最上层标志
+                # 设置窗口标志
+                if self.is_pined:
+                    screen_capture_window.setWindowFlag(Qt.WindowStaysOnTopHint)
+                screen_capture_window.show()
+
+    def handle_config_changed(self, key, value):
+        # 設定視窗修改設定時立即套用（由 ConfigHandler 通知）
+        match key:
+            case "text_font_size":
+                self.update_text_font_size(value)
+
+            case "text_font_color":
+                self.update_text_font_color(value)
+
+            case "capture_frequency":
+                self.update_recognition_frequency(value)
+
+            case "auto_recapture_state":
+                self.update_auto_capture_state(value)
 
     def set_main_and_capture_window_frame_window_back(self):
-        # 讀取 config file 中的 text_font_size
-        text_font_size = self.config_handler.get_font_size()
-        text_font_color = self.config_handler.get_font_color()
-        frequency = self.config_handler.get_capture_frequency()
-        state = self.config_handler.get_auto_recapture_state()
-        self.update_text_font_size(text_font_size)
-        self.update_text_font_color(text_font_color)
-        self.update_recognition_frequency(frequency)
-        self.update_auto_capture_state(state)
+        # 文字、頻率等設定已在改變時由 handle_config_changed 套用，這裡只需更新憑證狀態
         self.update_google_credential_state()
 
         # self.system_state.setText("系統狀態：系統設定完成")
@@ -1105,9 +1302,19 @@ class MainMenuWindow(QMainWindow):
         # google_credential = self.config_handler.get_google_credential_path()
         # self.update_google_credential(google_credential)
 
-    def handle_screen_capture_window_closed(self):
+    def handle_screen_capture_window_closed(self, region_id):
         # Slot to handle the screen capture window being closed
-        self.screen_capture_window = None
+        self.screen_capture_windows.pop(region_id, None)
+        self.capture_pipeline.remove_region(region_id)
+        self.region_ocr_texts.pop(region_id, None)
+        self.region_translations.pop(region_id, None)
+        if self.screen_capture_windows:
+            return  # 仍有其他擷取視窗時繼續擷取
+
+        # 最後一個擷取視窗關閉時停止擷取
+        self.scheduler.stop()
+        self.capture_pipeline.reset()
+        self.capturing = False
 
         self.pause_capture = False
 
@@ -1136,8 +1343,7 @@ class MainMenuWindow(QMainWindow):
             "}"
         )
 
-        new_file_path = os.path.join(self.app_dir, "img/ui/record_button_start.svg")
-        self.action_button.createIcon(new_file_path)
+        self.action_button.createIcon(self.asset_cache.get_icon("img/ui/record_button_start.svg"))
         self.action_button.setText("")
         self.action_button.setToolTip("開始擷取畫面")
         self.action_button.setStyleSheet(
@@ -1169,26 +1375,39 @@ class MainMenuWindow(QMainWindow):
 
     def closeEvent(self, event):
         # Check if the screen_capture_window is open and close it
-        if self.screen_capture_window is not None:
-            self.screen_capture_window.close()
+        for screen_capture_window in list(self.screen_capture_windows.values()):
+            screen_capture_window.close()
+
+        # 停止 pipeline 的背景執行緒，並等待仍在進行的憑證驗證
+        self.capture_pipeline.shutdown()
+        self.config_handler.flush()
+        for thread in [getattr(self, "startup_credential_thread", None), self.recheck_google_credential_thread]:
+            if thread is not None:
+                thread.wait()
+        self.translation_cache.close()
+        if self.translation_memory is not None:
+            self.translation_memory.close()
         
         event.accept()
 
 class ScreenCaptureWindow(QMainWindow):
-    # Define a custom signal
-    closed = Signal()
+    # Define a custom signal（擷取區域 id）
+    closed = Signal(int)
+
+    # 多個擷取視窗依序錯開的距離
+    CASCADE_OFFSET = 40
   
-    def __init__(self, main_window_screen):
+    def __init__(self, main_window_screen, region_id, window_index=0):
         super().__init__()
 
-        # 定義一個變數用來比較前一張已辨識的圖片
-        self.previous_image = None
+        # 擷取區域 id（擷取與結果由 MainMenuWindow 與 pipeline 依此區分）
+        self.region_id = region_id
 
         # screen info
         self.main_window_screen = main_window_screen
   
         # set the title
-        self.setWindowTitle("擷取視窗")
+        self.setWindowTitle("擷取視窗" if window_index == 0 else f"擷取視窗 {window_index + 1}")
 
         # Set the window background color to black
         capture_window_palette = QPalette()
@@ -1208,8 +1427,8 @@ class ScreenCaptureWindow(QMainWindow):
         screen_geometry = self.main_window_screen.geometry()
 
         # set x, y coordinate & width, height
-        start_x_position = screen_geometry.left() + screen_geometry.width() // 4
-        start_y_position = screen_geometry.top() + screen_geometry.height() // 2
+        start_x_position = screen_geometry.left() + screen_geometry.width() // 4 + window_index * self.CASCADE_OFFSET
+        start_y_position = screen_geometry.top() + screen_geometry.height() // 2 - window_index * self.CASCADE_OFFSET
         screen_width = screen_geometry.width() // 3
         screen_height = screen_geometry.height() // 4
         self.setGeometry(start_x_position, start_y_position, screen_width, screen_height)
@@ -1229,10 +1448,6 @@ class ScreenCaptureWindow(QMainWindow):
         # 将 widget 设置为主窗口的中心部件
         self.setCentralWidget(container_widget)
         
-        # 擷取倒數計時器
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.capture_screen)
-        
         # 设置窗口标志，使其始终显示在最上面
         self.setWindowFlags(Qt.WindowStaysOnTopHint)
 
@@ -1255,20 +1470,6 @@ class ScreenCaptureWindow(QMainWindow):
         self.border_frame.setGeometry(0, 0, new_width, new_height)
 
     def start_capture(self):
-        self.previous_image = None  # clear the previous_image content before start capture
-        match main_capturing_window.get_frequncy():
-            case "高 (1 秒)":
-                self.timer.start(1000)  # Capture every 1000 milliseconds (1 second)
-
-            case "標準 (2 秒)":
-                self.timer.start(2000)  # Capture every 2000 milliseconds (2 second)
-
-            case "慢 (3 秒)":
-                self.timer.start(3000)  # Capture every 3000 milliseconds (3 second)
-
-            case "非常慢 (5 秒)":
-                self.timer.start(5000)  # Capture every 5000 milliseconds (5 second)
-
         # 更改窗口透明度和边界线条
         self.setWindowOpacity(0)
         self.border_frame.hide()
@@ -1278,8 +1479,6 @@ class ScreenCaptureWindow(QMainWindow):
         self.show()
 
     def stop_capture(self):
-        self.timer.stop()
-
         # new_file_path = os.path.join(self.app_dir, "img/messagebox/info.png")
         # customIcon = QPixmap(new_file_path)  # 加载图标
 
@@ -1298,138 +1497,17 @@ class ScreenCaptureWindow(QMainWindow):
         self.setWindowFlags(Qt.Window)
         self.show()
 
-    def capture_screen(self):
-        global capture_start
-
-        if self.isVisible():
-            # Capture the screen content within the window's geometry
-            screenshot = ImageGrab.grab(bbox=(self.geometry().x(), self.geometry().y(),
-                                                self.geometry().x() + self.geometry().width(),
-                                                self.geometry().y() + self.geometry().height()))
-            
-            # 在每次执行 OCR 之前比较图像相似度
-            if self.is_similar_to_previous(screenshot):
-                pass
-            else:
-                # Perform OCR using Google Cloud Vision on the screenshot
-                self.perform_ocr(screenshot)
-
-
-    def is_similar_to_previous(self, current_image):
-        # 将当前图像与上一次捕获的图像进行相似度比较
-        if self.previous_image is not None:
-            # 將PIL圖像轉換為OpenCV格式
-            previous_cv = cv2.cvtColor(np.array(self.previous_image), cv2.COLOR_RGB2BGR)
-            current_cv = cv2.cvtColor(np.array(current_image), cv2.COLOR_RGB2BGR)
-
-            # 將圖像轉換為灰度圖像
-            # previous_gray = cv2.cvtColor(previous_cv, cv2.COLOR_BGR2GRAY)
-            # current_gray = cv2.cvtColor(current_cv, cv2.COLOR_BGR2GRAY)
-            """
-            # 將灰度圖像進行二值化處理
-            _, previous_binary = cv2.threshold(previous_gray, 128, 255, cv2.THRESH_BINARY)
-            _, current_binary = cv2.threshold(current_gray, 128, 255, cv2.THRESH_BINARY)
-            """
-
-            # 使用OpenCV的相似度比较方法
-            result = cv2.matchTemplate(current_cv, previous_cv, cv2.TM_CCOEFF_NORMED)
-
-            # 获取最大匹配值
-            max_similarity = np.max(result)
-
-            if max_similarity == 1.0:
-                check_result = cv2.matchTemplate(previous_cv, current_cv, cv2.TM_CCOEFF_NORMED)
-                check_max_similarity = np.max(check_result)
-
-                if check_max_similarity == 0.0:
-                    return False # 与上一次图像不相似
-                else:
-                    return True # 与上一次图像相似
-            else:
-                # 设定相似度阈值，可以根据具体需求调整
-                similarity_threshold = 0.95  # 这里设定一个普通的阈值
-
-                if max_similarity >= similarity_threshold:
-                    return True  # 与上一次图像相似
-                else:
-                    return False  # 与上一次图像不相似
+    def get_capture_bbox(self):
+        # 只回傳擷取範圍，擷取、比對、OCR 與翻譯皆在 pipeline 的背景執行緒中進行
+        if not self.isVisible():
+            return None
+        return (self.geometry().x(), self.geometry().y(),
+                self.geometry().x() + self.geometry().width(),
+                self.geometry().y() + self.geometry().height())
 
     def closeEvent(self, event):
-        # Stop the timer when the screen capture window is closed
-        self.timer.stop()
         event.accept()
-        self.closed.emit()  # Emit the signal when the window is closed
-
-    def perform_ocr(self, screenshot):
-        #global client_vision, client_translate
-
-        # 保存当前图像作为上一次捕获的图像
-        self.previous_image = screenshot.copy()
-
-        # 將PIL圖像轉換為OpenCV格式
-        screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-
-        # 將圖像轉換為灰度圖像
-        gray_image = cv2.cvtColor(screenshot_cv, cv2.COLOR_BGR2GRAY)
-
-        # 將OpenCV格式的二值化圖像轉換為PIL格式
-        binary_image_pil = Image.fromarray(gray_image)
-
-        """
-        # 將灰度圖像進行二值化處理
-        _, binary_image = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY)
-        cv2.imwrite("binary.png", binary_image)
-
-        # 將OpenCV格式的二值化圖像轉換為PIL格式
-        binary_image_pil = Image.fromarray(binary_image)
-
-        # 保存二值化圖像到緩衝區
-        binary_image_buffer = io.BytesIO()
-        binary_image_pil.save(binary_image_buffer, format='PNG')
-        screenshot_bytes = binary_image_buffer.getvalue()
-        """
-
-        # Save the screenshot to an in-memory buffer as a PNG image
-        binary_image_buffer = io.BytesIO()
-        binary_image_pil.save(binary_image_buffer, format='PNG')
-        screenshot_bytes = binary_image_buffer.getvalue()
-
-        """
-        # Save the screenshot to an in-memory buffer as a PNG image
-        image_buffer = io.BytesIO()
-        screenshot.save(image_buffer, format='PNG')
-        screenshot_bytes = image_buffer.getvalue()
-        """
-
-
-        # 使用Google Cloud Vision API進行文字辨識
-        image = vision.Image(content=screenshot_bytes)
-        response = client_vision.text_detection(image=image)
-        texts = response.text_annotations
-
-        # 提取辨識到的文字
-        if texts:
-            detected_text = texts[0].description
-
-            # 设置OCR识别文本
-            main_capturing_window.ocr_text_label.setText(f'{detected_text}')
- 
-            # 將辨識的文字按行分割
-            lines = detected_text.replace("\n", "")
-
-            # Google 翻譯
-            target_language = "zh-TW"  # 將此替換為你想要的目標語言代碼（例如：英文 --> en, 繁體中文 --> zh-TW）
-            translated_lines = client_translate.translate(lines, target_language=target_language)
-
-            # Unescape HTML entities
-            unescape_translated_text = html.unescape(translated_lines["translatedText"])
-
-            # 將翻譯後的行重新組合成一個帶有換行的字符串
-            translated_text_with_newlines = unescape_translated_text.replace("。", "。\n").replace('？', '？\n').replace('！', '！\n')  # 以句點和問號為換行分界點
-            # main_capturing_window.translation_text_label.setText(translated_text_with_newlines)
-            main_capturing_window.translation_text_label.setText(f'{unescape_translated_text}')  # 完全不以句點和問號為換行分界點
-        else:
-            pass
+        self.closed.emit(self.region_id)  # Emit the signal when the window is closed
 
 
 if __name__ == "__main__":
@@ -1438,8 +1516,11 @@ if __name__ == "__main__":
     config_handler = ConfigHandler()
     config_handler.read_config_file()
 
-    # create a instance of google_crednetials's class
-    google_credential = GoogleCloudClient()
+    # create a instance of google_crednetials's class（驗證結果會快取在 config file 旁）
+    credential_validation_path = os.path.join(config_handler.get_data_dir(), "credential_validation.json")
+    credential_validation_cache = CredentialValidationCache(credential_validation_path,
+                                                            config_handler.get_credential_validation_ttl_hours() * 3600)
+    google_credential = GoogleCloudClient(credential_validation_cache)
 
     # create pyside6 app
     App = QApplication(sys.argv)
@@ -1448,12 +1529,22 @@ if __name__ == "__main__":
     main_capturing_window = MainMenuWindow(config_handler, google_credential)
 
     # Show the windows
+    startup_profiler.watch_first_paint(main_capturing_window)
     main_capturing_window.show()
 
+    # 視窗顯示後，在背景載入第一次擷取前才需要的模組
+    module_preload_thread = ModulePreloadThread()
+    module_preload_thread.modules_loaded.connect(startup_profiler.set_preload_times)
+    QTimer.singleShot(0, module_preload_thread.start)
+    # 視窗顯示後，預先建立其他狀態的圖示與訊息框圖片
+    QTimer.singleShot(0, main_capturing_window.asset_cache.warm_up)
+
     # set application icon
     # App.setWindowIcon(QIcon('tataru.icns'))
     # main_capturing_window.setWindowIcon(QIcon('tataru.icns'))
     
     # start the app
-    sys.exit(App.exec())
+    exit_code = App.exec()
+    module_preload_thread.wait()
+    sys.exit(exit_code)
   
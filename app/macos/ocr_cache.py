@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import numpy as np
+
+from image_hash import *
+
+
+# 保存最近 N 張畫面的 perceptual hash 與其 OCR 結果（每個文字 band 的文字），畫面回到先前的內容時（A → B → A）可直接重用辨識結果
+class OcrResultCache():
+    DEFAULT_CAPACITY = 32
+    DEFAULT_MAX_DISTANCE = 2
+    DEFAULT_MAX_BLOCK_DIFFERENCE = 24
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_distance=DEFAULT_MAX_DISTANCE,
+                 max_block_difference=DEFAULT_MAX_BLOCK_DIFFERENCE):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        # dHash 相近的畫面還需確認每個區塊的平均亮度差異都不超過此值，才視為相同的畫面
+        self.max_block_difference = max_block_difference
+
+        self._hashes = None
+        # 原始解析度的區塊平均亮度（uint8 以節省記憶體）
+        self._blocks = [None] * capacity
+        self._texts = [None] * capacity
+        self._count = 0
+        self._next_index = 0
+        self._lock = threading.Lock()
+
+        # hit / miss 計數器
+        self.hits = 0
+        self.misses = 0
+
+    def compute_hash(self, image):
+        # (dHash, 區塊平均亮度)：dHash 縮小後看不出單一字元的差異（例如 3/5 → 4/5），只用來快速找出候選的畫面
+        return difference_hash(image), fine_block_means(image)
+
+    def lookup(self, frame_hash):
+        # 回傳最接近的畫面每個 band 的 OCR 文字，若沒有足夠接近的畫面則回傳 None
+        frame_dhash, frame_blocks = frame_hash
+        with self._lock:
+            if self._count == 0 or self._hashes.shape[1] != frame_dhash.shape[0]:
+                self.misses += 1
+                return None
+
+            distances = hamming_distances(self._hashes[:self._count], frame_dhash)
+            for index in np.argsort(distances, kind="stable"):
+                if distances[index] > self.max_distance:
+                    break
+                if max_block_difference(self._blocks[index], frame_blocks) <= self.max_block_difference:
+                    self.hits += 1
+                    return self._texts[index]
+
+            self.misses += 1
+            return None
+
+    def store(self, frame_hash, band_texts):
+        frame_dhash, frame_blocks = frame_hash
+        with self._lock:
+            if self._hashes is None or self._hashes.shape[1] != frame_dhash.shape[0]:
+                self._hashes = np.zeros((self.capacity, frame_dhash.shape[0]), dtype=np.uint8)
+                self._count = 0
+                self._next_index = 0
+
+            # ring buffer：超過容量時覆蓋最舊的資料
+            self._hashes[self._next_index] = frame_dhash
+            self._blocks[self._next_index] = frame_blocks.astype(np.uint8)
+            self._texts[self._next_index] = list(band_texts)
+            self._next_index = (self._next_index + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self._count = 0
+            self._next_index = 0
+            self._blocks = [None] * self.capacity
+            self._texts = [None] * self.capacity
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": self._count,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
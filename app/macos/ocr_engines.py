@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import shutil
+import subprocess
+
+
+# 辨識到的一個單字（或一行文字）與其 bounding box：(left, top, right, bottom)
+class OcrWord():
+    def __init__(self, text, box):
+        self.text = text
+        self.box = box
+
+    @property
+    def center_y(self):
+        return (self.box[1] + self.box[3]) / 2
+
+
+# 所有 OCR 引擎共同的辨識結果
+class OcrResult():
+    def __init__(self, text="", words=None, lines=None, locale=""):
+        # 完整的文字（以換行分隔每一行）
+        self.text = text
+        self.words = words if words is not None else []
+        self.lines = lines if lines is not None else [OcrWord(line, None) for line in text.splitlines() if line]
+        self.locale = locale
+
+    def __bool__(self):
+        return bool(self.text)
+
+
+def vertices_to_box(vertices):
+    xs = [vertex.x for vertex in vertices]
+    ys = [vertex.y for vertex in vertices]
+    if not xs:
+        return (0, 0, 0, 0)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+# 所有 OCR 引擎的共同介面：recognize(image_data) 接收編碼後的圖片（PNG / WebP）並回傳 OcrResult
+class OcrEngine():
+    name = ""
+    # 若為 True，提供 recognize_batch_async，可以同時送出多個請求
+    supports_async = False
+    # 一次請求最多可以辨識的圖片數
+    max_batch_size = 1
+
+    def set_client(self, client):
+        pass
+
+    def warm_up(self):
+        # 預先建立連線，讓第一次辨識不需等待
+        pass
+
+    def is_available(self):
+        return True
+
+    def recognize(self, image_data):
+        raise NotImplementedError
+
+    def recognize_batch(self, images):
+        # 回傳與 images 相同順序的 list；個別圖片辨識失敗時，該位置為 Exception
+        results = []
+        for image_data in images:
+            try:
+                results.append(self.recognize(image_data))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+# Google Cloud Vision API（text_detection）
+class GoogleVisionOcrEngine(OcrEngine):
+    name = "google"
+    supports_async = True
+    # Vision API 的 batch_annotate_images 每次最多 16 張圖片
+    max_batch_size = 16
+    # 預熱連線的等待上限
+    WARM_UP_TIMEOUT_SECONDS = 10
+
+    def __init__(self):
+        self.client_vision = None
+        # ImageAnnotatorAsyncClient 的 gRPC channel 屬於建立它的 event loop，因此在 event loop 中才建立
+        self._async_client = None
+        self._async_loop = None
+
+    def set_client(self, client_vision):
+        # 重新檢查憑證後仍是同一個 client 時，保留已預熱的連線
+        if client_vision is self.client_vision:
+            return
+        self.client_vision = client_vision
+        self._close_async_client()  # 憑證改變時重新建立
+
+    def _close_async_client(self):
+        # 舊的 channel 必須在建立它的 event loop 中關閉
+        async_client, loop = self._async_client, self._async_loop
+        self._async_client = None
+        self._async_loop = None
+        if async_client is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(async_client.transport.close(), loop)
+
+    def is_available(self):
+        return self.client_vision is not None
+
+    def warm_up(self):
+        # 建立 gRPC channel 的連線（TCP + TLS），不會送出任何請求
+        import grpc
+        grpc.channel_ready_future(self.client_vision.transport.grpc_channel).result(timeout=self.WARM_UP_TIMEOUT_SECONDS)
+
+    def _get_async_client(self):
+        from google.cloud import vision_v1 as vision
+        if self._async_client is None:
+            self._async_client = vision.ImageAnnotatorAsyncClient()
+            self._async_loop = asyncio.get_running_loop()
+        return self._async_client
+
+    async def warm_up_async(self):
+        # 離線時 channel_ready 不會結束，因此設定逾時
+        await asyncio.wait_for(self._get_async_client().transport.grpc_channel.channel_ready(),
+                               timeout=self.WARM_UP_TIMEOUT_SECONDS)
+
+    def recognize(self, image_data):
+        # 使用Google Cloud Vision API進行文字辨識
+        from google.cloud import vision_v1 as vision
+        image = vision.Image(content=image_data)
+        response = self.client_vision.text_detection(image=image)
+        return self._to_result(response.text_annotations)
+
+    def recognize_batch(self, images):
+        # 多個擷取區域的圖片合併成一個請求（一次往返）
+        response = self.client_vision.batch_annotate_images(requests=self._batch_requests(images))
+        return self._to_batch_results(response.responses)
+
+    async def recognize_batch_async(self, images):
+        # 與 recognize_batch 相同，但使用 async client（多個請求共用同一個 channel 同時進行）
+        response = await self._get_async_client().batch_annotate_images(requests=self._batch_requests(images))
+        return self._to_batch_results(response.responses)
+
+    def _batch_requests(self, images):
+        from google.cloud import vision_v1 as vision
+        feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+        return [vision.AnnotateImageRequest(image=vision.Image(content=image_data), features=[feature])
+                for image_data in images]
+
+    def _to_batch_results(self, responses):
+        # 每張圖片各自有 error 欄位，單一圖片失敗不影響其他圖片的結果
+        return [RuntimeError(response.error.message) if response.error.message else self._to_result(response.text_annotations)
+                for response in responses]
+
+    def _to_result(self, texts):
+        # 第一個 annotation 為完整的文字，其餘為每一個單字
+        if not texts:
+            return OcrResult()
+        words = [OcrWord(text.description, vertices_to_box(text.bounding_poly.vertices)) for text in texts[1:]]
+        return OcrResult(texts[0].description, words, locale=texts[0].locale)
+
+
+# 本機的 Tesseract（以 subprocess 執行，不需連線與憑證）
+class TesseractOcrEngine(OcrEngine):
+    name = "tesseract"
+
+    def __init__(self, executable="tesseract", language="eng", page_segmentation_mode=6, timeout=10):
+        self.executable = executable
+        self.language = language
+        self.page_segmentation_mode = page_segmentation_mode
+        self.timeout = timeout
+        # 每張畫面都會檢查是否可以使用，因此只在建立時尋找一次執行檔
+        self._available = shutil.which(executable) is not None
+
+    def is_available(self):
+        return self._available
+
+    def recognize(self, image_data):
+        # 由 stdin 讀取圖片，以 TSV 格式輸出每一個單字與其位置
+        completed = subprocess.run(
+            [self.executable, "stdin", "stdout", "-l", self.language, "--psm", str(self.page_segmentation_mode), "tsv"],
+            input=image_data, capture_output=True, timeout=self.timeout, check=True)
+        return self.parse_tsv(completed.stdout.decode("utf-8", errors="replace"), self.language)
+
+    @staticmethod
+    def parse_tsv(tsv, language=""):
+        # 欄位：level page_num block_num par_num line_num word_num left top width height conf text
+        words = []
+        line_words = {}
+        for row in tsv.splitlines()[1:]:
+            columns = row.split("\t")
+            if len(columns) < 12 or columns[0] != "5":
+                continue
+            text = columns[11].strip()
+            if not text:
+                continue
+            left, top, width, height = (int(value) for value in columns[6:10])
+            word = OcrWord(text, (left, top, left + width, top + height))
+            words.append(word)
+            line_words.setdefault(tuple(columns[1:5]), []).append(word)
+
+        # 依照 block / paragraph / line 組成每一行文字
+        lines = []
+        for words_in_line in line_words.values():
+            box = (min(word.box[0] for word in words_in_line), min(word.box[1] for word in words_in_line),
+                   max(word.box[2] for word in words_in_line), max(word.box[3] for word in words_in_line))
+            lines.append(OcrWord(" ".join(word.text for word in words_in_line), box))
+        return OcrResult("\n".join(line.text for line in lines), words, lines, language)
+
+
+def create_ocr_engine(name, tesseract_executable="tesseract", tesseract_language="eng"):
+    if name == "tesseract":
+        return TesseractOcrEngine(tesseract_executable, tesseract_language)
+    return GoogleVisionOcrEngine()
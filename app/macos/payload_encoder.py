@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+import numpy as np
+
+
+# 可選擇的 OCR 上傳圖片格式（Vision API 皆支援）
+PAYLOAD_CODECS = ["png", "webp"]
+
+
+# 一張編碼完成、準備上傳的圖片
+class EncodedPayload():
+    def __init__(self, data, codec, encode_ms):
+        self.data = data
+        self.codec = codec
+        self.size = len(data)
+        self.encode_ms = encode_ms
+
+
+# 將擷取的畫面直接編碼成 OCR 上傳用的灰階圖片（擷取畫面模式與截圖模式共用）
+class PayloadEncoder():
+    def __init__(self, codec="png", compression_level=6, binarize=False):
+        self.codec = codec if codec in PAYLOAD_CODECS else "png"
+        self.compression_level = min(max(compression_level, 0), 9)
+        self.binarize = binarize
+        self._lock = threading.Lock()
+
+        # 編碼統計
+        self.frames_encoded = 0
+        self.bytes_encoded = 0
+        self.total_encode_ms = 0.0
+
+    def _to_gray(self, image):
+        # 支援 numpy RGB / 灰階陣列以及 PIL 圖像
+        if not isinstance(image, np.ndarray):
+            if image.mode != "L":
+                image = image.convert("L")
+            return np.asarray(image)
+        if image.ndim == 2:
+            return image
+        import cv2
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+    def encode(self, image):
+        # cv2 的載入較慢，第一次編碼時才 import（視窗顯示後會在背景預先載入）
+        import cv2
+        start = time.perf_counter()
+        gray_image = self._to_gray(image)
+
+        if self.binarize:
+            # 以 Otsu 自動決定門檻值，轉為黑白（1-bit）圖片
+            _, gray_image = cv2.threshold(gray_image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        if self.codec == "webp":
+            # WebP quality 超過 100 即為無損壓縮
+            success, encoded = cv2.imencode(".webp", gray_image, [cv2.IMWRITE_WEBP_QUALITY, 101])
+        else:
+            params = [cv2.IMWRITE_PNG_COMPRESSION, self.compression_level]
+            if self.binarize:
+                params += [cv2.IMWRITE_PNG_BILEVEL, 1]
+            success, encoded = cv2.imencode(".png", gray_image, params)
+        if not success:
+            raise ValueError(f"無法將畫面編碼為 {self.codec}")
+
+        payload = EncodedPayload(encoded.tobytes(), self.codec, (time.perf_counter() - start) * 1000)
+        with self._lock:
+            self.frames_encoded += 1
+            self.bytes_encoded += payload.size
+            self.total_encode_ms += payload.encode_ms
+        return payload
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "frames": self.frames_encoded,
+                "bytes": self.bytes_encoded,
+                "average_bytes": self.bytes_encoded / self.frames_encoded if self.frames_encoded else 0,
+                "average_encode_ms": self.total_encode_ms / self.frames_encoded if self.frames_encoded else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.frames_encoded = 0
+            self.bytes_encoded = 0
+            self.total_encode_ms = 0.0
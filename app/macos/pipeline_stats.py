@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+
+# 統計頁面中顯示的 stage（依照處理順序）
+STAGE_NAMES = ["grab", "diff", "encode", "ocr", "translate", "screenshot_encode", "screenshot_ocr", "screenshot_translate"]
+
+# 統計頁面中顯示的計數器
+COUNTER_NAMES = ["frames_captured", "frames_similar", "frames_unstable", "ocr_calls", "ocr_images", "bytes_uploaded",
+                 "text_duplicates", "interval_changes"]
+
+
+# 各 stage 的耗時（最近 N 次）與計數器；記錄時只做 append / 加法，計算百分位數只在統計頁面開啟時進行
+class PipelineStats():
+    HISTORY_SIZE = 256
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        self._durations = {name: deque(maxlen=history_size) for name in STAGE_NAMES}
+        self._counters = dict.fromkeys(COUNTER_NAMES, 0)
+        # 目前的數值（例如目前的擷取間隔），重設統計時保留
+        self._values = {}
+
+        # 其他有 get_stats / reset_stats 的元件（快取、編碼器、翻譯）
+        self._sources = {}
+
+    def add_source(self, name, source):
+        self._sources[name] = source
+
+    def record(self, stage, start):
+        # start 為 time.perf_counter() 的值
+        duration_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._durations[stage].append(duration_ms)
+
+    def increment(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def set_value(self, name, value):
+        with self._lock:
+            self._values[name] = value
+
+    def get_stats(self):
+        with self._lock:
+            durations = {name: list(values) for name, values in self._durations.items()}
+            counters = dict(self._counters)
+            current_values = dict(self._values)
+
+        stages = {}
+        for name, values in durations.items():
+            if not values:
+                stages[name] = {"count": 0}
+                continue
+            samples = np.asarray(values)
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            stages[name] = {"count": len(values), "p50": float(p50), "p90": float(p90), "p99": float(p99),
+                            "max": float(samples.max())}
+
+        return {
+            "stages": stages,
+            "counters": counters,
+            "values": current_values,
+            "sources": {name: source.get_stats() for name, source in self._sources.items()},
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            for values in self._durations.values():
+                values.clear()
+            self._counters = dict.fromkeys(COUNTER_NAMES, 0)
+        for source in self._sources.values():
+            source.reset_stats()
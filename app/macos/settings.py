@@ -3,12 +3,14 @@
 import os
 import sys
 import shutil
-from PySide6.QtCore import QStandardPaths, QUrl, Signal, QRect, QPoint, QPropertyAnimation, QEasingCurve, Property, QThread
+from PySide6.QtCore import QStandardPaths, QUrl, Signal, QRect, QPoint, QPropertyAnimation, QEasingCurve, Property, QThread, QTimer
 from PySide6.QtGui import QFont, Qt, QDesktopServices, QPixmap, QPainter, QColor
-from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QTabWidget, QWidget, QLabel, QComboBox, QPushButton, QFrame, QColorDialog, QFileDialog, QMessageBox, QCheckBox
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QTabWidget, QWidget, QLabel, QComboBox, QPushButton, QFrame, QColorDialog, QFileDialog, QMessageBox, QCheckBox, QScrollArea
 
 from config_handler import *
 from google_credentials import *
+from pipeline_stats import *
+from asset_cache import *
 
 
 class CheckGoogleCredentialThread(QThread):
@@ -127,7 +129,8 @@ class SettingsWindow(QDialog):
     # create a custom signal for update google credential state in main window
     update_google_credential_state = Signal()
 
-    def __init__(self, config_handler: ConfigHandler, google_credential: GoogleCloudClient, main_window_screen):
+    def __init__(self, config_handler: ConfigHandler, google_credential: GoogleCloudClient, main_window_screen,
+                 pipeline_stats: PipelineStats = None, asset_cache: AssetCache = None):
         super().__init__()
 
         # set app's pwd
@@ -139,6 +142,9 @@ class SettingsWindow(QDialog):
             current_dir = os.path.dirname(os.path.abspath(__file__))
             self.app_dir_path = os.path.dirname(os.path.dirname(current_dir))
 
+        # 與主視窗共用預先載入的訊息框圖片
+        self.asset_cache = asset_cache if asset_cache is not None else AssetCache(self.app_dir_path)
+
         # 設定 setting window 字體大小
         self._font_size = 16
 
@@ -151,6 +157,9 @@ class SettingsWindow(QDialog):
         # screen info
         self.main_window_screen = main_window_screen
 
+        # 擷取 pipeline 的統計資料
+        self.pipeline_stats = pipeline_stats
+
         # # Set the window opacity
         self.setWindowOpacity(0.99)
 
@@ -185,6 +194,10 @@ class SettingsWindow(QDialog):
         tabs.addTab(self.create_text_settings(), "文字")
         tabs.addTab(self.create_recognition_settings(), "擷取")
         tabs.addTab(self.create_system_settings(), "系統")
+        if self.pipeline_stats is not None:
+            self.statistics_page = self.create_statistics_page()
+            tabs.addTab(self.statistics_page, "統計")
+            tabs.currentChanged.connect(self.update_statistics_timer)
         tabs.addTab(self.create_about_page(), "關於")
         tabs.setStyleSheet("QTabBar::tab { font-size: 14px; }")  # set tabs font size: 14px
  
@@ -477,6 +490,74 @@ class SettingsWindow(QDialog):
         # 使用 QDesktopServices 打開 URL
         QDesktopServices.openUrl(QUrl(url))
 
+    def create_statistics_page(self):
+        # 创建一个用于統計資料的 QWidget
+        statistics_page = QWidget()
+
+        # set font size to 10px
+        label_font = QFont("Menlo")
+        label_font.setStyleHint(QFont.Monospace)
+        label_font.setPointSize(10)
+
+        # 顯示統計資料的 label（放在可捲動的區域中）
+        self.statistics_label = QLabel("")
+        self.statistics_label.setFont(label_font)
+        self.statistics_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        statistics_scroll_area = QScrollArea()
+        statistics_scroll_area.setWidgetResizable(True)
+        statistics_scroll_area.setFrameShape(QFrame.NoFrame)
+        statistics_scroll_area.setWidget(self.statistics_label)
+
+        # 创建一个按钮以重設統計資料
+        reset_statistics_button = QPushButton("重設統計")
+        reset_statistics_button.clicked.connect(self.reset_statistics)
+
+        # 只在統計頁面顯示時才定期更新
+        self.statistics_timer = QTimer(self)
+        self.statistics_timer.timeout.connect(self.update_statistics)
+
+        layout = QVBoxLayout()
+        layout.addWidget(statistics_scroll_area)
+        layout.addWidget(reset_statistics_button)
+        statistics_page.setLayout(layout)
+
+        return statistics_page
+
+    def update_statistics_timer(self, index):
+        if self.sender().widget(index) is self.statistics_page:
+            self.update_statistics()
+            self.statistics_timer.start(1000)
+        else:
+            self.statistics_timer.stop()
+
+    def update_statistics(self):
+        stats = self.pipeline_stats.get_stats()
+
+        # 各 stage 的耗時（毫秒）
+        lines = [f"{'stage':<20}{'n':>5}{'p50':>8}{'p90':>8}{'p99':>8}"]
+        for name, stage in stats["stages"].items():
+            if stage["count"]:
+                lines.append(f"{name:<20}{stage['count']:>5}{stage['p50']:>8.1f}{stage['p90']:>8.1f}{stage['p99']:>8.1f}")
+            else:
+                lines.append(f"{name:<20}{0:>5}{'-':>8}{'-':>8}{'-':>8}")
+
+        # 計數器與快取命中率
+        lines.append("")
+        for name, value in stats["counters"].items():
+            lines.append(f"{name:<20}{value:>10}")
+        for name, value in stats["values"].items():
+            lines.append(f"{name:<20}{value:>10}")
+        for source_name, source_stats in stats["sources"].items():
+            lines.append("")
+            for name, value in source_stats.items():
+                value = f"{value:.2f}" if isinstance(value, float) else value
+                lines.append(f"{source_name}.{name}: {value}")
+        self.statistics_label.setText("\n".join(lines))
+
+    def reset_statistics(self):
+        self.pipeline_stats.reset_stats()
+        self.update_statistics()
+
     def create_about_page(self):
         # 创建一个用于“关于”页面的 QWidget
         about_page = QWidget()
@@ -621,8 +702,7 @@ class SettingsWindow(QDialog):
                 msg_box = QMessageBox()
                 msg_box.setWindowTitle("Information")
                 if self.google_credential.get_google_vision() and self.google_credential.get_google_translation():
-                    new_file_path = os.path.join(self.app_dir_path , "img/messagebox/info.png")
-                    customIcon = QPixmap(new_file_path)  # 加载图标
+                    customIcon = self.asset_cache.get_pixmap("img/messagebox/info.png")
                     msg_box.setIconPixmap(customIcon)
                     msg_box.setText("已成功設置 Google 憑證！")
                     msg_box.exec()
@@ -634,8 +714,7 @@ class SettingsWindow(QDialog):
                     message = self.google_credential.get_message()
                     self.google_credential_state.setText(message)
                 else:
-                    new_file_path = os.path.join(self.app_dir_path , "img/messagebox/warning.png")
-                    customIcon = QPixmap(new_file_path)  # 加载图标
+                    customIcon = self.asset_cache.get_pixmap("img/messagebox/warning.png")
                     msg_box.setIconPixmap(customIcon)
                     msg_box.setText("設置 Google 憑證失敗！\n可能是該 Google 憑證無法使用 或 無法將該 Google 憑證檔案複製至應用程式資料夾底下作為使用！")
                     msg_box.exec()
@@ -652,6 +731,8 @@ class SettingsWindow(QDialog):
 
 
     def closeEvent(self, event):
+        if self.pipeline_stats is not None:
+            self.statistics_timer.stop()
         self.setting_window_closed.emit()
         event.accept()
 
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from change_detector import *
+
+
+# 等待逐字出現（打字機效果）或有動畫的文字穩定後才送出 OCR：畫面維持不變 settle_ms 後才放行，最多等待 max_wait_ms
+class StabilityGate():
+    DEFAULT_SETTLE_MS = 300
+    DEFAULT_MAX_WAIT_MS = 1500
+    DEFAULT_SAMPLE_INTERVAL_MS = 100
+
+    def __init__(self, settle_ms=DEFAULT_SETTLE_MS, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 sample_interval_ms=DEFAULT_SAMPLE_INTERVAL_MS):
+        self.settle_ms = settle_ms
+        self.max_wait_ms = max_wait_ms
+        self.sample_interval_ms = sample_interval_ms
+
+        # 與上一張取樣畫面比較（不論 pipeline 使用哪種比對方法，這裡都使用成本固定的縮圖比對）
+        self.change_detector = ThumbnailChangeDetector()
+        self._first_change_time = None
+        self._last_change_time = None
+        self._lock = threading.Lock()
+
+        # 穩定前被略過的畫面數量（也就是省下的 OCR 請求）
+        self.frames_held = 0
+
+        # 最後一次放行是否因等待逾時（文字可能仍在變化）
+        self.timed_out = False
+
+    def is_enabled(self):
+        return self.settle_ms > 0
+
+    def reset(self):
+        with self._lock:
+            self.change_detector.reset()
+            self._first_change_time = None
+            self._last_change_time = None
+
+    def update(self, image, timestamp):
+        # 回傳 True 代表畫面已穩定（或已等待太久），可以送出 OCR
+        if not self.is_enabled():
+            return True
+
+        with self._lock:
+            if self._first_change_time is None:
+                self._first_change_time = timestamp
+                self._last_change_time = timestamp
+                self.change_detector.set_previous(image)
+            elif not self.change_detector.is_similar_to_previous(image):
+                # 文字仍在變化，重新開始計算穩定時間
+                self._last_change_time = timestamp
+                self.change_detector.set_previous(image)
+
+            settled = (timestamp - self._last_change_time) * 1000 >= self.settle_ms
+            timed_out = (timestamp - self._first_change_time) * 1000 >= self.max_wait_ms
+            if settled or timed_out:
+                self.timed_out = not settled
+                self.change_detector.reset()
+                self._first_change_time = None
+                self._last_change_time = None
+                return True
+
+            self.frames_held += 1
+            return False
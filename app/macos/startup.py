@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import builtins
+import importlib
+import threading
+from PySide6.QtCore import QObject, QEvent, QThread, Signal
+
+
+# 啟動時不需要、但第一次擷取前必須載入的模組（視窗顯示後在背景載入）
+DEFERRED_MODULES = [
+    "cv2",
+    "google.oauth2.service_account",
+    "google.cloud.vision_v1",
+    "google.cloud.translate_v2",
+]
+
+
+# 在背景執行緒中載入 DEFERRED_MODULES，讓第一次擷取時不需再等待 import
+class ModulePreloadThread(QThread):
+    modules_loaded = Signal(dict)
+
+    def __init__(self, module_names=DEFERRED_MODULES):
+        super().__init__()
+        self.module_names = module_names
+
+    def run(self):
+        import_times = {}
+        for module_name in self.module_names:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module_name)
+            except ImportError:
+                continue  # 選用的模組沒有安裝
+            import_times[module_name] = (time.perf_counter() - start) * 1000
+        self.modules_loaded.emit(import_times)
+
+
+# 啟動效能分析模式（python main.py --profile-startup 或設定環境變數 BABELTOWER_PROFILE_STARTUP=1）：
+# 記錄每個模組的 import 耗時與視窗第一次繪製的時間
+class StartupProfiler(QObject):
+    ENVIRONMENT_VARIABLE = "BABELTOWER_PROFILE_STARTUP"
+    COMMAND_LINE_FLAG = "--profile-startup"
+    REPORT_SIZE = 20
+
+    def __init__(self, enabled):
+        super().__init__()
+        self.enabled = enabled
+        self.start_time = time.perf_counter()
+        self.first_paint_ms = None
+        self.preload_times = None
+
+        # (模組名稱, 包含子模組的耗時, 扣除子模組的耗時)
+        self._import_records = []
+        self._local = threading.local()
+        self._original_import = None
+        if enabled:
+            self._install_import_hook()
+
+    @classmethod
+    def from_environment(cls, argv):
+        enabled = cls.COMMAND_LINE_FLAG in argv or os.environ.get(cls.ENVIRONMENT_VARIABLE) == "1"
+        if cls.COMMAND_LINE_FLAG in argv:
+            argv.remove(cls.COMMAND_LINE_FLAG)
+        return cls(enabled)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start_time) * 1000
+
+    def _install_import_hook(self):
+        self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # 只記錄第一次載入的模組（已載入的模組 import 幾乎沒有成本）
+            if level != 0 or (name in sys.modules and all(f"{name}.{item}" in sys.modules or item == "*"
+                                                          for item in fromlist or ())):
+                return self._original_import(name, globals, locals, fromlist, level)
+
+            stack = getattr(self._local, "stack", None)
+            if stack is None:
+                stack = self._local.stack = []
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self._import_records.append((name, elapsed * 1000, (elapsed - children) * 1000))
+
+        builtins.__import__ = timed_import
+
+    def _remove_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def watch_first_paint(self, widget):
+        if self.enabled:
+            widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.first_paint_ms is None:
+            self.first_paint_ms = self.elapsed_ms()
+            watched.removeEventFilter(self)
+            self._remove_import_hook()
+            self.report()
+        return False
+
+    def set_preload_times(self, import_times):
+        if self.enabled:
+            self.preload_times = import_times
+            print("[startup] 背景載入: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in import_times.items()),
+                  file=sys.stderr)
+
+    def report(self):
+        lines = [f"[startup] 第一次繪製: {self.first_paint_ms:.0f} ms",
+                 f"[startup] 啟動期間載入 {len(self._import_records)} 個模組，耗時最多的模組（self / total ms）："]
+        for name, total_ms, self_ms in sorted(self._import_records, key=lambda record: record[2], reverse=True)[:self.REPORT_SIZE]:
+            lines.append(f"[startup]   {self_ms:8.1f} {total_ms:8.1f}  {name}")
+        print("\n".join(lines), file=sys.stderr)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import re
+import unicodedata
+
+
+# OCR 常見的誤認（以正規化後的小寫字母表示），比對時視為相同的字
+OCR_CONFUSIONS = [
+    ("rn", "m"),
+    ("vv", "w"),
+    ("cl", "d"),
+    ("i", "l"),
+]
+
+DIGITS_PATTERN = re.compile(r"\d+")
+
+
+def normalize_ocr_text(text):
+    # 全形 / 半形統一、忽略大小寫、空白與標點符號，並將常見的誤認字元統一
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(char for char in text if unicodedata.category(char)[0] not in "PZSC")
+    for confused, replacement in OCR_CONFUSIONS:
+        text = text.replace(confused, replacement)
+    return text
+
+
+def bounded_edit_distance(a, b, max_distance):
+    # Levenshtein 距離；超過 max_distance 時提前結束並回傳 max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous_row = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current_row = [i]
+        for j, char_b in enumerate(b, 1):
+            current_row.append(min(previous_row[j] + 1, current_row[j - 1] + 1,
+                                   previous_row[j - 1] + (char_a != char_b)))
+        if min(current_row) > max_distance:
+            return max_distance + 1
+        previous_row = current_row
+    return previous_row[-1]
+
+
+# 與最後一次顯示的文字比較：只因 OCR 雜訊（影片背景、特效、游標閃爍）而不同的文字不需再翻譯與更新介面
+class TextDeduplicator():
+    DEFAULT_MAX_DISTANCE_RATIO = 0.08
+
+    def __init__(self, max_distance_ratio=DEFAULT_MAX_DISTANCE_RATIO):
+        self.max_distance_ratio = max_distance_ratio
+        self._last_text = None
+        self._last_digits = None
+
+        # 略過的重複文字數
+        self.duplicates = 0
+
+    def is_duplicate(self, text):
+        # 回傳 True 代表與上一次的文字相同；否則將 text 記錄為新的比較對象
+        normalized = normalize_ocr_text(text)
+        # 數字的變化（例如任務的數量、金額）一定視為新的文字
+        digits = DIGITS_PATTERN.findall(normalized)
+        if self._last_text is not None and digits == self._last_digits:
+            # 短文字必須完全相同，較長的文字才允許少量的差異
+            max_distance = int(max(len(normalized), len(self._last_text)) * self.max_distance_ratio)
+            if bounded_edit_distance(normalized, self._last_text, max_distance) <= max_distance:
+                self.duplicates += 1
+                return True
+
+        self._last_text = normalized
+        self._last_digits = digits
+        return False
+
+    def reset(self):
+        self._last_text = None
+        self._last_digits = None
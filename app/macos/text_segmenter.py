@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import re
+import threading
+
+
+# 一個完整的句子：以句號、問號、驚嘆號或刪節號結尾（可接著引號或括號）；
+# 英文的句尾標點後必須是空白或文字結尾，避免將 "3.5" 或 "a.m" 切開
+SENTENCE_PATTERN = re.compile(r'.*?(?:[.!?…]+["\'”’)\]]*(?=\s|$)|[。！？]+[」』”’）)]*)\s*', re.S)
+
+# 翻譯結果不以空白分隔句子的語言
+NO_SPACE_LANGUAGES = ["zh", "ja", "ko"]
+
+# 行尾是這些標點時，下一行是同一句話的延續
+LINE_CONTINUATION_ENDINGS = ",，、:：;；-—"
+
+
+def split_sentences(text):
+    # 回傳 (完整的句子, 尚未結束的部分)
+    sentences = []
+    end = 0
+    for match in SENTENCE_PATTERN.finditer(text):
+        if match.start() != end:
+            break
+        sentences.append(match.group().strip())
+        end = match.end()
+    return [sentence for sentence in sentences if sentence], text[end:].strip()
+
+
+def join_line(previous_line, line):
+    # 英文單字（或逗號等標點與下一個單字）被換行分開時補回空白，斷字的連字號則移除
+    if previous_line.endswith("-") and line[0].islower():
+        return previous_line[:-1] + line
+    if previous_line[-1].isascii() and previous_line[-1] != "-" and line[0].isascii() and line[0].isalnum():
+        return previous_line + " " + line
+    return previous_line + line
+
+
+def is_continuation(previous_line, line):
+    # 上一行以逗號等標點結束，或上一句尚未結束且下一行以小寫字母開始（自動換行）時，兩行屬於同一段文字；
+    # 其他情況（例如任務列表的每一個項目）各自為一段
+    if previous_line[-1] in LINE_CONTINUATION_ENDINGS:
+        return True
+    return bool(split_sentences(previous_line)[1]) and line[0].islower()
+
+
+def split_paragraphs(text):
+    paragraphs = []
+    for line in (line.strip() for line in text.splitlines()):
+        if not line:
+            continue
+        if paragraphs and is_continuation(paragraphs[-1], line):
+            paragraphs[-1] = join_line(paragraphs[-1], line)
+        else:
+            paragraphs.append(line)
+    return paragraphs
+
+
+def segment_text(text):
+    # 將 OCR 的文字切成段落，每個段落再切成句子；回傳 (每個段落的片段, 最後一個片段是否為尚未結束的句子)
+    paragraphs = []
+    unfinished = False
+    for paragraph in split_paragraphs(text):
+        sentences, remainder = split_sentences(paragraph)
+        unfinished = bool(remainder)
+        paragraphs.append(sentences + [remainder] if remainder else sentences)
+    return paragraphs, unfinished
+
+
+def rebuild_text(paragraphs, translations, target_language):
+    # 依照原本的段落順序組合各片段的翻譯，段落之間換行
+    lines = []
+    index = 0
+    for paragraph in paragraphs:
+        lines.append(join_sentences(translations[index:index + len(paragraph)], target_language))
+        index += len(paragraph)
+    return "\n".join(lines)
+
+
+def join_sentences(parts, target_language):
+    separator = "" if target_language.split("-")[0] in NO_SPACE_LANGUAGES else " "
+    return separator.join(part for part in parts if part)
+
+
+def stable_prefix_length(previous_sentences, sentences):
+    length = 0
+    for previous_sentence, sentence in zip(previous_sentences, sentences):
+        if previous_sentence != sentence:
+            break
+        length += 1
+    return length
+
+
+# 一個擷取區域上一次翻譯的片段；逐字出現的文字只需翻譯新完成的句子
+class IncrementalTranslationState():
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._seq = -1
+            self._segments = []
+            # 與 _segments 對應的翻譯；尚未翻譯（仍在逐字出現）的片段為 None
+            self._translations = []
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._segments), list(self._translations)
+
+    def update(self, seq, segments, translations):
+        # 多個翻譯 worker 可能亂序完成，只保留最新畫面的結果
+        with self._lock:
+            if seq <= self._seq:
+                return
+            self._seq = seq
+            self._segments = segments
+            self._translations = translations
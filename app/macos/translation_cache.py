@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import json
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+# 以「正規化後的原文 + 目標語言」為 key 的 LRU 翻譯快取，並以 append-only 的 JSON Lines 檔案寫入磁碟
+class TranslationCache():
+    DEFAULT_MAX_ENTRIES = 5000
+    DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, cache_file_path, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_file_path = cache_file_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._cache_file = None
+        # 檔案中的資料行數（包含已被覆蓋或淘汰的舊資料）
+        self._line_count = 0
+
+        # hit / miss 計數器
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    @staticmethod
+    def normalize(text):
+        # 統一全形 / 半形字元並合併空白，讓相同的台詞能命中同一個 key
+        text = unicodedata.normalize("NFKC", text)
+        return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+    @classmethod
+    def make_key(cls, text, target_language):
+        return f"{target_language}\x00{cls.normalize(text)}"
+
+    @staticmethod
+    def _entry_size(key, translation):
+        return len(key.encode("utf-8")) + len(translation.encode("utf-8"))
+
+    def _load(self):
+        # 讀取先前 session 的快取（後寫入的資料覆蓋先寫入的資料）
+        line_count = 0
+        if os.path.exists(self.cache_file_path):
+            try:
+                with open(self.cache_file_path, "r", encoding="utf-8") as cache_file:
+                    for line in cache_file:
+                        line_count += 1
+                        try:
+                            record = json.loads(line)
+                            self._insert(record["key"], record["translation"])
+                        except (ValueError, KeyError, TypeError):
+                            continue  # 略過損毀的資料行
+            except OSError:
+                pass
+
+        self._line_count = line_count
+
+        # 若檔案中過期的資料太多，重新寫入一份精簡的檔案
+        if line_count > 2 * len(self._entries):
+            self._compact()
+
+        self._open_cache_file()
+
+    def _open_cache_file(self):
+        try:
+            self._cache_file = open(self.cache_file_path, "a", encoding="utf-8")
+        except OSError:
+            self._cache_file = None  # 無法寫入磁碟時仍可作為記憶體快取使用
+
+    def _compact(self):
+        temp_file_path = self.cache_file_path + ".tmp"
+        try:
+            with open(temp_file_path, "w", encoding="utf-8") as temp_file:
+                for key, translation in self._entries.items():
+                    temp_file.write(json.dumps({"key": key, "translation": translation}, ensure_ascii=False) + "\n")
+            os.replace(temp_file_path, self.cache_file_path)
+            self._line_count = len(self._entries)
+        except OSError:
+            pass
+
+    def _insert(self, key, translation):
+        if key in self._entries:
+            self._size_bytes -= self._entry_size(key, self._entries.pop(key))
+        self._entries[key] = translation
+        self._size_bytes += self._entry_size(key, translation)
+
+        # 超過筆數或記憶體上限時，淘汰最久未使用的資料
+        while self._entries and (len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes):
+            old_key, old_translation = self._entries.popitem(last=False)
+            self._size_bytes -= self._entry_size(old_key, old_translation)
+
+    def get(self, text, target_language):
+        key = self.make_key(text, target_language)
+        with self._lock:
+            translation = self._entries.get(key)
+            if translation is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return translation
+
+    def put(self, text, target_language, translation):
+        key = self.make_key(text, target_language)
+        with self._lock:
+            if self._entries.get(key) == translation:
+                self._entries.move_to_end(key)
+                return
+            self._insert(key, translation)
+
+            # write-through 寫入磁碟
+            if self._cache_file is not None:
+                try:
+                    self._cache_file.write(json.dumps({"key": key, "translation": translation}, ensure_ascii=False) + "\n")
+                    self._cache_file.flush()
+                    self._line_count += 1
+                except OSError:
+                    pass
+
+                # 過期的資料行每累積 max_entries 行就重新寫入一次，檔案最多為 2 * max_entries 行
+                if self._line_count - len(self._entries) >= self.max_entries:
+                    self._cache_file.close()
+                    self._compact()
+                    self._open_cache_file()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        # 關閉時移除檔案中過期的資料，下次啟動時不需讀取
+        with self._lock:
+            if self._cache_file is not None:
+                self._cache_file.close()
+                self._cache_file = None
+                if self._line_count > len(self._entries):
+                    self._compact()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer
+from PySide6.QtWidgets import QListView, QAbstractItemView
+
+
+# 固定容量的環狀緩衝區：append 與索引都是 O(1)，滿了之後覆蓋最舊的資料
+class RingBuffer():
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        # index 0 為最舊的資料；負數由最新的資料開始
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._items[(self._start + index) % self.capacity]
+
+    def __setitem__(self, index, item):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        self._items[(self._start + index) % self.capacity] = item
+
+    def is_full(self):
+        return self._count == self.capacity
+
+    def pop_oldest(self):
+        item = self._items[self._start]
+        self._items[self._start] = None
+        self._start = (self._start + 1) % self.capacity
+        self._count -= 1
+        return item
+
+    def append(self, item):
+        if self.is_full():
+            self.pop_oldest()
+        self._items[(self._start + self._count) % self.capacity] = item
+        self._count += 1
+
+
+# 歷史中的一筆翻譯
+class HistoryEntry():
+    def __init__(self, region_id, source_text, translation, timestamp=None):
+        self.region_id = region_id
+        self.source_text = source_text
+        self.translation = translation
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        # 每一列只顯示一行（所有列的高度相同），完整的原文與翻譯顯示在 tooltip
+        self.display_text = " ".join(translation.split())
+        self.tooltip = f"{source_text}\n\n{translation}"
+
+
+# 以 RingBuffer 保存最近的翻譯：不論 session 多長，記憶體與新增一筆的成本都固定
+class TranslationHistoryModel(QAbstractListModel):
+    DEFAULT_CAPACITY = 500
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self._entries = RingBuffer(capacity)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry.display_text
+        if role == Qt.ToolTipRole:
+            return entry.tooltip
+        return None
+
+    def add(self, region_id, source_text, translation):
+        # 回傳 False 代表翻譯與最後一筆相同，不需更新畫面
+        if not translation:
+            return False
+        if len(self._entries):
+            last_entry = self._entries[-1]
+            if last_entry.region_id == region_id:
+                if last_entry.translation == translation:
+                    return False
+                # 同一個擷取區域逐字出現的文字（原文延續上一筆）只更新最後一筆，不新增一列
+                if last_entry.source_text and source_text.startswith(last_entry.source_text):
+                    self._entries[-1] = HistoryEntry(region_id, source_text, translation, last_entry.timestamp)
+                    last_index = self.index(len(self._entries) - 1)
+                    self.dataChanged.emit(last_index, last_index)
+                    return True
+
+        # 滿了之後先移除最舊的一列，再新增到最後
+        if self._entries.is_full():
+            self.beginRemoveRows(QModelIndex(), 0, 0)
+            self._entries.pop_oldest()
+            self.endRemoveRows()
+        row = len(self._entries)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._entries.append(HistoryEntry(region_id, source_text, translation))
+        self.endInsertRows()
+        return True
+
+
+# 顯示翻譯歷史的 QListView：所有列的高度相同，只有可見的列需要排版與繪製
+class TranslationHistoryView(QListView):
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setTextElideMode(Qt.ElideRight)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setFrameShape(QListView.NoFrame)
+
+        self._follow_latest = True
+        # scrollToBottom 會立即重新排版，因此同一次 event loop 中新增的多筆翻譯只捲動一次
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.setSingleShot(True)
+        self._scroll_timer.setInterval(0)
+        self._scroll_timer.timeout.connect(self.scrollToBottom)
+        model.rowsAboutToBeInserted.connect(self.handle_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self.handle_rows_inserted)
+
+    def handle_rows_about_to_be_inserted(self, parent, first, last):
+        # 只有在捲動到最底部時才跟著顯示最新的翻譯，使用者往上查看時不會被拉回
+        if self._scroll_timer.isActive():
+            return
+        scroll_bar = self.verticalScrollBar()
+        self._follow_latest = scroll_bar.value() >= scroll_bar.maximum()
+
+    def handle_rows_inserted(self, parent, first, last):
+        if self._follow_latest:
+            self._scroll_timer.start()
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+import time
+import queue
+import sqlite3
+import threading
+
+from translation_cache import *
+
+
+# 單一 SQL 查詢中的參數數量上限（舊版 SQLite 為 999）
+MAX_QUERY_PARAMETERS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    id INTEGER PRIMARY KEY,
+    source_key TEXT NOT NULL,
+    source_text TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    source_language TEXT NOT NULL DEFAULT '',
+    target_language TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (source_key, target_language)
+);
+CREATE INDEX IF NOT EXISTS translations_last_seen ON translations (last_seen);
+"""
+
+# 全文檢索索引（external content，由 trigger 與 translations 同步；只有原文或翻譯改變時才更新）
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS translations_fts USING fts5(
+    source_text, translation, content='translations', content_rowid='id', tokenize='{tokenizer}'
+);
+CREATE TRIGGER IF NOT EXISTS translations_fts_insert AFTER INSERT ON translations BEGIN
+    INSERT INTO translations_fts (rowid, source_text, translation) VALUES (new.id, new.source_text, new.translation);
+END;
+CREATE TRIGGER IF NOT EXISTS translations_fts_delete AFTER DELETE ON translations BEGIN
+    INSERT INTO translations_fts (translations_fts, rowid, source_text, translation)
+    VALUES ('delete', old.id, old.source_text, old.translation);
+END;
+CREATE TRIGGER IF NOT EXISTS translations_fts_update AFTER UPDATE OF source_text, translation ON translations BEGIN
+    INSERT INTO translations_fts (translations_fts, rowid, source_text, translation)
+    VALUES ('delete', old.id, old.source_text, old.translation);
+    INSERT INTO translations_fts (rowid, source_text, translation) VALUES (new.id, new.source_text, new.translation);
+END;
+"""
+
+# trigram 可以搜尋中日文等不以空白分詞的文字（SQLite 3.34 以後才有），否則使用 unicode61
+FTS_TOKENIZERS = ["trigram", "unicode61"]
+
+
+# 保存在 SQLite（WAL 模式）中的翻譯記憶：跨 session 保留所有翻譯過的原文、翻譯、語言、首次 / 最後出現時間與命中次數。
+# 查詢以一個 SQL 批次完成；寫入由背景執行緒合併成一個 transaction，翻譯的流程不需等待磁碟寫入
+class TranslationMemory():
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    # 合併寫入的時間間隔
+    FLUSH_INTERVAL_SECONDS = 1.0
+    # 超過大小上限時，刪除最久未使用的資料直到低於上限的這個比例
+    EVICTION_TARGET_RATIO = 0.9
+
+    def __init__(self, database_path, max_bytes=DEFAULT_MAX_BYTES, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.database_path = database_path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reader_connections = []
+        self._write_queue = queue.Queue()
+        self._writer_thread = None
+        self.fts_enabled = False
+
+        # hit / miss 計數器與淘汰的筆數
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        try:
+            self._writer_connection = self._open_database()
+        except sqlite3.Error:
+            self._writer_connection = None  # 無法使用資料庫時，只以記憶體中的翻譯快取運作
+            return
+
+        self._writer_thread = threading.Thread(target=self._write_loop, name="translation-memory", daemon=True)
+        self._writer_thread.start()
+
+    @property
+    def enabled(self):
+        return self._writer_connection is not None
+
+    def _open_database(self):
+        connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        # auto_vacuum 必須在建立資料表之前設定，淘汰後才能將空間還給檔案系統
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("PRAGMA journal_mode = WAL")
+        # WAL 模式下 NORMAL 只在 checkpoint 時 fsync，commit 不需等待磁碟
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.executescript(SCHEMA)
+        for tokenizer in FTS_TOKENIZERS:
+            try:
+                connection.executescript(FTS_SCHEMA.format(tokenizer=tokenizer))
+                self.fts_enabled = True
+                break
+            except sqlite3.OperationalError:
+                continue  # 不支援這個 tokenizer（或沒有 FTS5），搜尋時改用 LIKE
+        connection.commit()
+        return connection
+
+    def _get_reader(self):
+        # 每個執行緒使用自己的連線；WAL 模式下讀取不會被背景的寫入阻擋
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, check_same_thread=False)
+            connection.execute("PRAGMA query_only = 1")
+            self._local.connection = connection
+            with self._lock:
+                self._reader_connections.append(connection)
+        return connection
+
+    def get_many(self, texts, target_language):
+        # 回傳 {原文: 翻譯}，只包含翻譯記憶中有的原文；命中次數與最後出現時間在背景更新
+        if not self.enabled or not texts:
+            return {}
+
+        keys = {}
+        for text in texts:
+            keys.setdefault(TranslationCache.normalize(text), []).append(text)
+        unique_keys = list(keys)
+
+        found = {}
+        try:
+            connection = self._get_reader()
+            for i in range(0, len(unique_keys), MAX_QUERY_PARAMETERS):
+                chunk = unique_keys[i:i + MAX_QUERY_PARAMETERS]
+                rows = connection.execute(
+                    f"SELECT source_key, translation FROM translations "
+                    f"WHERE target_language = ? AND source_key IN ({', '.join('?' * len(chunk))})",
+                    [target_language] + chunk)
+                found.update(rows)
+        except sqlite3.Error:
+            return {}
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(unique_keys) - len(found)
+        if found:
+            self._write_queue.put(("hit", target_language, list(found), time.time()))
+        return {text: translation for key, translation in found.items() for text in keys[key]}
+
+    def put_many(self, records, target_language):
+        # records 為 (原文, 翻譯, 原文的語言) 的 list；寫入在背景執行緒中進行
+        if self.enabled and records:
+            self._write_queue.put(("put", target_language, list(records), time.time()))
+
+    def search(self, query, target_language=None, limit=20):
+        # 以全文檢索搜尋原文或翻譯，依最後出現時間由新到舊排序
+        if not self.enabled or not query.strip():
+            return []
+
+        columns = "t.source_text, t.translation, t.source_language, t.target_language, t.hit_count"
+        language_filter = " AND t.target_language = ?" if target_language else ""
+        language_parameters = [target_language] if target_language else []
+        # trigram 無法搜尋少於 3 個字元的文字，此時與沒有 FTS 時一樣使用 LIKE
+        if self.fts_enabled and len(query.strip()) >= 3:
+            sql = (f"SELECT {columns} FROM translations_fts f JOIN translations t ON t.id = f.rowid "
+                   f"WHERE translations_fts MATCH ?{language_filter} ORDER BY t.last_seen DESC LIMIT ?")
+            parameters = ['"' + query.strip().replace('"', '""') + '"'] + language_parameters + [limit]
+        else:
+            pattern = "%" + query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            sql = (f"SELECT {columns} FROM translations t "
+                   f"WHERE (t.source_text LIKE ? ESCAPE '\\' OR t.translation LIKE ? ESCAPE '\\'){language_filter} "
+                   f"ORDER BY t.last_seen DESC LIMIT ?")
+            parameters = [pattern, pattern] + language_parameters + [limit]
+
+        try:
+            rows = self._get_reader().execute(sql, parameters).fetchall()
+        except sqlite3.Error:
+            return []
+        return [{"source_text": source_text, "translation": translation, "source_language": source_language,
+                 "target_language": target_language, "hit_count": hit_count}
+                for source_text, translation, source_language, target_language, hit_count in rows]
+
+    def _write_loop(self):
+        while True:
+            operations = [self._write_queue.get()]
+            # 收集 flush_interval 內的所有寫入，合併成一個 transaction
+            deadline = time.monotonic() + self.flush_interval
+            while operations[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    operations.append(self._write_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stopping = operations[-1] is None
+            try:
+                self._write([operation for operation in operations if operation is not None])
+                self._evict()
+            except sqlite3.Error:
+                pass  # 寫入失敗只會失去這一批的翻譯記憶
+            if stopping:
+                return
+
+    def _write(self, operations):
+        connection = self._writer_connection
+        with connection:
+            for kind, target_language, items, timestamp in operations:
+                if kind == "put":
+                    connection.executemany(
+                        "INSERT INTO translations (source_key, source_text, translation, source_language, target_language, "
+                        "first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (source_key, target_language) DO UPDATE SET translation = excluded.translation, "
+                        "source_language = excluded.source_language, last_seen = excluded.last_seen",
+                        [(TranslationCache.normalize(text), text, translation, source_language, target_language,
+                          timestamp, timestamp) for text, translation, source_language in items])
+                else:
+                    connection.executemany(
+                        "UPDATE translations SET hit_count = hit_count + 1, last_seen = ? "
+                        "WHERE source_key = ? AND target_language = ?",
+                        [(timestamp, key, target_language) for key in items])
+
+    def _get_size_bytes(self, connection):
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+
+    def _evict(self):
+        # 超過大小上限時，依最後出現時間刪除最舊的資料（每次刪除剩餘筆數的一成），並釋放檔案空間
+        connection = self._writer_connection
+        if self._get_size_bytes(connection) <= self.max_bytes:
+            return
+        target_bytes = self.max_bytes * self.EVICTION_TARGET_RATIO
+        while self._get_size_bytes(connection) > target_bytes:
+            count = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if count == 0:
+                break
+            with connection:
+                deleted = connection.execute(
+                    "DELETE FROM translations WHERE id IN (SELECT id FROM translations ORDER BY last_seen LIMIT ?)",
+                    (max(count // 10, 1),)).rowcount
+                # FTS5 的刪除只會先記錄 tombstone，合併索引後空間才會釋放
+                if self.fts_enabled:
+                    connection.execute("INSERT INTO translations_fts (translations_fts) VALUES ('optimize')")
+            with self._lock:
+                self.evicted += deleted
+        # executescript 才會執行到結束（execute 每次只釋放一個 page）
+        connection.executescript("PRAGMA incremental_vacuum")
+
+    def get_stats(self):
+        entries = 0
+        size_bytes = 0
+        if self.enabled:
+            try:
+                connection = self._get_reader()
+                entries = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                size_bytes = self._get_size_bytes(connection)
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "size_bytes": size_bytes,
+                "evicted": self.evicted,
+                "pending_writes": self._write_queue.qsize(),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evicted = 0
+
+    def close(self):
+        # 寫入仍在佇列中的資料後關閉所有連線
+        if self._writer_thread is not None:
+            self._write_queue.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+        with self._lock:
+            for connection in self._reader_connections:
+                connection.close()
+            self._reader_connections = []
+        if self._writer_connection is not None:
+            self._writer_connection.close()
+            self._writer_connection = None
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import html
+import threading
+
+from translation_cache import *
+from translation_memory import *
+
+
+# 預設的翻譯目標語言代碼（例如：英文 --> en, 繁體中文 --> zh-TW），可由 config.toml 的 target_language 設定
+TARGET_LANGUAGE = "zh-TW"
+
+# Translation API 單一請求的上限（字串數量與總字元數）
+MAX_BATCH_SEGMENTS = 128
+MAX_BATCH_CHARACTERS = 30000
+
+
+# 包裝 Google Translation client，命中快取或翻譯記憶時不會發出 API 請求
+class Translator():
+    def __init__(self, translation_cache: TranslationCache, translation_memory: TranslationMemory = None,
+                 target_language=TARGET_LANGUAGE):
+        self.client_translate = None
+        self.target_language = target_language
+        self.translation_cache = translation_cache
+        self.translation_memory = translation_memory
+        self._lock = threading.Lock()
+        self._warmed_up = False
+
+        # 實際送出的 API 請求數、字串數與字元數（計費依字元數）
+        self.api_calls = 0
+        self.segments_sent = 0
+        self.characters_sent = 0
+
+    def _count_request(self, segments, characters):
+        with self._lock:
+            self.api_calls += 1
+            self.segments_sent += segments
+            self.characters_sent += characters
+
+    def set_client(self, client_translate):
+        # 重新檢查憑證後仍是同一個 client 時，保留已預熱的連線
+        if client_translate is self.client_translate:
+            return
+        self.client_translate = client_translate
+        self._warmed_up = False
+
+    def warm_up(self):
+        # 以不計費的 languages 請求建立 HTTPS 連線並取得 access token（每個 client 只需一次）
+        if self._warmed_up or self.client_translate is None:
+            return
+        self.client_translate.get_languages()
+        self._warmed_up = True
+
+    def translate_many(self, texts, target_language=None):
+        # 一次翻譯多個字串，依照原本的順序回傳；未命中快取的字串合併成一個請求（超過 API 上限時才分批）
+        if target_language is None:
+            target_language = self.target_language
+        translations = [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            if not text.strip():
+                translations[i] = ""
+                continue
+            cached_translation = self.translation_cache.get(text, target_language)
+            if cached_translation is not None:
+                translations[i] = cached_translation
+            else:
+                # 相同的字串只送出一次
+                pending.setdefault(text, []).append(i)
+
+        # 記憶體快取中沒有的字串，以一次查詢向翻譯記憶（先前的 session）查詢
+        for text, remembered_translation in self._recall(list(pending), target_language).items():
+            for i in pending.pop(text):
+                translations[i] = remembered_translation
+
+        batch = []
+        batch_characters = 0
+        for text in pending:
+            if batch and (len(batch) >= MAX_BATCH_SEGMENTS or batch_characters + len(text) > MAX_BATCH_CHARACTERS):
+                self._translate_batch(batch, pending, translations, target_language)
+                batch = []
+                batch_characters = 0
+            batch.append(text)
+            batch_characters += len(text)
+        if batch:
+            self._translate_batch(batch, pending, translations, target_language)
+        return translations
+
+    def _translate_batch(self, batch, pending, translations, target_language):
+        self._count_request(len(batch), sum(len(text) for text in batch))
+        results = self.client_translate.translate(batch, target_language=target_language)
+        records = []
+        for text, translated in zip(batch, results):
+            # Unescape HTML entities
+            unescape_translated_text = html.unescape(translated["translatedText"])
+            self.translation_cache.put(text, target_language, unescape_translated_text)
+            records.append((text, unescape_translated_text, translated.get("detectedSourceLanguage", "")))
+            for i in pending[text]:
+                translations[i] = unescape_translated_text
+        self._remember(records, target_language)
+
+    def _recall(self, texts, target_language):
+        if self.translation_memory is None or not texts:
+            return {}
+        remembered = self.translation_memory.get_many(texts, target_language)
+        # 放入記憶體快取，之後不需再查詢資料庫
+        for text, translation in remembered.items():
+            self.translation_cache.put(text, target_language, translation)
+        return remembered
+
+    def _remember(self, records, target_language):
+        if self.translation_memory is not None:
+            self.translation_memory.put_many(records, target_language)
+
+    def get_stats(self):
+        with self._lock:
+            return {"api_calls": self.api_calls, "segments_sent": self.segments_sent,
+                    "characters_sent": self.characters_sent}
+
+    def reset_stats(self):
+        with self._lock:
+            self.api_calls = 0
+            self.segments_sent = 0
+            self.characters_sent = 0
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from async_requests import AsyncRequestLoop
+
+
+async def never_finishes():
+    await asyncio.sleep(3600)
+
+
+async def add(a, b):
+    return a + b
+
+
+def test_submit_returns_the_coroutine_result():
+    loop = AsyncRequestLoop(2)
+    try:
+        assert loop.submit(add, 1, 2).result(timeout=2) == 3
+    finally:
+        loop.close()
+
+
+def test_unlimited_requests_do_not_take_a_slot():
+    loop = AsyncRequestLoop(1)
+    try:
+        for _ in range(5):
+            loop.submit(never_finishes, limited=False)
+        # 名額仍然可用
+        assert loop.submit(add, 2, 3).result(timeout=2) == 5
+    finally:
+        loop.close()
+
+
+def test_close_cancels_pending_requests_and_closes_the_loop():
+    loop = AsyncRequestLoop(2)
+    futures = [loop.submit(never_finishes), loop.submit(never_finishes, limited=False)]
+    event_loop = loop._loop
+    loop.close()
+    assert all(future.cancelled() for future in futures)
+    assert event_loop.is_closed()
+    with pytest.raises(RuntimeError):
+        loop.submit(add, 1, 2)
+
+
+def test_close_releases_a_submit_waiting_for_a_slot():
+    loop = AsyncRequestLoop(1)
+    loop.submit(never_finishes)
+    errors = []
+
+    def submit_blocked():
+        try:
+            loop.submit(never_finishes)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=submit_blocked)
+    thread.start()
+    time.sleep(0.3)
+    assert thread.is_alive()
+    loop.close()
+    thread.join(timeout=2)
+    assert not thread.is_alive() and len(errors) == 1
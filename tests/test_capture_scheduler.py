@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from capture_scheduler import AdaptiveCaptureScheduler, frequency_to_interval
+
+
+@pytest.fixture(scope="module", autouse=True)
+def application():
+    # QTimer 需要 QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def scheduler():
+    captures = []
+    scheduler = AdaptiveCaptureScheduler(lambda: captures.append(1), min_interval_ms=250, max_interval_ms=4000)
+    scheduler.captures = captures
+    yield scheduler
+    scheduler.stop()
+
+
+def test_unknown_frequency_uses_the_standard_interval():
+    assert frequency_to_interval("高 (1 秒)") == 1000
+    assert frequency_to_interval("unknown") == 2000
+
+
+def test_start_clamps_the_initial_interval(scheduler):
+    scheduler.start(10000)
+    assert scheduler.get_interval() == 4000
+    assert scheduler.is_active()
+
+
+def test_idle_captures_back_off_up_to_the_maximum(scheduler):
+    scheduler.start(1000)
+    intervals = []
+    for _ in range(6):
+        scheduler._on_timeout()
+        intervals.append(scheduler.get_interval())
+    assert intervals == [1500, 2250, 3375, 4000, 4000, 4000]
+    assert len(scheduler.captures) == 6
+
+
+def test_change_switches_to_the_minimum_interval_for_a_burst(scheduler):
+    changes = []
+    scheduler.interval_changed.connect(changes.append)
+    scheduler.start(2000)
+    scheduler.notify_frame_checked(True)
+    assert scheduler.get_interval() == 250
+    # 原本排在 2 秒後的擷取被提前（CoarseTimer 有約 5% 的誤差）
+    assert scheduler._timer.remainingTime() < 1000
+
+    # 變化之後的 BURST_TICKS 次擷取維持最短間隔，之後才開始放慢
+    for _ in range(AdaptiveCaptureScheduler.BURST_TICKS):
+        scheduler._on_timeout()
+        assert scheduler.get_interval() == 250
+    scheduler._on_timeout()
+    assert scheduler.get_interval() == 375
+    assert changes == [2000, 250, 375]
+
+
+def test_unchanged_frames_and_a_stopped_scheduler_are_ignored(scheduler):
+    scheduler.start(2000)
+    scheduler.notify_frame_checked(False)
+    assert scheduler.get_interval() == 2000
+    scheduler.stop()
+    scheduler.notify_frame_checked(True)
+    assert scheduler.get_interval() == 2000
+
+
+def test_request_capture_only_brings_the_next_capture_forward(scheduler):
+    scheduler.start(2000)
+    scheduler.request_capture(100)
+    assert scheduler._timer.remainingTime() < 500
+    scheduler.request_capture(1000)
+    assert scheduler._timer.remainingTime() < 500
+    assert scheduler.get_interval() == 2000
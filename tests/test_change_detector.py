@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from change_detector import TextMaskChangeDetector, ThumbnailChangeDetector
+
+
+def render_text(text, width, height, font_size, outline=False):
+    image = Image.new("RGB", (width, height), (30, 40, 50))
+    stroke = {"stroke_width": 2, "stroke_fill": (0, 0, 0)} if outline else {}
+    ImageDraw.Draw(image).text((40, height // 3), text, fill=(255, 255, 255),
+                               font=ImageFont.load_default(size=font_size), **stroke)
+    return np.asarray(image)
+
+
+def is_similar(detector, previous, current):
+    detector.set_previous(previous)
+    return detector.is_similar_to_previous(current)
+
+
+@pytest.mark.parametrize("width,height", [(1200, 300), (1920, 400)])
+@pytest.mark.parametrize("font_size", [24, 32])
+@pytest.mark.parametrize("outline", [False, True])
+@pytest.mark.parametrize("before,after", [("Quest: 3/5 wolves slain", "Quest: 4/5 wolves slain"),
+                                          ("Quest: 1/5", "Quest: 7/5")])
+def test_text_mask_detects_a_single_digit_change(width, height, font_size, outline, before, after):
+    previous = render_text(before, width, height, font_size, outline)
+    current = render_text(after, width, height, font_size, outline)
+    assert not is_similar(TextMaskChangeDetector(), previous, current)
+
+
+@pytest.mark.parametrize("outline", [False, True])
+def test_text_mask_detects_text_disappearing_on_a_wide_region(outline):
+    previous = render_text("Hello", 1920, 400, 24, outline)
+    current = render_text("", 1920, 400, 24, outline)
+    assert not is_similar(TextMaskChangeDetector(), previous, current)
+
+
+@pytest.mark.parametrize("width,height", [(600, 120), (1920, 400)])
+def test_text_mask_ignores_noise(width, height):
+    previous = render_text("Quest: 3/5 wolves slain", width, height, 24, outline=True)
+    noise = np.random.default_rng(0).integers(-6, 7, previous.shape)
+    current = np.clip(previous.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    assert is_similar(TextMaskChangeDetector(), previous, current)
+
+
+def test_text_mask_ignores_a_smooth_background_change():
+    previous = render_text("Hello", 1200, 300, 24, outline=True)
+    gradient = np.linspace(0, 40, 1200, dtype=np.int16)[None, :, None]
+    current = np.clip(previous.astype(np.int16) + gradient, 0, 255).astype(np.uint8)
+    assert is_similar(TextMaskChangeDetector(), previous, current)
+
+
+@pytest.mark.parametrize("width,height", [(1920, 400), (2560, 600)])
+@pytest.mark.parametrize("font_size", [14, 16, 18])
+@pytest.mark.parametrize("before,after", [("Quest: 3/5 wolves slain", "Quest: 4/5 wolves slain"),
+                                          ("I will go.", "I will go!"),
+                                          ("Level 8", "Level 3")])
+def test_thumbnail_detects_a_single_character_change(width, height, font_size, before, after):
+    previous = render_text(before, width, height, font_size)
+    current = render_text(after, width, height, font_size)
+    assert not is_similar(ThumbnailChangeDetector(), previous, current)
+
+
+@pytest.mark.parametrize("width,height", [(600, 120), (1920, 400), (2560, 600)])
+def test_thumbnail_ignores_noise(width, height):
+    previous = render_text("Quest: 3/5 wolves slain", width, height, 16)
+    noise = np.random.default_rng(0).integers(-6, 7, previous.shape)
+    current = np.clip(previous.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    assert is_similar(ThumbnailChangeDetector(), previous, current)
+
+
+def test_thumbnail_treats_a_resized_region_as_changed():
+    previous = render_text("Hello", 600, 120, 16)
+    current = render_text("Hello", 640, 120, 16)
+    assert not is_similar(ThumbnailChangeDetector(), previous, current)
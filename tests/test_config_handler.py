@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+
+import pytest
+import toml
+
+from config_handler import ConfigHandler
+
+
+@pytest.fixture
+def config_handler(tmp_path, monkeypatch):
+    # 以打包後的路徑規則把設定檔放在暫存資料夾，不會寫入專案中的 config.toml
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+    monkeypatch.setattr(sys, "_MEIPASS", str(tmp_path / "bundle"), raising=False)
+    monkeypatch.setattr(ConfigHandler, "_user_data_dir", staticmethod(lambda: str(tmp_path / "data")))
+    monkeypatch.setattr(ConfigHandler, "FLUSH_DELAY_SECONDS", 0.05)
+    handler = ConfigHandler()
+    yield handler
+    handler.flush()
+
+
+def count_writes(handler, monkeypatch):
+    writes = []
+    write_config_file = handler._write_config_file
+    monkeypatch.setattr(handler, "_write_config_file", lambda config: (writes.append(1), write_config_file(config)))
+    return writes
+
+
+def read_settings(handler):
+    with open(handler.config_file_path, "r") as config_file:
+        return toml.load(config_file)["Settings"]
+
+
+def test_default_config_file_is_created(config_handler):
+    assert read_settings(config_handler)["text_font_size"] == ConfigHandler.DEFAULT_FONT_SIZE
+    assert config_handler.get_font_color() == ConfigHandler.DEFAULT_FONT_COLOR
+
+
+def test_consecutive_changes_are_written_once(config_handler, monkeypatch):
+    writes = count_writes(config_handler, monkeypatch)
+    for font_size in range(15, 25):
+        config_handler.set_font_size(font_size)
+    # 設定立即生效，但還沒寫入磁碟
+    assert config_handler.get_font_size() == 24
+    assert read_settings(config_handler)["text_font_size"] == ConfigHandler.DEFAULT_FONT_SIZE
+
+    time.sleep(0.3)
+    assert writes == [1]
+    assert read_settings(config_handler)["text_font_size"] == 24
+
+
+def test_flush_writes_pending_changes_immediately(config_handler, monkeypatch):
+    writes = count_writes(config_handler, monkeypatch)
+    config_handler.set_font_color("#FF0000")
+    config_handler.flush()
+    assert read_settings(config_handler)["text_font_color"] == "#FF0000"
+    time.sleep(0.2)
+    config_handler.flush()
+    assert writes == [1]
+
+
+def test_unchanged_value_is_not_written_or_notified(config_handler, monkeypatch):
+    writes = count_writes(config_handler, monkeypatch)
+    notifications = []
+    config_handler.subscribe(lambda key, value: notifications.append((key, value)))
+    config_handler.set_font_size(ConfigHandler.DEFAULT_FONT_SIZE)
+    config_handler.set_font_size(20)
+    config_handler.flush()
+    assert notifications == [("text_font_size", 20)]
+    assert writes == [1]
+
+
+def test_settings_are_reloaded_by_a_new_handler(config_handler):
+    config_handler.set_capture_frequency("慢 (3 秒)")
+    config_handler.flush()
+    assert ConfigHandler().get_capture_frequency() == "慢 (3 秒)"
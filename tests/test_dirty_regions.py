@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from dirty_regions import DirtyRegionTracker, find_text_bands, split_text_by_bands, stitch_bands
+from ocr_engines import OcrWord
+
+
+def make_text_image(lines, height=240, width=480, line_height=24):
+    # 每一行「文字」為垂直的筆畫，筆畫的排列由該行的內容決定；行與行之間為空白
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    for i, text in enumerate(lines):
+        top = 20 + i * 2 * line_height
+        rng = np.random.default_rng(sum(map(ord, text)))
+        for x in rng.choice(np.arange(10, width - 10, 4), size=40, replace=False):
+            image[top:top + line_height, x:x + 2] = 255
+    return image
+
+
+def render_text_lines(lines, width, height, font_size, line_spacing=90):
+    image = Image.new("RGB", (width, height), (30, 40, 50))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=font_size)
+    for i, text in enumerate(lines):
+        draw.text((40, 30 + i * line_spacing), text, fill=(255, 255, 255), font=font)
+    return np.asarray(image)
+
+
+def test_bands_split_between_text_lines_and_cover_the_image():
+    bands = find_text_bands(make_text_image(["a", "b", "c"]), max_bands=6)
+    assert len(bands) == 3
+    assert bands[0][0] == 0 and bands[-1][1] == 240
+    assert all(bands[i][1] == bands[i + 1][0] for i in range(len(bands) - 1))
+
+
+def test_bands_are_merged_down_to_max_bands():
+    assert len(find_text_bands(make_text_image(["a", "b", "c", "d"]), max_bands=2)) == 2
+    assert find_text_bands(make_text_image(["a", "b"]), max_bands=1) == [(0, 240)]
+
+
+def test_blank_image_is_a_single_band():
+    assert find_text_bands(np.zeros((100, 200, 3), dtype=np.uint8), max_bands=6) == [(0, 100)]
+
+
+def test_first_frame_needs_full_ocr():
+    layout = DirtyRegionTracker().plan(make_text_image(["a", "b", "c"]))
+    assert layout.dirty_bands is None
+
+
+def test_only_changed_bands_are_dirty():
+    tracker = DirtyRegionTracker()
+    layout = tracker.plan(make_text_image(["a", "b", "c"]))
+    layout.merge_texts(["A", "B", "C"])
+
+    changed = tracker.plan(make_text_image(["a", "x", "c"]))
+    assert changed.dirty_bands == [1]
+    assert changed.merge_texts(["X"]) == "A\nX\nC"
+
+
+def test_change_outside_the_bands_needs_full_ocr():
+    # plan 只在 change detector 判斷畫面有變化後呼叫；沒有 band 改變時不能沿用上一張畫面的文字
+    tracker = DirtyRegionTracker()
+    tracker.plan(make_text_image(["a", "b", "c"])).merge_texts(["A", "B", "C"])
+    assert tracker.plan(make_text_image(["a", "b", "c"])).dirty_bands is None
+
+
+@pytest.mark.parametrize("width, height, font_size", [(600, 300, 16), (1200, 300, 16), (1920, 400, 16),
+                                                      (1920, 400, 24), (1200, 300, 32)])
+@pytest.mark.parametrize("before, after", [("Quest: 3/5 wolves slain", "Quest: 4/5 wolves slain"),
+                                           ("I will go.", "I will go!")])
+def test_single_glyph_change_on_a_wide_region_is_dirty(width, height, font_size, before, after):
+    tracker = DirtyRegionTracker()
+    layout = tracker.plan(render_text_lines(["Talk to Anna", before, "Return home"], width, height, font_size))
+    assert len(layout.bands) == 3
+    layout.merge_texts(["Talk to Anna", before, "Return home"])
+    changed = tracker.plan(render_text_lines(["Talk to Anna", after, "Return home"], width, height, font_size))
+    assert changed.dirty_bands == [1]
+
+
+def test_unrecognized_previous_frame_needs_full_ocr():
+    tracker = DirtyRegionTracker()
+    tracker.plan(make_text_image(["a", "b", "c"]))
+    assert tracker.plan(make_text_image(["a", "x", "c"])).dirty_bands is None
+
+
+def test_cached_texts_allow_partial_ocr_of_the_next_frame():
+    tracker = DirtyRegionTracker()
+    layout = tracker.plan(make_text_image(["a", "b", "c"]))
+    assert layout.reuse_cached_texts(["A", "", "C"]) == "A\nC"
+    assert tracker.plan(make_text_image(["a", "b", "x"])).dirty_bands == [2]
+
+
+def test_cached_texts_with_other_bands_are_not_recorded():
+    tracker = DirtyRegionTracker()
+    layout = tracker.plan(make_text_image(["a", "b", "c"]))
+    assert layout.reuse_cached_texts(["A", "B"]) == "A\nB"
+    assert layout.texts is None
+    assert tracker.plan(make_text_image(["a", "b", "x"])).dirty_bands is None
+
+
+def test_reset_forgets_the_previous_frame():
+    tracker = DirtyRegionTracker()
+    tracker.plan(make_text_image(["a", "b", "c"])).merge_texts(["A", "B", "C"])
+    tracker.reset()
+    assert tracker.plan(make_text_image(["a", "b", "c"])).dirty_bands is None
+
+
+def test_stitch_bands():
+    image = make_text_image(["a", "b", "c"])
+    bands = [(0, 50), (50, 100), (100, 240)]
+    stitched, ranges = stitch_bands(image, bands, [0, 2], spacing=16)
+    assert ranges == [(0, 50), (66, 206)]
+    assert stitched.shape == (206, 480, 3)
+    assert np.array_equal(stitched[66:206], image[100:240])
+
+
+def test_split_text_by_bands_uses_word_positions():
+    words = [OcrWord("Hello", (0, 5, 40, 20)), OcrWord("there", (50, 5, 90, 20)), OcrWord("World", (0, 70, 40, 90))]
+    assert split_text_by_bands("Hello there\nWorld", words, [(0, 50), (66, 206)]) == ["Hello there", "World"]
+    assert split_text_by_bands("", [], []) == []
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+from google.auth import exceptions as auth_exceptions
+
+from google_credentials import CredentialValidationCache, credential_file_key, is_auth_error
+
+
+@pytest.mark.parametrize("error", [
+    google_exceptions.Unauthorized("revoked"),  # translate_v2 的 HTTP 401
+    google_exceptions.Forbidden("no permission"),  # translate_v2 的 HTTP 403
+    google_exceptions.from_http_status(401, "revoked"),
+    google_exceptions.from_http_status(403, "no permission"),
+    google_exceptions.Unauthenticated("revoked"),  # Vision 的 gRPC UNAUTHENTICATED
+    google_exceptions.PermissionDenied("no permission"),  # Vision 的 gRPC PERMISSION_DENIED
+    auth_exceptions.RefreshError("expired"),
+])
+def test_auth_errors_are_recognized(error):
+    assert is_auth_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    google_exceptions.TooManyRequests("quota"),
+    google_exceptions.ServiceUnavailable("down"),
+    google_exceptions.BadRequest("bad"),
+    ConnectionError("offline"),
+])
+def test_other_errors_are_not_auth_errors(error):
+    assert not is_auth_error(error)
+
+
+def test_validation_is_remembered_across_instances(tmp_path):
+    cache_file_path = str(tmp_path / "credential_validation.json")
+    CredentialValidationCache(cache_file_path).mark_valid("key")
+    cache = CredentialValidationCache(cache_file_path)
+    assert cache.is_valid("key")
+    assert not cache.is_valid("other")
+
+
+def test_validation_expires_after_the_ttl(tmp_path):
+    cache = CredentialValidationCache(str(tmp_path / "credential_validation.json"), ttl_seconds=60)
+    cache.mark_valid("key")
+    cache._validated["key"] = time.time() - 61
+    assert not cache.is_valid("key")
+
+
+def test_invalidate_forgets_the_key(tmp_path):
+    cache_file_path = str(tmp_path / "credential_validation.json")
+    cache = CredentialValidationCache(cache_file_path)
+    cache.mark_valid("key")
+    cache.invalidate("key")
+    assert not cache.is_valid("key")
+    assert not CredentialValidationCache(cache_file_path).is_valid("key")
+
+
+def test_corrupt_cache_file_is_ignored(tmp_path):
+    cache_file_path = tmp_path / "credential_validation.json"
+    cache_file_path.write_text("not json", encoding="utf-8")
+    assert not CredentialValidationCache(str(cache_file_path)).is_valid("key")
+
+
+def test_key_changes_when_the_key_file_changes(tmp_path):
+    key_file_path = tmp_path / "key.json"
+    key_file_path.write_text('{"a": 1}', encoding="utf-8")
+    key = credential_file_key(str(key_file_path))
+    assert credential_file_key(str(key_file_path)) == key
+    key_file_path.write_text('{"a": 2}', encoding="utf-8")
+    os.utime(key_file_path, (1, 1))
+    assert credential_file_key(str(key_file_path)) != key
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from image_hash import difference_hash, hamming_distance, hamming_distances
+from ocr_cache import OcrResultCache
+
+
+def make_frame(seed, height=60, width=400):
+    # 隨機的「文字」方塊，不同的 seed 產生完全不同的畫面
+    rng = np.random.default_rng(seed)
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(30):
+        x, y = rng.integers(0, width - 12), rng.integers(0, height - 12)
+        image[y:y + 12, x:x + 6] = 255
+    return image
+
+
+def render_text(text, width, height, font_size):
+    image = Image.new("RGB", (width, height), (30, 40, 50))
+    ImageDraw.Draw(image).text((40, height // 3), text, fill=(255, 255, 255), font=ImageFont.load_default(size=font_size))
+    return np.asarray(image)
+
+
+def test_difference_hash_is_stable_and_distinguishes_frames():
+    frame = make_frame(1)
+    assert hamming_distance(difference_hash(frame), difference_hash(frame.copy())) == 0
+    assert hamming_distance(difference_hash(frame), difference_hash(make_frame(2))) > 50
+
+
+def test_difference_hash_ignores_small_brightness_noise():
+    frame = make_frame(1)
+    noisy = np.clip(frame.astype(np.int16) + np.random.default_rng(0).integers(-2, 3, frame.shape), 0, 255)
+    assert hamming_distance(difference_hash(frame), difference_hash(noisy.astype(np.uint8))) <= 2
+
+
+def test_hamming_distances_matches_hamming_distance():
+    hashes = np.stack([difference_hash(make_frame(seed)) for seed in range(4)])
+    target = difference_hash(make_frame(2))
+    assert list(hamming_distances(hashes, target)) == [hamming_distance(h, target) for h in hashes]
+
+
+def test_lookup_returns_band_texts_of_a_similar_frame():
+    cache = OcrResultCache()
+    cache.store(cache.compute_hash(make_frame(1)), ["Hello", "World"])
+    assert cache.lookup(cache.compute_hash(make_frame(1))) == ["Hello", "World"]
+    assert cache.lookup(cache.compute_hash(make_frame(2))) is None
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_noisy_copy_of_a_frame_is_a_hit():
+    cache = OcrResultCache()
+    frame = render_text("Quest: 3/5 wolves slain", 1920, 400, 24)
+    cache.store(cache.compute_hash(frame), ["Quest: 3/5 wolves slain"])
+    noisy = np.clip(frame.astype(np.int16) + np.random.default_rng(0).integers(-3, 4, frame.shape), 0, 255)
+    assert cache.lookup(cache.compute_hash(noisy.astype(np.uint8))) == ["Quest: 3/5 wolves slain"]
+
+
+@pytest.mark.parametrize("width, height, font_size", [(1200, 300, 14), (1200, 300, 16), (1920, 400, 16),
+                                                      (1920, 400, 24), (2560, 600, 18)])
+@pytest.mark.parametrize("before, after", [("Quest: 3/5 wolves slain", "Quest: 4/5 wolves slain"),
+                                           ("I will go.", "I will go!")])
+def test_single_glyph_change_is_a_miss(width, height, font_size, before, after):
+    # 縮小後的 dHash 幾乎相同，但仍必須重新辨識
+    cache = OcrResultCache()
+    cache.store(cache.compute_hash(render_text(before, width, height, font_size)), [before])
+    assert cache.lookup(cache.compute_hash(render_text(after, width, height, font_size))) is None
+
+
+def test_stored_texts_are_copied():
+    cache = OcrResultCache()
+    texts = ["Hello"]
+    frame_hash = cache.compute_hash(make_frame(1))
+    cache.store(frame_hash, texts)
+    texts.append("changed")
+    assert cache.lookup(frame_hash) == ["Hello"]
+
+
+def test_oldest_frame_is_overwritten_when_full():
+    cache = OcrResultCache(capacity=2)
+    hashes = [cache.compute_hash(make_frame(seed)) for seed in range(3)]
+    for seed, frame_hash in enumerate(hashes):
+        cache.store(frame_hash, [f"text {seed}"])
+    assert cache.lookup(hashes[0]) is None
+    assert cache.lookup(hashes[1]) == ["text 1"]
+    assert cache.lookup(hashes[2]) == ["text 2"]
+    assert cache.get_stats()["entries"] == 2
+
+
+def test_different_hash_size_is_a_miss():
+    # 擷取範圍的長寬比例改變時 hash 的大小也不同
+    cache = OcrResultCache()
+    cache.store(cache.compute_hash(make_frame(1)), ["Hello"])
+    assert cache.lookup(cache.compute_hash(make_frame(1, height=200))) is None
+
+
+def test_clear():
+    cache = OcrResultCache()
+    frame_hash = cache.compute_hash(make_frame(1))
+    cache.store(frame_hash, ["Hello"])
+    cache.clear()
+    assert cache.lookup(frame_hash) is None
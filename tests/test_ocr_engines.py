@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from ocr_engines import TesseractOcrEngine
+
+
+HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def tsv_row(level, block, paragraph, line, word, left, top, width, height, text):
+    return "\t".join(str(value) for value in [level, 1, block, paragraph, line, word, left, top, width, height, 90, text])
+
+
+def test_words_are_grouped_into_lines():
+    tsv = "\n".join([
+        HEADER,
+        tsv_row(4, 1, 1, 1, 0, 10, 10, 200, 20, ""),
+        tsv_row(5, 1, 1, 1, 1, 10, 10, 50, 20, "Hello"),
+        tsv_row(5, 1, 1, 1, 2, 70, 12, 60, 18, "world"),
+        tsv_row(5, 1, 1, 2, 1, 10, 40, 40, 20, "Bye"),
+    ])
+    result = TesseractOcrEngine.parse_tsv(tsv, "eng")
+    assert result.text == "Hello world\nBye"
+    assert [word.text for word in result.words] == ["Hello", "world", "Bye"]
+    assert result.words[1].box == (70, 12, 130, 30)
+    assert [(line.text, line.box) for line in result.lines] == [("Hello world", (10, 10, 130, 30)),
+                                                              ("Bye", (10, 40, 50, 60))]
+    assert result.locale == "eng"
+
+
+def test_empty_words_and_malformed_rows_are_skipped():
+    tsv = "\n".join([
+        HEADER,
+        tsv_row(5, 1, 1, 1, 1, 10, 10, 50, 20, " "),
+        "5\t1\t1",
+        tsv_row(5, 1, 1, 1, 2, 70, 10, 50, 20, "ok"),
+    ])
+    result = TesseractOcrEngine.parse_tsv(tsv)
+    assert result.text == "ok"
+
+
+def test_no_words_is_an_empty_result():
+    assert not TesseractOcrEngine.parse_tsv(HEADER + "\n")
+    assert not TesseractOcrEngine.parse_tsv("")
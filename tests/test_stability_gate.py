@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from stability_gate import StabilityGate
+
+
+def make_frame(characters):
+    # 每個「字元」是一個白色方塊，逐字出現時方塊逐漸增加
+    image = np.zeros((60, 400, 3), dtype=np.uint8)
+    for i in range(characters):
+        image[20:40, 10 + i * 16:20 + i * 16] = 255
+    return image
+
+
+def test_static_text_is_released_after_settling():
+    gate = StabilityGate(settle_ms=300, max_wait_ms=1500)
+    frame = make_frame(5)
+    assert not gate.update(frame, 0.0)
+    assert not gate.update(frame, 0.2)
+    assert gate.update(frame, 0.3)
+    assert not gate.timed_out
+    assert gate.frames_held == 2
+
+
+def test_typewriter_text_is_held_until_it_stops_changing():
+    gate = StabilityGate(settle_ms=300, max_wait_ms=1500)
+    for i in range(5):
+        assert not gate.update(make_frame(i + 1), i * 0.125)
+    assert not gate.update(make_frame(5), 0.75)
+    assert gate.update(make_frame(5), 0.875)
+    assert not gate.timed_out
+
+
+def test_text_that_keeps_changing_is_released_after_the_max_wait():
+    gate = StabilityGate(settle_ms=300, max_wait_ms=1000)
+    released = [gate.update(make_frame(i + 1), i * 0.125) for i in range(9)]
+    assert released == [False] * 8 + [True]
+    assert gate.timed_out
+
+
+def test_disabled_gate_releases_every_frame():
+    gate = StabilityGate(settle_ms=0)
+    assert gate.update(make_frame(1), 0.0)
+    assert gate.update(make_frame(2), 0.1)
+    assert gate.frames_held == 0
+
+
+def test_reset_starts_a_new_wait():
+    gate = StabilityGate(settle_ms=300, max_wait_ms=1500)
+    gate.update(make_frame(1), 0.0)
+    gate.reset()
+    assert not gate.update(make_frame(1), 0.3)
+    assert gate.update(make_frame(1), 0.6)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from text_dedup import TextDeduplicator, bounded_edit_distance, normalize_ocr_text
+
+
+def test_normalize_ignores_case_whitespace_and_punctuation():
+    assert normalize_ocr_text("Hello,  World!") == normalize_ocr_text("hello world")
+    assert normalize_ocr_text("ＡＢＣ") == normalize_ocr_text("abc")
+
+
+def test_normalize_merges_common_ocr_confusions():
+    assert normalize_ocr_text("modern") == normalize_ocr_text("rnodern")
+    assert normalize_ocr_text("will") == normalize_ocr_text("wiii")
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance("kitten", "sitting", 5) == 3
+    assert bounded_edit_distance("same", "same", 0) == 0
+    # 超過上限時提前結束
+    assert bounded_edit_distance("abcdef", "uvwxyz", 2) == 3
+    assert bounded_edit_distance("a", "abcdef", 2) == 3
+
+
+def test_same_text_with_ocr_noise_is_duplicate():
+    deduplicator = TextDeduplicator()
+    assert not deduplicator.is_duplicate("The road north is closed until tomorrow morning.")
+    assert deduplicator.is_duplicate("the road north is closed until tomorrow rnorning")
+    assert deduplicator.duplicates == 1
+
+
+def test_short_text_must_match_exactly():
+    deduplicator = TextDeduplicator()
+    assert not deduplicator.is_duplicate("Yes")
+    assert not deduplicator.is_duplicate("Yet")
+
+
+def test_changed_digits_are_never_duplicates():
+    deduplicator = TextDeduplicator()
+    assert not deduplicator.is_duplicate("Collect the herbs for the village healer (3/10)")
+    assert not deduplicator.is_duplicate("Collect the herbs for the village healer (4/10)")
+
+
+def test_different_text_becomes_the_new_reference():
+    deduplicator = TextDeduplicator()
+    assert not deduplicator.is_duplicate("First line of dialogue.")
+    assert not deduplicator.is_duplicate("Something else entirely.")
+    assert deduplicator.is_duplicate("Something else entirely.")
+    assert not deduplicator.is_duplicate("First line of dialogue.")
+
+
+def test_reset_forgets_the_last_text():
+    deduplicator = TextDeduplicator()
+    deduplicator.is_duplicate("Hello there.")
+    deduplicator.reset()
+    assert not deduplicator.is_duplicate("Hello there.")
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from text_segmenter import (IncrementalTranslationState, join_line, rebuild_text, segment_text, split_paragraphs,
+                            split_sentences, stable_prefix_length)
+
+
+def test_split_sentences_returns_unfinished_remainder():
+    assert split_sentences("Hello, traveler. The road north") == (["Hello, traveler."], "The road north")
+    assert split_sentences("Wait! Really?") == (["Wait!", "Really?"], "")
+
+
+def test_split_sentences_keeps_decimals_and_abbreviations():
+    assert split_sentences("It costs 3.5 gold") == ([], "It costs 3.5 gold")
+
+
+def test_split_sentences_cjk():
+    assert split_sentences("你好。再見") == (["你好。"], "再見")
+    assert split_sentences("「走吧！」他說") == (["「走吧！」"], "他說")
+
+
+def test_join_line():
+    assert join_line("over the", "hill") == "over the hill"
+    assert join_line("inter-", "national") == "international"
+    assert join_line("你好，", "世界") == "你好，世界"
+
+
+def test_split_paragraphs_joins_wrapped_lines():
+    text = "The road north is closed,\nso you will have to wait.\nCome back tomorrow and\nwe will see."
+    assert split_paragraphs(text) == ["The road north is closed, so you will have to wait.",
+                                      "Come back tomorrow and we will see."]
+
+
+def test_split_paragraphs_keeps_list_items_apart():
+    assert split_paragraphs("Quest log\nFind the key\n\nTalk to Anna") == ["Quest log", "Find the key", "Talk to Anna"]
+
+
+def test_segment_text_marks_unfinished_last_sentence():
+    paragraphs, unfinished = segment_text("Hello, traveler. The road north")
+    assert paragraphs == [["Hello, traveler.", "The road north"]]
+    assert unfinished
+
+    paragraphs, unfinished = segment_text("Quest log\nFind the key.")
+    assert paragraphs == [["Quest log"], ["Find the key."]]
+    assert not unfinished
+
+
+def test_rebuild_text_joins_by_target_language():
+    paragraphs = [["A.", "B."], ["C."]]
+    assert rebuild_text(paragraphs, ["甲。", "乙。", "丙。"], "zh-TW") == "甲。乙。\n丙。"
+    assert rebuild_text(paragraphs, ["a.", "b.", "c."], "en") == "a. b.\nc."
+
+
+def test_stable_prefix_length():
+    assert stable_prefix_length(["a", "b", "c"], ["a", "b", "x"]) == 2
+    assert stable_prefix_length([], ["a"]) == 0
+
+
+def test_incremental_state_ignores_older_frames():
+    state = IncrementalTranslationState()
+    state.update(2, ["new"], ["nouveau"])
+    state.update(1, ["old"], ["vieux"])
+    assert state.snapshot() == (["new"], ["nouveau"])
+    state.reset()
+    assert state.snapshot() == ([], [])
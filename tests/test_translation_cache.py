@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from translation_cache import TranslationCache
+
+
+def read_lines(cache_file_path):
+    with open(cache_file_path, "r", encoding="utf-8") as cache_file:
+        return [json.loads(line) for line in cache_file]
+
+
+def test_normalized_text_hits_the_same_entry(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.jsonl"))
+    cache.put("Hello  world", "zh-TW", "你好世界")
+    assert cache.get(" Ｈｅｌｌｏ world ", "zh-TW") == "你好世界"
+    assert cache.get("Hello world", "ja") is None
+    cache.close()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.jsonl"), max_entries=2)
+    cache.put("a", "zh-TW", "A")
+    cache.put("b", "zh-TW", "B")
+    cache.get("a", "zh-TW")
+    cache.put("c", "zh-TW", "C")
+    assert cache.get("b", "zh-TW") is None
+    assert cache.get("a", "zh-TW") == "A"
+    assert cache.get("c", "zh-TW") == "C"
+    cache.close()
+
+
+def test_entries_are_evicted_when_over_the_byte_limit(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.jsonl"), max_bytes=100)
+    for i in range(10):
+        cache.put(f"line {i}", "zh-TW", "x" * 20)
+    stats = cache.get_stats()
+    assert stats["size_bytes"] <= 100
+    assert stats["entries"] < 10
+    assert cache.get("line 9", "zh-TW") == "x" * 20
+    cache.close()
+
+
+def test_entries_are_reloaded_in_the_next_session(tmp_path):
+    cache_file_path = str(tmp_path / "cache.jsonl")
+    cache = TranslationCache(cache_file_path)
+    cache.put("Hello", "zh-TW", "你好")
+    cache.put("Hello", "zh-TW", "哈囉")
+    cache.close()
+    assert TranslationCache(cache_file_path).get("Hello", "zh-TW") == "哈囉"
+
+
+def test_file_is_compacted_while_writing(tmp_path):
+    cache_file_path = str(tmp_path / "cache.jsonl")
+    cache = TranslationCache(cache_file_path, max_entries=4)
+    for i in range(20):
+        cache.put(f"line {i}", "zh-TW", str(i))
+        # 過期的資料行不會超過 max_entries 行
+        assert len(read_lines(cache_file_path)) < 2 * 4 + 1
+    cache.close()
+
+
+def test_close_drops_stale_lines(tmp_path):
+    cache_file_path = str(tmp_path / "cache.jsonl")
+    cache = TranslationCache(cache_file_path, max_entries=4)
+    for i in range(6):
+        cache.put(f"line {i}", "zh-TW", str(i))
+    cache.close()
+    assert [record["translation"] for record in read_lines(cache_file_path)] == ["2", "3", "4", "5"]
+
+
+def test_corrupt_lines_are_skipped(tmp_path):
+    cache_file_path = tmp_path / "cache.jsonl"
+    valid = json.dumps({"key": TranslationCache.make_key("Hello", "zh-TW"), "translation": "你好"}, ensure_ascii=False)
+    cache_file_path.write_text("not json\n" + valid + "\n{\"key\": 1}\n", encoding="utf-8")
+    cache = TranslationCache(str(cache_file_path))
+    assert cache.get("Hello", "zh-TW") == "你好"
+    cache.close()
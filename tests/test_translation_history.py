@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from PySide6.QtCore import QCoreApplication, Qt
+
+from translation_history import RingBuffer, TranslationHistoryModel
+
+
+@pytest.fixture(scope="module", autouse=True)
+def application():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def test_ring_buffer_overwrites_the_oldest_items():
+    buffer = RingBuffer(3)
+    for i in range(5):
+        buffer.append(i)
+    assert buffer.is_full()
+    assert [buffer[i] for i in range(len(buffer))] == [2, 3, 4]
+    assert buffer[-1] == 4
+
+
+def test_ring_buffer_pop_and_set():
+    buffer = RingBuffer(3)
+    for i in range(4):
+        buffer.append(i)
+    assert buffer.pop_oldest() == 1
+    buffer[-1] = 30
+    buffer.append(4)
+    assert [buffer[i] for i in range(len(buffer))] == [2, 30, 4]
+
+
+def test_ring_buffer_index_out_of_range():
+    buffer = RingBuffer(3)
+    buffer.append(1)
+    with pytest.raises(IndexError):
+        buffer[1]
+    with pytest.raises(IndexError):
+        buffer[-2] = 0
+
+
+def rows(model):
+    return [model.data(model.index(row), Qt.DisplayRole) for row in range(model.rowCount())]
+
+
+def test_history_keeps_the_latest_entries():
+    model = TranslationHistoryModel(capacity=2)
+    for i in range(3):
+        assert model.add(0, f"line {i}", f"翻譯 {i}")
+    assert rows(model) == ["翻譯 1", "翻譯 2"]
+    assert model.data(model.index(1), Qt.ToolTipRole) == "line 2\n\n翻譯 2"
+
+
+def test_history_skips_empty_and_repeated_translations():
+    model = TranslationHistoryModel()
+    assert not model.add(0, "Hello", "")
+    assert model.add(0, "Hello", "你好")
+    assert not model.add(0, "Hello", "你好")
+    # 不同擷取區域的相同翻譯仍會新增
+    assert model.add(1, "Hello", "你好")
+    assert model.rowCount() == 2
+
+
+def test_history_updates_the_last_entry_while_text_is_typed():
+    model = TranslationHistoryModel()
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append(first.row()))
+    model.add(0, "I will", "我會")
+    model.add(0, "I will go", "我會\n去")
+    assert rows(model) == ["我會 去"]
+    assert changed == [0]
+    model.add(0, "Bye", "再見")
+    assert rows(model) == ["我會 去", "再見"]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return str(tmp_path / "translation_memory.sqlite3")
+
+
+def test_put_and_get_across_sessions(database_path):
+    memory = TranslationMemory(database_path, flush_interval=0)
+    memory.put_many([("Hello,  world", "你好，世界", "en")], "zh-TW")
+    memory.close()
+
+    memory = TranslationMemory(database_path, flush_interval=0)
+    # 以正規化後的原文查詢
+    assert memory.get_many(["Hello, world", "Goodbye"], "zh-TW") == {"Hello, world": "你好，世界"}
+    assert memory.get_many(["Hello, world"], "ja") == {}
+    assert memory.get_stats()["hits"] == 1
+    assert memory.get_stats()["misses"] == 2
+    memory.close()
+
+
+def test_search(database_path):
+    memory = TranslationMemory(database_path, flush_interval=0)
+    memory.put_many([("The road north is closed", "往北的路封閉了", "en"), ("Come back tomorrow", "明天再來", "en")],
+                    "zh-TW")
+    memory.close()
+
+    memory = TranslationMemory(database_path, flush_interval=0)
+    assert [row["translation"] for row in memory.search("north")] == ["往北的路封閉了"]
+    assert [row["source_text"] for row in memory.search("明天")] == ["Come back tomorrow"]
+    assert memory.search("   ") == []
+    memory.close()
+
+
+def test_eviction_keeps_database_under_limit_and_drops_least_recent(database_path):
+    max_bytes = 512 * 1024
+    memory = TranslationMemory(database_path, max_bytes=max_bytes, flush_interval=0)
+    for batch in range(20):
+        memory.put_many([(f"line {batch}-{i} " + "x" * 80, f"翻譯 {batch}-{i}", "en") for i in range(200)], "zh-TW")
+    memory.close()
+    assert memory.evicted > 0
+
+    memory = TranslationMemory(database_path, max_bytes=max_bytes, flush_interval=0)
+    stats = memory.get_stats()
+    assert stats["size_bytes"] <= max_bytes
+    assert 0 < stats["entries"] < 20 * 200
+    # 最近寫入的資料保留，最早寫入的資料先被淘汰
+    newest = "line 19-199 " + "x" * 80
+    oldest = "line 0-0 " + "x" * 80
+    assert memory.get_many([newest, oldest], "zh-TW") == {newest: "翻譯 19-199"}
+    memory.close()
+
+
+def test_hits_refresh_last_seen(database_path):
+    memory = TranslationMemory(database_path, flush_interval=0)
+    memory.put_many([("old", "舊", "en")], "zh-TW")
+    memory.close()
+
+    memory = TranslationMemory(database_path, flush_interval=0)
+    assert memory.get_many(["old"], "zh-TW") == {"old": "舊"}
+    memory.close()
+
+    memory = TranslationMemory(database_path, flush_interval=0)
+    assert memory.search("old")[0]["hit_count"] == 1
+    memory.close()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import translator
+from translation_cache import TranslationCache
+from translator import Translator
+
+
+# 與 google.cloud.translate_v2.Client.translate 相同的介面，記錄每個請求的字串
+class FakeTranslateClient():
+    def __init__(self):
+        self.requests = []
+
+    def translate(self, values, target_language):
+        self.requests.append(list(values))
+        return [{"translatedText": f"{value.upper()} &amp;"} for value in values]
+
+
+def make_translator(tmp_path):
+    client = FakeTranslateClient()
+    translation_cache = TranslationCache(str(tmp_path / "cache.jsonl"))
+    text_translator = Translator(translation_cache)
+    text_translator.set_client(client)
+    return text_translator, client
+
+
+def test_results_keep_the_input_order_and_are_unescaped(tmp_path):
+    text_translator, client = make_translator(tmp_path)
+    assert text_translator.translate_many(["b", "", "a", "b"]) == ["B &", "", "A &", "B &"]
+    # 空字串不送出，重複的字串只送出一次
+    assert client.requests == [["b", "a"]]
+
+
+def test_cached_texts_are_not_sent_again(tmp_path):
+    text_translator, client = make_translator(tmp_path)
+    text_translator.translate_many(["a", "b"])
+    assert text_translator.translate_many(["b", "c", "a"]) == ["B &", "C &", "A &"]
+    assert client.requests == [["a", "b"], ["c"]]
+    assert text_translator.get_stats() == {"api_calls": 2, "segments_sent": 3, "characters_sent": 3}
+
+
+def test_requests_are_split_at_the_segment_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(translator, "MAX_BATCH_SEGMENTS", 2)
+    text_translator, client = make_translator(tmp_path)
+    texts = ["a", "b", "c", "d", "e"]
+    assert text_translator.translate_many(texts) == [text.upper() + " &" for text in texts]
+    assert client.requests == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_requests_are_split_at_the_character_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(translator, "MAX_BATCH_CHARACTERS", 10)
+    text_translator, client = make_translator(tmp_path)
+    texts = ["aaaa", "bbbb", "cccc", "dddddddddddd"]
+    assert text_translator.translate_many(texts) == [text.upper() + " &" for text in texts]
+    # 超過上限的單一字串仍然獨自送出
+    assert client.requests == [["aaaa", "bbbb"], ["cccc"], ["dddddddddddd"]]